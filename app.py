@@ -1,29 +1,352 @@
 """Flask приложение для интернет-магазина SHOP SHIPS."""
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+import mimetypes
+import os
+import uuid
+from flask import (Flask, render_template, request, redirect, url_for, flash, session, jsonify,
+                   send_from_directory, abort, Response, stream_with_context)
 from functools import wraps
+from markupsafe import Markup
+from typing import Callable, Hashable, Optional, Tuple
+from werkzeug.http import is_resource_modified
 from data_manager import DataManager
-from services import CartService, ProductService, OrderService
-from datetime import datetime
+from models import Cart
+from services import CartService, ProductService, ExportService
+from services.order_service import paginate_orders
+from storage import AppendLogStorage, MemoryCartStore, ShardedFileCartStore
+from assets import ImagePipeline, AssetManifest
+from cache import FragmentCache, PageCache
+from monitoring import Monitoring, RequestProfiler
+from datetime import datetime, timedelta
 
 app = Flask(__name__)
 app.secret_key = 'shop_ships_secret_key_change_in_production'
 
+# Время запуска: Last-Modified страниц, не зависящих от данных
+STARTED_AT = datetime.now().timestamp()
+
 # Константа валюты
 CURRENCY = 'USD'
 CURRENCY_SYMBOL = '$'
 
-# Инициализация менеджера данных
-data_manager = DataManager()
-
-
+# Размер страницы каталога и списков в админ-панели
+PAGE_SIZE = 24
+
+# Директория данных (SHOP_DATA_DIR; по умолчанию data/)
+DATA_DIR = os.environ.get('SHOP_DATA_DIR', 'data')
+
+# Корзины хранятся по сессиям: в памяти процесса или (для нескольких
+# процессов) в отдельных файлах на диске
+if os.environ.get('SHOP_CART_STORE') == 'file':
+    cart_store = ShardedFileCartStore(os.path.join(DATA_DIR, 'carts'))
+else:
+    cart_store = MemoryCartStore()
+
+# Инициализация менеджера данных. SHOP_FLUSH_INTERVAL (секунды) включает
+# объединение записей каталога: серия правок пишется на диск одним разом,
+# SHOP_COLUMNAR_ORDERS=1 — компактное хранение истории заказов в памяти,
+# SHOP_GROUP_COMMIT=1 — запись заказов фоновым потоком пакетами с fsync
+storage = AppendLogStorage(DATA_DIR, flush_interval=float(os.environ.get('SHOP_FLUSH_INTERVAL', 0)))
+data_manager = DataManager(storage=storage, cart_store=cart_store,
+                           columnar_orders=os.environ.get('SHOP_COLUMNAR_ORDERS') == '1',
+                           group_commit=os.environ.get('SHOP_GROUP_COMMIT') == '1')
+
+# Метрики производительности (SHOP_METRICS=1): время запросов, шаблонов,
+# вызовов хранилища и объём ввода-вывода; /metrics закрывается токеном
+# SHOP_METRICS_TOKEN, если он задан
+monitoring = Monitoring(enabled=os.environ.get('SHOP_METRICS') == '1')
+monitoring.init_app(app)
+monitoring.instrument('storage', storage, cart_store)
+monitoring.instrument('repository', data_manager.product_repo, data_manager.order_repo,
+                      data_manager.cart_repo, data_manager.metrics_repo)
+monitoring.instrument('search', data_manager.search_index, methods=['search'])
+
+# Профилирование в рабочем режиме: SHOP_PROFILE_SAMPLE — доля запросов под
+# cProfile (например, 0.01), SHOP_PROFILE_SLOW_MS — порог, после которого
+# сохраняется трасса семплера стеков (снимок раз в SHOP_PROFILE_INTERVAL_MS);
+# хранятся последние SHOP_PROFILE_KEEP трасс
+profiler = RequestProfiler(os.path.join(DATA_DIR, 'profiles'),
+                           sample_rate=float(os.environ.get('SHOP_PROFILE_SAMPLE', 0)),
+                           slow_ms=float(os.environ.get('SHOP_PROFILE_SLOW_MS', 0)),
+                           keep=int(os.environ.get('SHOP_PROFILE_KEEP', 50)),
+                           interval=float(os.environ.get('SHOP_PROFILE_INTERVAL_MS', 10)) / 1000)
+profiler.init_app(app)
+
+# Кэш отрисованных карточек и страниц товаров (бюджет SHOP_FRAGMENT_CACHE_MB,
+# 0 — выключен); фрагменты изменённых товаров удаляются сразу
+fragment_cache = FragmentCache(int(float(os.environ.get('SHOP_FRAGMENT_CACHE_MB', 16)) * 1024 * 1024))
+data_manager.subscribe_products(fragment_cache.invalidate)
+monitoring.registry.add_collector(fragment_cache.metrics)
+
+# Кэш страниц (бюджет SHOP_PAGE_CACHE_MB, 0 — выключен): страницы каталога,
+# одинаковые для всех посетителей, целиком, для остальных — ETag
+# и Last-Modified для ответов 304 (см. conditional_page)
+page_cache = PageCache(int(float(os.environ.get('SHOP_PAGE_CACHE_MB', 16)) * 1024 * 1024))
+monitoring.registry.add_collector(page_cache.metrics)
+if data_manager.order_writer is not None:
+    monitoring.registry.add_collector(data_manager.order_writer.metrics)
+
+# Уменьшенные копии изображений товаров (static/images/variants)
+image_pipeline = ImagePipeline(static_dir=app.static_folder)
+
+# Кэширование в браузере на год для файлов с хэшем содержимого в имени
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# Версионированные копии CSS/JS (static/dist), собираются при запуске
+asset_manifest = AssetManifest(static_dir=app.static_folder)
+asset_manifest.build()
+
+
+def asset_url_for(endpoint: str, **values) -> str:
+    """url_for для шаблонов: статические CSS/JS ведут на версионированные копии."""
+    if endpoint == 'static':
+        fingerprinted = asset_manifest.lookup(values.get('filename'))
+        if fingerprinted:
+            return url_for('fingerprinted_asset', filename=fingerprinted)
+    return url_for(endpoint, **values)
+
+
+app.jinja_env.globals['url_for'] = asset_url_for
+
+
+@app.route('/assets/<path:filename>')
+def fingerprinted_asset(filename):
+    """Отдаёт версионированный файл, при возможности — предварительно сжатый."""
+    if filename.endswith(('.gz', '.br')) or filename == 'manifest.json':
+        abort(404)
+    
+    accepted = request.accept_encodings
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        compressed = asset_manifest.output_dir / (filename + suffix)
+        if accepted[encoding] and compressed.is_file():
+            response = send_from_directory(asset_manifest.output_dir, filename + suffix,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(asset_manifest.output_dir, filename)
+    
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.template_global()
+def responsive_image(image: str, alt: str = '', sizes: str = '100vw', **attrs):
+    """Выводит изображение товара с srcset из подготовленных вариантов."""
+    return image_pipeline.render(
+        image, alt, sizes,
+        lambda filename: url_for('static', filename=filename),
+        **attrs
+    )
+
+
+def render_product_fragment(kind: str, template: str, product) -> Markup:
+    """
+    Отрисовывает фрагмент товара через кэш фрагментов.
+    
+    Args:
+        kind: Вид фрагмента (ключ кэша)
+        template: Шаблон фрагмента (получает product и currency_symbol)
+        product: Товар
+    """
+    # Разметка изображения зависит от записи манифеста вариантов
+    image_entry = image_pipeline.get(product.image) if product.image else None
+    html = fragment_cache.get_or_render(
+        kind, product, CURRENCY,
+        lambda: app.jinja_env.get_template(template).render(product=product,
+                                                            currency_symbol=CURRENCY_SYMBOL),
+        extra_version=image_entry['hash'] if image_entry else None
+    )
+    return Markup(html)
+
+
+@app.template_global()
+def product_card(product) -> Markup:
+    """Карточка товара в каталоге и поиске (кэшируется)."""
+    return render_product_fragment('card', 'public/_product_card.html', product)
+
+
+@app.template_global()
+def product_detail_body(product) -> Markup:
+    """Описание товара на его странице (кэшируется)."""
+    return render_product_fragment('detail', 'public/_product_detail_body.html', product)
+
+
+@app.before_request
+def refresh_data():
+    """
+    Перечитывает данные, изменённые другими процессами (воркерами gunicorn).
+    
+    Проверка сводится к stat() файлов данных и перечитывает только
+    изменившиеся товары или заказы.
+    """
+    if request.endpoint not in ('static', 'fingerprinted_asset'):
+        data_manager.refresh_if_changed()
+
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Добавляет долгосрочное кэширование для вариантов изображений."""
+    if (request.endpoint == 'static' and
+            request.view_args.get('filename', '').startswith(image_pipeline.output_subdir + '/')):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+def get_cart_id(create: bool = False) -> Optional[str]:
+    """
+    Возвращает идентификатор корзины текущей сессии.
+    
+    Args:
+        create: Создать идентификатор, если у сессии его ещё нет
+    """
+    cart_id = session.get('cart_id')
+    if cart_id is None and create:
+        cart_id = uuid.uuid4().hex
+        session['cart_id'] = cart_id
+    return cart_id
+
+
+@monitoring.timed('get_cart_service')
 def get_cart_service() -> CartService:
     """Получает сервис корзины для текущей сессии (DRY)."""
-    cart = data_manager.load_cart()
+    cart_id = get_cart_id()
+    cart = data_manager.load_cart(cart_id) if cart_id else Cart()
     products = data_manager.get_all_products()
     return CartService(cart, products)
 
 
+def save_session_cart(cart: Cart) -> None:
+    """Сохраняет корзину текущей сессии."""
+    data_manager.save_cart(cart, get_cart_id(create=True))
+
+
+def get_float_arg(name: str) -> Optional[float]:
+    """Читает необязательный числовой параметр запроса."""
+    value = request.args.get(name, '').strip()
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def get_date_arg(name: str, end_of_day: bool = False) -> Optional[str]:
+    """
+    Читает необязательную дату (ГГГГ-ММ-ДД) из параметров запроса.
+    
+    Args:
+        name: Имя параметра
+        end_of_day: Вернуть начало следующего дня (для включительной верхней границы)
+    
+    Returns:
+        Граница интервала в формате ISO 8601 или None
+    """
+    value = request.args.get(name, '').strip()
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+    if day is None:
+        return None
+    return (day + timedelta(days=1) if end_of_day else day).isoformat()
+
+
+def get_page_args() -> dict:
+    """Возвращает параметры запроса для ссылок пагинации (без курсора)."""
+    return {k: v for k, v in request.args.items() if k != 'cursor' and v}
+
+
+def versions_of(*kinds: str) -> Callable[..., Tuple[Hashable, float]]:
+    """
+    Возвращает функцию версии страницы, зависящей от указанных видов данных.
+    
+    Args:
+        *kinds: Виды данных DataManager ('products', 'orders'); без них —
+            страница не зависит от данных и меняется только с перезапуском
+    """
+    def get_version(**view_args) -> Tuple[Hashable, float]:
+        versions = [data_manager.get_version(kind) for kind in kinds]
+        number = tuple(v.number for v in versions)
+        changed_at = max((v.changed_at for v in versions), default=STARTED_AT)
+        if 'products' in kinds:
+            return with_images_version(number, changed_at)
+        return number, changed_at
+    return get_version
+
+
+def with_images_version(version: Hashable, changed_at: float) -> Tuple[Hashable, float]:
+    """
+    Добавляет к версии страницы с товарами версию манифеста изображений.
+    
+    Разметка изображений (srcset) меняется, когда варианты создаются
+    или пересоздаются, хотя сами товары при этом не меняются.
+    """
+    images, images_changed_at = image_pipeline.version()
+    return (version, images), max(changed_at, images_changed_at)
+
+
+def product_version(product_id: int) -> Tuple[Hashable, float]:
+    """Версия страницы товара: меняется при изменении этого товара или манифеста изображений."""
+    version = data_manager.get_version('products', product_id)
+    return with_images_version(version.number, version.changed_at)
+
+
+def conditional_page(get_version: Callable[..., Tuple[Hashable, float]], cache: bool = False):
+    """
+    Декоратор условных GET-запросов (ETag, Last-Modified, 304).
+    
+    get_version(**view_args) возвращает версию данных страницы
+    (DataManager.get_version) и время её изменения. Для версии
+    запоминается ETag отрисованной страницы (хэш содержимого): пока
+    версия не изменилась, запрос с совпадающим If-None-Match или
+    If-Modified-Since получает 304 без отрисовки. С cache=True страница,
+    одинаковая для всех посетителей, хранится в кэше страниц целиком.
+    Администратор видит другое меню, поэтому его страницы кэшируются
+    отдельно и без содержимого; при ожидающих сообщениях (flash)
+    страница отрисовывается как обычно. Без кэша страниц
+    (SHOP_PAGE_CACHE_MB=0) страница отрисовывается при каждом запросе,
+    но ETag и Last-Modified отправляются, и совпадающий запрос
+    получает 304 без тела.
+    
+    Args:
+        get_version: Функция версии страницы (параметры — аргументы маршрута)
+        cache: Хранить страницу целиком
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            if '_flashes' in session:
+                return view(*args, **kwargs)
+            
+            private = bool(session.get('is_admin'))
+            key = ('admin:' if private else '') + request.full_path
+            # Версия берётся до отрисовки: если данные изменятся во время
+            # отрисовки, страница будет сохранена со старой версией и устареет
+            version, changed_at = get_version(**kwargs)
+            page = page_cache.get(key, version) if page_cache.enabled else None
+            if page is not None and page.body is None and is_resource_modified(
+                    request.environ, page.etag, last_modified=page.last_modified):
+                # Известны только валидаторы, а у клиента нет этой версии
+                page = None
+            
+            if page is None:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or session.modified:
+                    return response
+                page = page_cache.put(key, version, response.get_data(), response.content_type,
+                                      changed_at, keep_body=cache and not private)
+            
+            response = Response(page.body or b'', content_type=page.content_type)
+            response.set_etag(page.etag)
+            response.last_modified = page.last_modified
+            response.headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+            return response.make_conditional(request)
+        return decorated_function
+    return decorator
+
+
 def admin_required(f):
     """Декоратор для проверки администратора (в будущем можно добавить реальную авторизацию)."""
     @wraps(f)
@@ -39,20 +362,29 @@ def admin_required(f):
 # ==================== Публичные маршруты ====================
 
 @app.route('/')
+@conditional_page(versions_of('products'), cache=True)
 def public_index():
     """Главная страница магазина."""
     product_service = ProductService(data_manager.get_all_products())
-    products = product_service.get_available_products()
-    cart_service = get_cart_service()
-    cart_count = cart_service.get_items_count()
+    filters = {
+        'sort': request.args.get('sort', 'id'),
+        'min_price': get_float_arg('min_price'),
+        'max_price': get_float_arg('max_price'),
+    }
+    try:
+        page = product_service.list_products(request.args.get('cursor'), PAGE_SIZE,
+                                             in_stock=True, **filters)
+    except ValueError:
+        page = product_service.list_products(None, PAGE_SIZE, in_stock=True)
     
     return render_template('public/index.html', 
-                         products=products, 
-                         cart_count=cart_count,
+                         products=page, 
+                         page_args=get_page_args(),
                          currency_symbol=CURRENCY_SYMBOL)
 
 
 @app.route('/product/<int:product_id>')
+@conditional_page(product_version, cache=True)
 def product_detail(product_id):
     """Страница деталей товара."""
     product = data_manager.get_product(product_id)
@@ -60,32 +392,26 @@ def product_detail(product_id):
         flash('Товар не найден.', 'danger')
         return redirect(url_for('public_index'))
     
-    cart_service = get_cart_service()
-    cart_count = cart_service.get_items_count()
-    
     return render_template('public/product_detail.html', 
                          product=product, 
-                         cart_count=cart_count,
                          currency_symbol=CURRENCY_SYMBOL)
 
 
 @app.route('/search')
+@conditional_page(versions_of('products'), cache=True)
 def search():
     """Поиск товаров."""
     query = request.args.get('q', '').strip()
-    cart_service = get_cart_service()
-    cart_count = cart_service.get_items_count()
-    
     if not query:
         return redirect(url_for('public_index'))
     
-    product_service = ProductService(data_manager.get_all_products())
+    product_service = ProductService(data_manager.get_all_products(),
+                                     data_manager.search_index)
     results = product_service.search_products(query)
     
     return render_template('public/search.html', 
                          query=query, 
                          results=results, 
-                         cart_count=cart_count,
                          currency_symbol=CURRENCY_SYMBOL)
 
 
@@ -104,6 +430,16 @@ def cart():
                          currency_symbol=CURRENCY_SYMBOL)
 
 
+@app.route('/cart/count')
+def cart_items_count():
+    """Количество товаров в корзине (значок в меню заполняется скриптом)."""
+    cart_id = get_cart_id()
+    count = data_manager.load_cart(cart_id).get_items_count() if cart_id else 0
+    response = jsonify(count=count)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
 @app.route('/cart/add', methods=['POST'])
 def cart_add():
     """Добавление товара в корзину."""
@@ -116,7 +452,7 @@ def cart_add():
     
     cart_service = get_cart_service()
     if cart_service.add_product(product_id, quantity):
-        data_manager.save_cart(cart_service.cart)
+        save_session_cart(cart_service.cart)
         flash('Товар добавлен в корзину!', 'success')
     else:
         flash('Не удалось добавить товар. Возможно, товар недоступен.', 'danger')
@@ -148,7 +484,7 @@ def cart_update():
     elif difference < 0:
         cart_service.remove_product(product_id, -difference)
     
-    data_manager.save_cart(cart_service.cart)
+    save_session_cart(cart_service.cart)
     flash('Корзина обновлена.', 'success')
     return redirect(url_for('cart'))
 
@@ -166,7 +502,7 @@ def cart_remove():
     if product_id in cart_service.cart.items:
         quantity = cart_service.cart.items[product_id]
         cart_service.remove_product(product_id, quantity)
-        data_manager.save_cart(cart_service.cart)
+        save_session_cart(cart_service.cart)
         flash('Товар удалён из корзины.', 'success')
     
     return redirect(url_for('cart'))
@@ -177,7 +513,7 @@ def cart_clear():
     """Очистка корзины."""
     cart_service = get_cart_service()
     cart_service.clear_cart()
-    data_manager.save_cart(cart_service.cart)
+    save_session_cart(cart_service.cart)
     flash('Корзина очищена.', 'success')
     return redirect(url_for('cart'))
 
@@ -221,13 +557,18 @@ def payment():
         
         # Создаём заказ
         cart_service = get_cart_service()
-        order = data_manager.create_order(
-            cart_service.cart, 
-            data_manager.get_all_products()
-        )
+        try:
+            order = data_manager.create_order(
+                cart_service.cart, 
+                data_manager.get_all_products()
+            )
+        except IOError as e:
+            print(f"Ошибка при оформлении заказа: {e}")
+            flash('Не удалось оформить заказ. Попробуйте ещё раз.', 'danger')
+            return redirect(url_for('payment'))
         
         cart_service.clear_cart()
-        data_manager.save_cart(cart_service.cart)
+        save_session_cart(cart_service.cart)
         
         flash(f'Заказ #{order.id} успешно оформлен и оплачен!', 'success')
         return redirect(url_for('order_success', order_id=order.id))
@@ -258,9 +599,6 @@ def order_success(order_id):
         flash('Заказ не найден.', 'danger')
         return redirect(url_for('public_index'))
     
-    cart_service = get_cart_service()
-    cart_count = cart_service.get_items_count()
-    
     # Получаем детали заказа
     products = data_manager.get_all_products()
     order_items = {}
@@ -274,18 +612,14 @@ def order_success(order_id):
     return render_template('public/order_success.html', 
                          order=order, 
                          items=order_items, 
-                         cart_count=cart_count,
                          currency_symbol=CURRENCY_SYMBOL)
 
 
 @app.route('/contacts')
+@conditional_page(versions_of(), cache=True)
 def contacts():
     """Страница контактов."""
-    cart_service = get_cart_service()
-    cart_count = cart_service.get_items_count()
-    
-    return render_template('public/contacts.html',
-                         cart_count=cart_count)
+    return render_template('public/contacts.html')
 
 
 @app.route('/feedback', methods=['GET', 'POST'])
@@ -307,11 +641,7 @@ def feedback():
         flash('Спасибо за ваше сообщение! Мы свяжемся с вами в ближайшее время.', 'success')
         return redirect(url_for('feedback'))
     
-    cart_service = get_cart_service()
-    cart_count = cart_service.get_items_count()
-    
-    return render_template('public/feedback.html',
-                         cart_count=cart_count)
+    return render_template('public/feedback.html')
 
 
 # ==================== CRM маршруты ====================
@@ -342,34 +672,53 @@ def admin_logout():
 
 @app.route('/admin')
 @admin_required
+@conditional_page(versions_of('products', 'orders'))
 def admin_dashboard():
     """Главная страница CRM."""
-    product_service = ProductService(data_manager.get_all_products())
-    order_service = OrderService(data_manager.get_all_orders())
+    products = data_manager.get_all_products()
+    product_service = ProductService(products)
+    metrics = data_manager.get_sales_metrics()
     
     stats = {
         'total_products': len(product_service.get_all_products()),
         'available_products': len(product_service.get_available_products()),
-        'total_orders': order_service.get_orders_count(),
-        'total_revenue': order_service.get_total_revenue(),
-        'avg_order': order_service.get_total_revenue() / order_service.get_orders_count() 
-                    if order_service.get_orders_count() > 0 else 0
+        'total_orders': metrics.orders_count,
+        'total_revenue': metrics.total_revenue,
+        'avg_order': metrics.average_order_value
     }
+    top_products = [
+        {'id': pid, 'product': products.get(pid), 'units': units, 'revenue': revenue}
+        for pid, units, revenue in metrics.top_products(5)
+    ]
     
     return render_template('admin/dashboard.html', 
                          stats=stats,
+                         top_products=top_products,
+                         last_days=metrics.last_days(7),
                          currency_symbol=CURRENCY_SYMBOL)
 
 
 @app.route('/admin/products')
 @admin_required
+@conditional_page(versions_of('products'))
 def admin_products():
     """Управление товарами."""
     product_service = ProductService(data_manager.get_all_products())
-    products = product_service.get_all_products()
+    stock_filter = request.args.get('in_stock')
+    filters = {
+        'sort': request.args.get('sort', 'id'),
+        'min_price': get_float_arg('min_price'),
+        'max_price': get_float_arg('max_price'),
+        'in_stock': {'yes': True, 'no': False}.get(stock_filter),
+    }
+    try:
+        page = product_service.list_products(request.args.get('cursor'), PAGE_SIZE, **filters)
+    except ValueError:
+        page = product_service.list_products(None, PAGE_SIZE)
     
     return render_template('admin/products.html', 
-                         products=products,
+                         products=page,
+                         page_args=get_page_args(),
                          currency_symbol=CURRENCY_SYMBOL)
 
 
@@ -394,12 +743,18 @@ def admin_product_add():
         
         in_stock = request.form.get('in_stock') == 'on'
         image = request.form.get('image', '').strip() or None
+        sku = request.form.get('sku', '').strip() or None
         
         if not name:
             flash('Название товара обязательно.', 'danger')
             return render_template('admin/product_form.html', mode='add')
         
-        product = Product(id=0, name=name, description=description, price=price, in_stock=in_stock, image=image)
+        # Варианты изображения готовятся до публикации товара, чтобы
+        # его первые страницы и фрагменты отрисовывались уже с ними
+        if image:
+            image_pipeline.process(image)
+        product = Product(id=0, name=name, description=description, price=price, in_stock=in_stock,
+                          image=image, sku=sku)
         product = data_manager.add_product(product)
         flash(f'Товар "{product.name}" успешно добавлен!', 'success')
         return redirect(url_for('admin_products'))
@@ -431,18 +786,22 @@ def admin_product_edit(product_id):
         
         in_stock = request.form.get('in_stock') == 'on'
         image = request.form.get('image', '').strip() or None
+        sku = request.form.get('sku', '').strip() or None
         
         if not name:
             flash('Название товара обязательно.', 'danger')
             return render_template('admin/product_form.html', mode='edit', product=product)
         
+        if image:
+            image_pipeline.process(image)
         updated = data_manager.update_product(
             product_id, 
             name=name, 
             description=description, 
             price=price, 
             in_stock=in_stock,
-            image=image
+            image=image,
+            sku=sku
         )
         
         if updated:
@@ -473,18 +832,52 @@ def admin_product_delete(product_id):
 
 @app.route('/admin/orders')
 @admin_required
+@conditional_page(versions_of('orders'))
 def admin_orders():
     """Список заказов."""
-    order_service = OrderService(data_manager.get_all_orders())
-    orders = order_service.get_all_orders()
+    # Страница читается из хранилища или индекса, без загрузки истории целиком
+    fetch = data_manager.get_orders_page
+    date_from = get_date_arg('date_from')
+    date_to = get_date_arg('date_to', end_of_day=True)
+    try:
+        page = paginate_orders(fetch, request.args.get('cursor'), PAGE_SIZE, date_from, date_to)
+    except ValueError:
+        page = paginate_orders(fetch, None, PAGE_SIZE, date_from, date_to)
     
     return render_template('admin/orders.html', 
-                         orders=reversed(orders),
+                         orders=page,
+                         page_args=get_page_args(),
                          currency_symbol=CURRENCY_SYMBOL)
 
 
+@app.route('/admin/orders/export')
+@admin_required
+def admin_orders_export():
+    """
+    Выгрузка заказов в CSV или JSON Lines с фильтром по датам.
+    
+    Ответ формируется потоково: заказы читаются из хранилища порциями
+    и сразу отправляются клиенту, поэтому расход памяти не зависит
+    от размера истории.
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ExportService.FORMATS:
+        abort(400)
+    
+    orders = data_manager.iter_orders(get_date_arg('date_from'),
+                                      get_date_arg('date_to', end_of_day=True))
+    body = ExportService(data_manager.get_all_products()).export(orders, fmt)
+    filename = f"orders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(stream_with_context(body), content_type=ExportService.MIMETYPES[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        # Не буферизовать ответ в nginx: выгрузка должна начинаться сразу
+        'X-Accel-Buffering': 'no',
+    })
+
+
 @app.route('/admin/orders/<int:order_id>')
 @admin_required
+@conditional_page(versions_of('products'))
 def admin_order_detail(order_id):
     """Детали заказа."""
     order = data_manager.get_order(order_id)
@@ -507,6 +900,73 @@ def admin_order_detail(order_id):
                          currency_symbol=CURRENCY_SYMBOL)
 
 
+@app.route('/admin/metrics', methods=['GET', 'POST'])
+@admin_required
+def admin_metrics():
+    """Метрики производительности: маршруты, шаблоны, хранилище, ввод-вывод."""
+    if request.method == 'POST':
+        monitoring.registry.reset()
+        flash('Метрики сброшены.', 'success')
+        return redirect(url_for('admin_metrics'))
+    
+    return render_template('admin/metrics.html',
+                         enabled=monitoring.enabled,
+                         started_at=datetime.fromtimestamp(monitoring.registry.started_at),
+                         routes=monitoring.summary('shop_http_request_duration_seconds',
+                                                   'endpoint', 'method'),
+                         statuses=monitoring.status_summary(),
+                         calls=monitoring.summary('shop_call_duration_seconds', 'layer', 'call'),
+                         templates=monitoring.summary('shop_template_render_seconds', 'template'),
+                         io=monitoring.io_summary(),
+                         fragments=fragment_cache.stats(),
+                         pages=page_cache.stats())
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Метрики в текстовом формате Prometheus (доступны при SHOP_METRICS=1)."""
+    if not monitoring.enabled:
+        abort(404)
+    token = os.environ.get('SHOP_METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(403)
+    return Response(monitoring.registry.render_prometheus(),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/admin/profiles')
+@admin_required
+def admin_profiles():
+    """Список сохранённых трасс профилировщика."""
+    return render_template('admin/profiles.html',
+                         profiler=profiler,
+                         traces=profiler.list_traces())
+
+
+@app.route('/admin/profiles/<trace_id>')
+@admin_required
+def admin_profile_detail(trace_id):
+    """Отчёт по трассе профилировщика."""
+    trace = profiler.get_trace(trace_id)
+    if not trace:
+        flash('Трасса не найдена (возможно, уже вытеснена новыми).', 'danger')
+        return redirect(url_for('admin_profiles'))
+    
+    return render_template('admin/profile_detail.html',
+                         trace=trace,
+                         report=profiler.report(trace))
+
+
+@app.route('/admin/profiles/<trace_id>/download')
+@admin_required
+def admin_profile_download(trace_id):
+    """Скачивание файла трассы (.prof для pstats/snakeviz, .folded для flame graph)."""
+    trace = profiler.get_trace(trace_id)
+    if not trace:
+        abort(404)
+    return send_from_directory(profiler.directory.resolve(), trace['file'], as_attachment=True)
+
+
 # ==================== Обработка ошибок ====================
 
 @app.errorhandler(404)
@@ -0,0 +1,6 @@
+"""Обработка статических ресурсов: изображения товаров, CSS и JS."""
+
+from .images import ImagePipeline
+from .manifest import AssetManifest, minify_css
+
+__all__ = ['ImagePipeline', 'AssetManifest', 'minify_css']
@@ -0,0 +1,247 @@
+"""Конвейер подготовки изображений товаров (миниатюры, WebP)."""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from markupsafe import Markup, escape
+
+from storage.locking import FileLock
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow — необязательная зависимость
+    Image = None
+    ImageOps = None
+
+
+class ImagePipeline:
+    """
+    Создаёт уменьшенные копии изображений товаров в нескольких форматах.
+    
+    Для каждого исходного файла (путь относительно static/) строятся
+    варианты заданных ширин в форматах WebP и JPEG. Имена вариантов
+    содержат хэш содержимого исходника, поэтому их можно кэшировать
+    в браузере бессрочно. Сведения о вариантах хранятся в manifest.json.
+    
+    Манифест могут обновлять одновременно несколько потоков и процессов
+    (админ-панель, scripts/build_image_variants.py): запись идёт под
+    файловой блокировкой, с перечитыванием манифеста перед слиянием.
+    """
+    
+    WIDTHS = (320, 640, 1024)
+    FORMATS = {
+        'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+        'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+    }
+    
+    def __init__(self, static_dir: str = 'static', output_subdir: str = 'images/variants'):
+        """
+        Инициализирует конвейер.
+        
+        Args:
+            static_dir: Каталог статических файлов приложения
+            output_subdir: Подкаталог static/ для готовых вариантов
+        """
+        self.static_dir = Path(static_dir)
+        self.output_subdir = output_subdir
+        self.output_dir = self.static_dir / output_subdir
+        self.manifest_file = self.output_dir / 'manifest.json'
+        self._lock = FileLock(str(self.output_dir / '.manifest.lock'))
+        # Метка прочитанного манифеста: (mtime, размер, inode)
+        self._manifest_token: Tuple[int, int, int] = (0, 0, 0)
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+    
+    @property
+    def available(self) -> bool:
+        """Установлен ли Pillow (без него варианты не создаются)."""
+        return Image is not None
+    
+    @staticmethod
+    def _stat_token(file_path: Path) -> Tuple[int, int, int]:
+        """Возвращает (mtime, размер, inode) файла — метку его версии."""
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return (0, 0, 0)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Читает манифест вариантов."""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                st = os.fstat(f.fileno())
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Ошибка при чтении манифеста {self.manifest_file}: {e}")
+            return {}
+        self._manifest_token = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return manifest
+    
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Атомарно записывает манифест вариантов (временный файл + переименование).
+        
+        Вызывается под блокировкой манифеста.
+        """
+        tmp_path = self.manifest_file.with_name(
+            f".{self.manifest_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_file)
+        except IOError as e:
+            print(f"Ошибка при записи манифеста {self.manifest_file}: {e}")
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        self._manifest = manifest
+        self._manifest_token = self._stat_token(self.manifest_file)
+    
+    def _reload_if_changed(self) -> None:
+        """Перечитывает манифест, если его обновил другой процесс."""
+        token = self._stat_token(self.manifest_file)
+        if token != (0, 0, 0) and token != self._manifest_token:
+            self._manifest = self._load_manifest()
+    
+    def version(self) -> Tuple[Tuple[int, int, int], float]:
+        """
+        Возвращает версию манифеста и время его изменения.
+        
+        Returns:
+            Метка файла манифеста (mtime, размер, inode) и его mtime
+            в Unix time (нули, если манифеста ещё нет)
+        """
+        self._reload_if_changed()
+        token = self._manifest_token
+        return token, token[0] / 1e9
+    
+    def get(self, image: str) -> Optional[Dict[str, Any]]:
+        """Возвращает сведения о вариантах изображения (или None)."""
+        self._reload_if_changed()
+        return self._manifest.get(image)
+    
+    def process(self, image: str, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Создаёт варианты одного изображения.
+        
+        Если содержимое исходника не изменилось, варианты не пересоздаются.
+        
+        Args:
+            image: Путь к изображению относительно static/
+            force: Пересоздать варианты даже при совпадении хэша
+        
+        Returns:
+            Запись манифеста или None, если обработка невозможна
+        """
+        if not self.available:
+            return None
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        source = self.static_dir / image
+        try:
+            data = source.read_bytes()
+        except IOError as e:
+            print(f"Ошибка при чтении изображения {source}: {e}")
+            return None
+        
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        entry = self.get(image)
+        if entry and entry.get('hash') == digest and not force:
+            return entry
+        
+        try:
+            entry = self._build_variants(image, source, digest)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при обработке изображения {source}: {e}")
+            return None
+        
+        # Чтение-слияние-запись под блокировкой: манифест могут обновлять
+        # другие потоки и процессы. Читатели видят либо старый, либо новый
+        # словарь целиком
+        with self._lock:
+            self._reload_if_changed()
+            self._save_manifest({**self._manifest, image: entry})
+        return entry
+    
+    def _build_variants(self, image: str, source: Path, digest: str) -> Dict[str, Any]:
+        """Строит файлы вариантов и возвращает запись манифеста."""
+        stem = Path(image).stem
+        
+        with Image.open(source) as original:
+            picture = ImageOps.exif_transpose(original).convert('RGB')
+        width, height = picture.size
+        
+        # Варианты не шире оригинала; хотя бы один вариант создаётся всегда
+        widths = [w for w in self.WIDTHS if w < width] + [min(width, self.WIDTHS[-1])]
+        variants: Dict[str, List[List[Any]]] = {fmt: [] for fmt in self.FORMATS}
+        for target_width in sorted(set(widths)):
+            target_height = max(1, round(height * target_width / width))
+            resized = picture.resize((target_width, target_height), Image.LANCZOS)
+            for fmt, options in self.FORMATS.items():
+                name = f"{stem}.{target_width}.{digest}.{'jpg' if fmt == 'jpeg' else fmt}"
+                resized.save(self.output_dir / name, **options)
+                variants[fmt].append([target_width, f"{self.output_subdir}/{name}"])
+        
+        return {'hash': digest, 'width': width, 'height': height, 'variants': variants}
+    
+    def process_all(self, images: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """
+        Обрабатывает набор изображений.
+        
+        Returns:
+            Количество обработанных и пропущенных (ошибочных) изображений
+        """
+        counts = {'processed': 0, 'failed': 0}
+        for image in sorted(set(images)):
+            if self.process(image, force=force) is None:
+                counts['failed'] += 1
+            else:
+                counts['processed'] += 1
+        return counts
+    
+    def render(self, image: str, alt: str = '', sizes: str = '100vw',
+               url_for_static: Optional[Callable[[str], str]] = None,
+               **attrs: str) -> Markup:
+        """
+        Формирует разметку <picture> с srcset для изображения.
+        
+        Если вариантов нет, возвращается обычный <img> с оригиналом.
+        
+        Args:
+            image: Путь к изображению относительно static/
+            alt: Альтернативный текст
+            sizes: Значение атрибута sizes
+            url_for_static: Функция filename -> URL статического файла
+            **attrs: Дополнительные атрибуты <img> (class, style, ...)
+        
+        Returns:
+            Безопасная HTML-разметка
+        """
+        url = url_for_static or (lambda filename: f'/static/{filename}')
+        extra = ''.join(f' {escape(k)}="{escape(v)}"' for k, v in attrs.items())
+        entry = self.get(image)
+        if not entry:
+            return Markup(f'<img src="{escape(url(image))}" alt="{escape(alt)}" '
+                          f'loading="lazy" decoding="async"{extra}>')
+        
+        def srcset(fmt: str) -> str:
+            """Формирует srcset для вариантов одного формата."""
+            return ', '.join(f'{url(path)} {width}w' for width, path in entry['variants'][fmt])
+        
+        fallback = entry['variants']['jpeg'][-1][1]
+        return Markup(
+            f'<picture>'
+            f'<source type="image/webp" srcset="{escape(srcset("webp"))}" sizes="{escape(sizes)}">'
+            f'<img src="{escape(url(fallback))}" srcset="{escape(srcset("jpeg"))}" '
+            f'sizes="{escape(sizes)}" width="{entry["width"]}" height="{entry["height"]}" '
+            f'alt="{escape(alt)}" loading="lazy" decoding="async"{extra}>'
+            f'</picture>'
+        )
@@ -0,0 +1,137 @@
+"""Версионирование статических файлов (CSS/JS) по хэшу содержимого."""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{}:;,>])\s*')
+
+
+def minify_css(source: str) -> str:
+    """
+    Упрощённая минификация CSS: удаляет комментарии и лишние пробелы.
+    
+    Args:
+        source: Исходный CSS
+    
+    Returns:
+        Минифицированный CSS
+    """
+    css = _CSS_COMMENT_RE.sub('', source)
+    css = _CSS_SPACE_RE.sub(' ', css)
+    css = _CSS_PUNCT_RE.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+class AssetManifest:
+    """
+    Манифест статических файлов с хэшем содержимого в имени.
+    
+    Для каждого файла (например, css/style.css) создаётся копия
+    dist/style.<хэш>.css, при необходимости минифицированная,
+    а также предварительно сжатые .gz и .br (если установлен brotli).
+    Такие файлы можно кэшировать в браузере бессрочно: после изменения
+    исходника меняется и URL.
+    """
+    
+    PATTERNS = ('css/*.css', 'js/*.js')
+    
+    def __init__(self, static_dir: str = 'static', output_subdir: str = 'dist'):
+        """
+        Инициализирует манифест.
+        
+        Args:
+            static_dir: Каталог статических файлов приложения
+            output_subdir: Подкаталог static/ для версионированных копий
+        """
+        self.static_dir = Path(static_dir)
+        self.output_dir = self.static_dir / output_subdir
+        self.manifest_file = self.output_dir / 'manifest.json'
+        self._entries: Dict[str, str] = {}
+    
+    def load(self) -> Dict[str, str]:
+        """Загружает манифест с диска."""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            self._entries = {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Ошибка при чтении манифеста {self.manifest_file}: {e}")
+            self._entries = {}
+        return self._entries
+    
+    def lookup(self, filename: Optional[str]) -> Optional[str]:
+        """
+        Возвращает имя версионированной копии файла.
+        
+        Args:
+            filename: Путь относительно static/ (например, css/style.css)
+        
+        Returns:
+            Имя файла внутри каталога dist или None
+        """
+        return self._entries.get(filename) if filename else None
+    
+    def _sources(self, patterns: Iterable[str]) -> Iterable[Path]:
+        """Перебирает исходные файлы по шаблонам."""
+        for pattern in patterns:
+            yield from sorted(self.static_dir.glob(pattern))
+    
+    def build(self, minify: bool = True, compress: bool = True) -> Dict[str, str]:
+        """
+        Собирает версионированные копии всех статических файлов.
+        
+        Уже собранные файлы с тем же хэшем не перезаписываются.
+        
+        Args:
+            minify: Минифицировать CSS
+            compress: Создавать сжатые копии .gz (и .br при наличии brotli)
+        
+        Returns:
+            Манифест: исходный путь -> имя копии в каталоге dist
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        entries = {}
+        for source in self._sources(self.PATTERNS):
+            content = source.read_bytes()
+            if minify and source.suffix == '.css':
+                content = minify_css(content.decode('utf-8')).encode('utf-8')
+            
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            name = f"{source.stem}.{digest}{source.suffix}"
+            target = self.output_dir / name
+            if not target.exists():
+                self._write(target, content)
+                if compress:
+                    self._write(target.with_name(name + '.gz'),
+                                gzip.compress(content, compresslevel=9, mtime=0))
+                    if brotli is not None:
+                        self._write(target.with_name(name + '.br'), brotli.compress(content))
+            
+            entries[source.relative_to(self.static_dir).as_posix()] = name
+        
+        self._entries = entries
+        self._write(self.manifest_file,
+                    json.dumps(entries, indent=2, sort_keys=True).encode('utf-8'))
+        return entries
+    
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        """Записывает файл атомарно (через временный файл)."""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -0,0 +1,127 @@
+"""
+Бенчмарк оформления заказов: пропускная способность create_order
+в зависимости от числа одновременных покупателей.
+
+Сравниваются режимы записи заказов:
+  - sync    — запись в create_order, fsync каждого заказа (надёжно);
+  - batched — запись в create_order, fsync раз в 32 записи
+              (по умолчанию для журнала; последние заказы могут
+              потеряться при сбое питания);
+  - group   — групповая фиксация (GroupCommitWriter): фоновый поток
+              пишет пакетами с fsync, create_order ждёт своего пакета.
+
+Для каждого режима и числа потоков выводятся заказы в секунду,
+задержки p50/p99 и число fsync (пакетов) на заказ.
+
+Примеры:
+    python benchmarks/bench_checkout.py
+    python benchmarks/bench_checkout.py --threads 1 8 32 --orders 2000 --db
+"""
+
+import argparse
+import atexit
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_manager import DataManager
+from models import Cart
+from storage import AppendLogStorage, IStorage, SQLiteStorage
+
+MODES = ('sync', 'batched', 'group')
+
+
+def make_storage(mode: str, data_dir: str, db: bool) -> IStorage:
+    """Создаёт хранилище для режима записи."""
+    if db:
+        return SQLiteStorage(str(Path(data_dir) / 'shop.db'))
+    return AppendLogStorage(data_dir, fsync_batch=1 if mode == 'sync' else 32,
+                            fsync_interval=0.0 if mode == 'sync' else 1.0)
+
+
+def run(mode: str, threads: int, orders: int, db: bool) -> Dict[str, float]:
+    """Оформляет orders заказов из threads потоков и возвращает показатели."""
+    data_dir = tempfile.mkdtemp(prefix='shop_checkout_')
+    storage = make_storage(mode, data_dir, db)
+    try:
+        dm = DataManager(storage=storage, group_commit=mode == 'group')
+        dm.bulk_upsert_products({'name': f"Товар {i}", 'price': 10.0 + i} for i in range(1, 51))
+        catalog = dm.get_catalog()
+        cart = Cart({1: 2, 7: 1, 30: 3})
+        
+        per_thread = orders // threads
+        latencies: List[float] = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads + 1)
+        
+        def buyer() -> None:
+            own = []
+            barrier.wait()
+            for _ in range(per_thread):
+                started = time.perf_counter()
+                dm.create_order(cart, catalog)
+                own.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(own)
+        
+        workers = [threading.Thread(target=buyer) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        
+        latencies.sort()
+        writer = dm.order_writer
+        batches = writer.stats()['batches'] if writer is not None else None
+        dm.close()
+        atexit.unregister(dm.close)
+        return {
+            'rate': len(latencies) / elapsed,
+            'p50': latencies[len(latencies) // 2] * 1000,
+            'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+            'fsync_per_order': (batches / len(latencies) if batches is not None
+                                else 1.0 if mode == 'sync' else 1 / 32),
+        }
+    finally:
+        storage.close()
+        atexit.unregister(storage.close)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main() -> int:
+    """Запускает бенчмарк и выводит таблицу результатов."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16, 64],
+                        help='числа одновременных покупателей')
+    parser.add_argument('--orders', type=int, default=1000, help='заказов на прогон')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES),
+                        help='режимы записи')
+    parser.add_argument('--db', action='store_true',
+                        help='SQLite вместо журнала (sync и batched совпадают)')
+    args = parser.parse_args()
+    
+    print(f"Хранилище: {'SQLite' if args.db else 'JSON + журнал'}, заказов на прогон: {args.orders}\n")
+    print(f"{'режим':<9}{'потоков':>8}{'заказов/с':>12}{'p50, мс':>10}{'p99, мс':>10}"
+          f"{'fsync/заказ':>13}")
+    print('-' * 62)
+    for mode in args.modes:
+        for threads in args.threads:
+            result = run(mode, threads, max(args.orders, threads), args.db)
+            print(f"{mode:<9}{threads:>8}{result['rate']:>12,.0f}{result['p50']:>10.2f}"
+                  f"{result['p99']:>10.2f}{result['fsync_per_order']:>13.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
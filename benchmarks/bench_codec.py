@@ -0,0 +1,109 @@
+"""
+Бенчмарк кодеков JSON: скорость записи и чтения каталога и истории заказов.
+
+Для каждого установленного кодека (orjson, msgspec, json) измеряет
+сохранение и загрузку через JSONStorage: в словари и сразу в модели
+(типизированные декодеры).
+
+Пример:
+    python benchmarks/bench_codec.py --products 100000 --orders 1000000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Any
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage import JSONStorage
+from storage.codecs import available_codecs, get_codec
+
+
+def make_products(n: int) -> Dict[int, Dict[str, Any]]:
+    """Генерирует n товаров в формате хранилища."""
+    rnd = random.Random(1)
+    return {
+        pid: {
+            'id': pid,
+            'name': f"Товар {pid}",
+            'description': "Описание товара " * 4,
+            'price': round(rnd.uniform(10, 10000), 2),
+            'in_stock': rnd.random() > 0.1,
+            'image': f"images/product_{pid}.jpg" if pid % 3 else None,
+        }
+        for pid in range(1, n + 1)
+    }
+
+
+def make_orders(n: int, products_count: int) -> List[Dict[str, Any]]:
+    """Генерирует n заказов в формате хранилища."""
+    rnd = random.Random(2)
+    return [
+        {
+            'id': oid,
+            'cart': {'items': {
+                str(rnd.randint(1, products_count)): rnd.randint(1, 5)
+                for _ in range(rnd.randint(1, 4))
+            }},
+            'total': round(rnd.uniform(10, 50000), 2),
+            'created_at': f"2024-{oid % 12 + 1:02d}-{oid % 28 + 1:02d}T12:00:00.{oid % 1000000:06d}",
+        }
+        for oid in range(1, n + 1)
+    ]
+
+
+def measure(func: Callable[[], Any]) -> float:
+    """Возвращает время выполнения функции в секундах."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(products_count: int, orders_count: int) -> None:
+    """
+    Запускает бенчмарк и печатает таблицу результатов.
+    
+    Args:
+        products_count: Количество товаров
+        orders_count: Количество заказов
+    """
+    print(f"Подготовка данных: {products_count} товаров, {orders_count} заказов...")
+    products = make_products(products_count)
+    orders = make_orders(orders_count, products_count)
+    
+    header = f"{'кодек':<8} {'операция':<22} {'время, с':>9} {'записей/с':>12} {'размер, МБ':>11}"
+    print(header)
+    print('-' * len(header))
+    
+    for name in available_codecs():
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = JSONStorage(tmp, codec=get_codec(name))
+            cases = [
+                ('товары: запись', products_count, lambda: storage.save_products(products),
+                 storage.products_file),
+                ('товары: чтение', products_count, storage.load_products, None),
+                ('товары: в модели', products_count, storage.load_product_models, None),
+                ('заказы: запись', orders_count, lambda: storage.save_orders(orders),
+                 storage.orders_file),
+                ('заказы: чтение', orders_count, storage.load_orders, None),
+                ('заказы: в модели', orders_count, storage.load_order_models, None),
+            ]
+            for title, count, func, file_path in cases:
+                elapsed = measure(func)
+                size = f"{file_path.stat().st_size / 2 ** 20:.1f}" if file_path else ''
+                print(f"{name:<8} {title:<22} {elapsed:>9.3f} {count / elapsed:>12,.0f} {size:>11}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100000, help='количество товаров')
+    parser.add_argument('--orders', type=int, default=1000000, help='количество заказов')
+    args = parser.parse_args()
+    run(args.products, args.orders)
@@ -0,0 +1,439 @@
+"""
+Нагрузочный бенчмарк веб-приложения.
+
+Создаёт во временной директории синтетический каталог и историю заказов
+заданного размера, запускает настоящее приложение (app.py) и измеряет
+основные маршруты: главную страницу, поиск, добавление в корзину,
+оформление заказа и панель управления. Запросы выполняются через
+тестовый клиент Flask или (--server) по HTTP к локальному WSGI-серверу.
+
+Для каждого сценария выводятся задержки p50/p95/p99, пропускная
+способность и выделения памяти на запрос (отдельным проходом
+с tracemalloc, чтобы не искажать задержки). Результаты можно сохранить
+как базовые (--save) и сравнить с ними следующий запуск (--compare).
+
+Примеры:
+    python benchmarks/bench_http.py --products 10000 --orders 100000 --save baseline.json
+    python benchmarks/bench_http.py --products 10000 --orders 100000 --compare baseline.json
+    python benchmarks/bench_http.py --server --concurrency 8 --scenarios index search
+"""
+
+import argparse
+import atexit
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage import AppendLogStorage
+
+# Слова для названий и описаний товаров (и поисковых запросов)
+WORDS = ['яхта', 'лодка', 'катер', 'парус', 'мотор', 'якорь', 'радар', 'навигация',
+         'yacht', 'boat', 'sail', 'marine', 'engine', 'anchor', 'cruise', 'fishing']
+
+
+# Синтетические данные
+
+def seed(data_dir: str, n_products: int, n_orders: int) -> None:
+    """
+    Заполняет директорию данных каталогом и историей заказов.
+    
+    Args:
+        data_dir: Директория данных
+        n_products: Количество товаров
+        n_orders: Количество заказов
+    """
+    rnd = random.Random(1)
+    products = {}
+    for pid in range(1, n_products + 1):
+        words = rnd.sample(WORDS, 3)
+        products[pid] = {
+            'id': pid,
+            'name': f"{words[0].capitalize()} {words[1]} {pid}",
+            'description': ' '.join(rnd.choices(WORDS, k=12)),
+            'price': round(rnd.uniform(10, 50000), 2),
+            'in_stock': rnd.random() > 0.1,
+            'image': None,
+            'sku': f"SKU-{pid}",
+        }
+    
+    orders = []
+    created = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / max(n_orders, 1)
+    for order_id in range(1, n_orders + 1):
+        created += step
+        items = {rnd.randint(1, n_products): rnd.randint(1, 3) for _ in range(rnd.randint(1, 4))}
+        orders.append({
+            'id': order_id,
+            'cart': {'items': items},
+            'total': round(sum(products[pid]['price'] * qty for pid, qty in items.items()), 2),
+            'created_at': created.isoformat(),
+        })
+    
+    storage = AppendLogStorage(data_dir)
+    storage.save_products(products)
+    storage.save_orders(orders)
+    storage.close()
+
+
+# Клиенты
+
+class TestClientDriver:
+    """Запросы через тестовый клиент Flask (без сети)."""
+    
+    def __init__(self, app: Any):
+        """Создаёт клиента со своей сессией."""
+        self.client = app.test_client()
+    
+    def request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """Выполняет запрос и возвращает код ответа."""
+        response = self.client.open(path, method=method, data=data)
+        response.close()
+        return response.status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Не следовать перенаправлениям: измеряется сам запрос."""
+    
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPDriver:
+    """Запросы по HTTP к локальному серверу (со своими cookie)."""
+    
+    def __init__(self, base_url: str):
+        """Создаёт клиента со своей сессией."""
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect)
+    
+    def request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """Выполняет запрос и возвращает код ответа."""
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+def start_server(app: Any) -> Tuple[str, Callable[[], None]]:
+    """
+    Запускает многопоточный WSGI-сервер Werkzeug на свободном порту.
+    
+    Returns:
+        Базовый URL и функция остановки сервера
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    
+    class QuietHandler(WSGIRequestHandler):
+        """Обработчик без журнала запросов."""
+        
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+
+# Сценарии: функция (клиент, генератор случайных чисел) -> код ответа
+# измеряемого запроса; подготовительные запросы не измеряются
+
+def make_scenarios(n_products: int) -> Dict[str, Tuple[Callable, Callable]]:
+    """
+    Возвращает сценарии: имя -> (подготовка, измеряемый запрос).
+    
+    Подготовка выполняется перед каждым запросом и в замер не входит.
+    """
+    def nothing(client, rnd):
+        pass
+    
+    def add_to_cart(client, rnd):
+        return client.request('POST', '/cart/add',
+                              {'product_id': rnd.randint(1, n_products), 'quantity': 1})
+    
+    return {
+        'index': (nothing, lambda client, rnd: client.request('GET', '/')),
+        'search': (nothing, lambda client, rnd: client.request(
+            'GET', '/search?' + urllib.parse.urlencode({'q': ' '.join(rnd.sample(WORDS, 2))}))),
+        'product': (nothing, lambda client, rnd: client.request(
+            'GET', f'/product/{rnd.randint(1, n_products)}')),
+        'cart_add': (nothing, add_to_cart),
+        'payment': (add_to_cart, lambda client, rnd: client.request(
+            'POST', '/payment', {'payment_method': 'cash'})),
+        'admin': (nothing, lambda client, rnd: client.request('GET', '/admin')),
+        'admin_orders': (nothing, lambda client, rnd: client.request('GET', '/admin/orders')),
+    }
+
+
+# Измерения
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Перцентиль по методу ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_scenario(make_client: Callable[[], Any], scenario: Tuple[Callable, Callable],
+                 requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Выполняет сценарий и измеряет задержки.
+    
+    Args:
+        make_client: Фабрика клиентов (по одному на поток, с входом в админ-панель)
+        scenario: Подготовка и измеряемый запрос
+        requests: Количество измеряемых запросов
+        concurrency: Количество параллельных клиентов
+    
+    Returns:
+        Статистика сценария
+    """
+    prepare, measured = scenario
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0)
+                  for i in range(concurrency)]
+    clients = [make_client() for _ in range(concurrency)]
+    
+    def worker(index: int) -> Tuple[List[float], int]:
+        rnd = random.Random(index)
+        client = clients[index]
+        latencies, errors = [], 0
+        for _ in range(per_worker[index]):
+            prepare(client, rnd)
+            start = time.perf_counter()
+            status = measured(client, rnd)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors += 1
+        return latencies, errors
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+    
+    latencies = sorted(lat for worker_latencies, _ in results for lat in worker_latencies)
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        # Подготовительные запросы входят во время прохода, но не в число запросов
+        'throughput_rps': len(latencies) / wall if wall > 0 else 0.0,
+    }
+
+
+def measure_allocations(make_client: Callable[[], Any], scenario: Tuple[Callable, Callable],
+                        requests: int) -> Dict[str, float]:
+    """
+    Измеряет выделения памяти на запрос (отдельным проходом с tracemalloc).
+    
+    Returns:
+        Средний пик выделенной за запрос памяти и прирост удерживаемой
+        памяти за проход (КБ)
+    """
+    prepare, measured = scenario
+    client = make_client()
+    rnd = random.Random(0)
+    peaks = []
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(requests):
+        prepare(client, rnd)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        measured(client, rnd)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'alloc_peak_kb': sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+        'retained_kb': (current - baseline) / 1024,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Готовит данные, запускает приложение и выполняет сценарии.
+    
+    Returns:
+        Результаты (метаданные запуска и статистика по сценариям)
+    """
+    data_dir = tempfile.mkdtemp(prefix='shop_bench_')
+    # Удаляется при выходе после того, как хранилище приложения сбросит
+    # данные на диск (обработчики atexit выполняются в обратном порядке)
+    atexit.register(shutil.rmtree, data_dir, ignore_errors=True)
+    
+    started = time.perf_counter()
+    seed(data_dir, args.products, args.orders)
+    print(f"Данные: {args.products} товаров, {args.orders} заказов "
+          f"({time.perf_counter() - started:.1f} с)")
+    
+    # Приложение читает директорию данных при импорте
+    os.environ['SHOP_DATA_DIR'] = data_dir
+    started = time.perf_counter()
+    import app as shop
+    print(f"Запуск приложения: {time.perf_counter() - started:.2f} с\n")
+    
+    stop = None
+    if args.server:
+        base_url, stop = start_server(shop.app)
+        
+        def new_driver():
+            return HTTPDriver(base_url)
+    else:
+        def new_driver():
+            return TestClientDriver(shop.app)
+    
+    def make_client():
+        client = new_driver()
+        client.request('POST', '/admin/login', {'password': 'admin'})
+        return client
+    
+    scenarios = make_scenarios(args.products)
+    results: Dict[str, Any] = {}
+    print(HEADER)
+    print('-' * len(HEADER))
+    try:
+        for name in args.scenarios:
+            scenario = scenarios[name]
+            run_scenario(make_client, scenario, args.warmup, args.concurrency)
+            stats = run_scenario(make_client, scenario, args.requests, args.concurrency)
+            if args.alloc_requests:
+                stats.update(measure_allocations(make_client, scenario, args.alloc_requests))
+            results[name] = stats
+            print_row(name, stats)
+    finally:
+        if stop is not None:
+            stop()
+    
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': 'server' if args.server else 'test_client',
+            'products': args.products,
+            'orders': args.orders,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+        },
+        'results': results,
+    }
+
+
+# Отчёт
+
+HEADER = (f"{'сценарий':<14} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} "
+          f"{'запр/с':>9} {'ошибок':>7} {'пик, КБ':>9}")
+
+
+def print_row(name: str, stats: Dict[str, Any]) -> None:
+    """Печатает строку таблицы результатов."""
+    alloc = stats.get('alloc_peak_kb')
+    print(f"{name:<14} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+          f"{stats['throughput_rps']:>9.0f} {stats['errors']:>7} "
+          f"{f'{alloc:.1f}' if alloc is not None else '-':>9}")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Сравнивает результаты с базовыми и печатает изменения.
+    
+    Регрессией считается рост p95 или падение пропускной способности
+    больше чем на threshold процентов.
+    
+    Returns:
+        Список регрессий
+    """
+    base_meta = baseline.get('meta', {})
+    for key in ('mode', 'products', 'orders', 'concurrency'):
+        if base_meta.get(key) != current['meta'][key]:
+            print(f"Внимание: параметр {key} отличается от базового "
+                  f"({base_meta.get(key)} -> {current['meta'][key]})")
+    
+    print(f"\n{'сценарий':<14} {'p95, мс':>20} {'изм.':>8} {'запр/с':>18} {'изм.':>8}")
+    regressions = []
+    for name, stats in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        p95_change = (stats['p95_ms'] / base['p95_ms'] - 1) * 100 if base['p95_ms'] else 0.0
+        rps_change = ((stats['throughput_rps'] / base['throughput_rps'] - 1) * 100
+                      if base['throughput_rps'] else 0.0)
+        regressed = p95_change > threshold or rps_change < -threshold
+        mark = '  <- регрессия' if regressed else ''
+        print(f"{name:<14} {base['p95_ms']:>9.2f} -> {stats['p95_ms']:>6.2f} {p95_change:>+7.1f}% "
+              f"{base['throughput_rps']:>7.0f} -> {stats['throughput_rps']:>6.0f} "
+              f"{rps_change:>+7.1f}%{mark}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=1000, help='количество товаров')
+    parser.add_argument('--orders', type=int, default=10000, help='количество заказов')
+    parser.add_argument('--requests', type=int, default=300, help='запросов на сценарий')
+    parser.add_argument('--warmup', type=int, default=20, help='прогревочных запросов на сценарий')
+    parser.add_argument('--concurrency', type=int, default=1, help='параллельных клиентов')
+    parser.add_argument('--alloc-requests', type=int, default=50,
+                        help='запросов в проходе измерения памяти (0 — не измерять)')
+    parser.add_argument('--server', action='store_true',
+                        help='запросы по HTTP к локальному WSGI-серверу вместо тестового клиента')
+    parser.add_argument('--scenarios', nargs='+', default=list(make_scenarios(1)),
+                        choices=list(make_scenarios(1)), help='сценарии')
+    parser.add_argument('--save', help='сохранить результаты в JSON (базовые значения)')
+    parser.add_argument('--compare', help='сравнить с сохранёнными результатами')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='допустимое ухудшение при сравнении, %%')
+    args = parser.parse_args()
+    
+    # Базовые значения читаются до запуска: ошибка в пути видна сразу
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    results = run(args)
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.save}")
+    
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nРегрессии: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nРегрессий нет")
@@ -0,0 +1,104 @@
+"""
+Бенчмарк памяти: история заказов в объектах и в колонках.
+
+Сравнивает объём памяти, занимаемый историей заказов:
+  - прежние модели (dataclass с __dict__) в OrderIndex;
+  - компактные модели (__slots__) в OrderIndex;
+  - ColumnarOrderStore (массивы array).
+
+Пример:
+    python benchmarks/bench_memory.py --orders 1000000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Any
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Order, Cart, OrderIndex, ColumnarOrderStore
+
+
+@dataclass
+class LegacyCart:
+    """Корзина в прежнем виде (обычный dataclass)."""
+    
+    items: Dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class LegacyOrder:
+    """Заказ в прежнем виде (обычный dataclass)."""
+    
+    id: int
+    cart: LegacyCart
+    total: float
+    created_at: str
+
+
+def generate(n: int, order_cls: Callable = Order, cart_cls: Callable = Cart) -> Iterator[Any]:
+    """Генерирует n заказов с 1-4 позициями, упорядоченных по времени."""
+    rnd = random.Random(1)
+    created = datetime(2020, 1, 1)
+    for order_id in range(1, n + 1):
+        created += timedelta(seconds=rnd.randint(1, 120), microseconds=rnd.randint(0, 999999))
+        items = {rnd.randint(1, 5000): rnd.randint(1, 5) for _ in range(rnd.randint(1, 4))}
+        yield order_cls(order_id, cart_cls(items), round(rnd.uniform(10, 50000), 2),
+                        created.isoformat())
+
+
+def measure(title: str, build: Callable[[], Any], n: int) -> int:
+    """
+    Измеряет память, занятую построенной структурой.
+    
+    Returns:
+        Объём памяти в байтах
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{title:<34} {size / 2 ** 20:>10.1f} {size / n:>12.0f} {elapsed:>10.1f}")
+    del store
+    return size
+
+
+def run(n: int) -> None:
+    """
+    Запускает бенчмарк и печатает таблицу результатов.
+    
+    Args:
+        n: Количество заказов
+    """
+    header = f"{'хранение':<34} {'память, МБ':>10} {'байт/заказ':>12} {'время, с':>10}"
+    print(f"Заказов: {n}")
+    print(header)
+    print('-' * len(header))
+    legacy = measure('dataclass + OrderIndex (прежнее)',
+                     lambda: OrderIndex(generate(n, LegacyOrder, LegacyCart)), n)
+    slotted = measure('__slots__ + OrderIndex',
+                      lambda: OrderIndex(generate(n)), n)
+    columnar = measure('ColumnarOrderStore',
+                       lambda: ColumnarOrderStore(generate(n)), n)
+    print(f"\nЭкономия: __slots__ — в {legacy / slotted:.1f} раза, "
+          f"колонки — в {legacy / columnar:.1f} раза")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=1000000, help='количество заказов')
+    args = parser.parse_args()
+    run(args.orders)
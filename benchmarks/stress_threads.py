@@ -0,0 +1,263 @@
+"""
+Многопоточный стресс-тест DataManager.
+
+Одновременно работают потоки разных ролей, как запросы многопоточного
+WSGI-сервера:
+  - редакторы обновляют товары целиком (все поля — одной версией);
+  - покупатели оформляют заказы;
+  - администраторы добавляют товары;
+  - читатели проверяют перед «запросом» изменения (refresh_if_changed)
+    и читают каталог, заказы и статистику продаж.
+
+Читатели проверяют, что не видят «разорванных» данных: поля товара
+принадлежат одной версии, снимок каталога согласован, статистика
+не противоречит сама себе. В конце проверяется, что ID заказов
+и товаров не повторяются и что данные в памяти совпадают с тем,
+что прочитает новый процесс (ни одно изменение не потеряно).
+Код выхода 1, если найдено нарушение.
+
+Примеры:
+    python benchmarks/stress_threads.py --threads 64 --seconds 10
+    python benchmarks/stress_threads.py --db --columnar
+    python benchmarks/stress_threads.py --group-commit
+"""
+
+import argparse
+import atexit
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_manager import DataManager
+from models import Cart, Product
+from storage import AppendLogStorage, IStorage, SQLiteStorage
+
+
+class Stress:
+    """Общее состояние стресс-теста: результаты потоков и найденные нарушения."""
+    
+    def __init__(self, data_manager: DataManager, seconds: float):
+        """
+        Инициализирует тест.
+        
+        Args:
+            data_manager: Проверяемый менеджер данных
+            seconds: Длительность нагрузки
+        """
+        self.dm = data_manager
+        self.deadline = time.monotonic() + seconds
+        self.lock = threading.Lock()
+        self.errors: List[str] = []
+        self.order_ids: List[int] = []
+        self.product_ids: List[int] = []
+        self.operations: Counter = Counter()
+    
+    def running(self) -> bool:
+        """Продолжается ли нагрузка (и не найдено ли нарушений)."""
+        return time.monotonic() < self.deadline and not self.errors
+    
+    def fail(self, message: str) -> None:
+        """Записывает нарушение."""
+        with self.lock:
+            if len(self.errors) < 20:
+                self.errors.append(message)
+    
+    def count(self, role: str, n: int) -> None:
+        """Учитывает выполненные операции."""
+        with self.lock:
+            self.operations[role] += n
+
+
+def product_version(product_id: int, version: int) -> Dict[str, Any]:
+    """Поля товара версии version: по любому полю можно узнать версию."""
+    return {
+        'name': f"Товар {product_id} v{version}",
+        'description': f"v{version}",
+        'price': float(version),
+        'in_stock': version % 2 == 0,
+        'sku': f"SKU-{product_id}-{version}",
+    }
+
+
+def check_product(product: Product) -> bool:
+    """Проверяет, что все поля товара принадлежат одной версии."""
+    version = int(product.price)
+    expected = product_version(product.id, version)
+    if product.name.startswith('Новый'):
+        return True
+    return all(getattr(product, field) == value for field, value in expected.items())
+
+
+def editor(test: Stress, seed: int) -> None:
+    """Обновляет случайные товары целиком."""
+    rnd = random.Random(seed)
+    n = 0
+    while test.running():
+        catalog = test.dm.get_catalog()
+        product = rnd.choice(catalog.all_products)
+        if product.name.startswith('Новый'):
+            continue
+        test.dm.update_product(product.id, **product_version(product.id, int(product.price) + 1))
+        n += 1
+    test.count('editor', n)
+
+
+def buyer(test: Stress, seed: int) -> None:
+    """Оформляет заказы."""
+    rnd = random.Random(seed)
+    ids = []
+    while test.running():
+        catalog = test.dm.get_catalog()
+        items = {p.id: rnd.randint(1, 3) for p in rnd.sample(catalog.all_products, 2)}
+        ids.append(test.dm.create_order(Cart(items), catalog).id)
+    with test.lock:
+        test.order_ids.extend(ids)
+    test.count('buyer', len(ids))
+
+
+def admin(test: Stress, seed: int) -> None:
+    """Добавляет товары."""
+    ids = []
+    while test.running():
+        product = test.dm.add_product(Product(id=0, name=f"Новый {seed}-{len(ids)}",
+                                              description='', price=0.0))
+        ids.append(product.id)
+        time.sleep(0.001)
+    with test.lock:
+        test.product_ids.extend(ids)
+    test.count('admin', len(ids))
+
+
+def reader(test: Stress, seed: int) -> None:
+    """Читает каталог, заказы и статистику, проверяя их согласованность."""
+    rnd = random.Random(seed)
+    n = 0
+    while test.running():
+        test.dm.refresh_if_changed()
+        catalog = test.dm.get_catalog()
+        if len(catalog.all_products) != len(catalog):
+            test.fail(f"снимок каталога v{catalog.version}: {len(catalog.all_products)} "
+                      f"товаров в списке, {len(catalog)} в словаре")
+        for product in rnd.sample(catalog.all_products, min(20, len(catalog))):
+            if not check_product(product):
+                test.fail(f"разорванное чтение товара: {product}")
+            if catalog.get(product.id) is not product:
+                test.fail(f"товар {product.id} не совпадает в снимке v{catalog.version}")
+        
+        metrics = test.dm.get_sales_metrics()
+        daily_orders = sum(int(bucket[0]) for bucket in metrics.daily.values())
+        if daily_orders != metrics.orders_count:
+            test.fail(f"статистика: {metrics.orders_count} заказов, по дням {daily_orders}")
+        
+        if n % 10 == 0:
+            for order in test.dm.get_orders_page(None, 20):
+                if test.dm.get_order(order.id) is None:
+                    test.fail(f"заказ {order.id} есть на странице, но не находится по ID")
+        n += 1
+    test.count('reader', n)
+
+
+ROLES: Dict[str, Callable[[Stress, int], None]] = {
+    'editor': editor, 'buyer': buyer, 'admin': admin, 'reader': reader,
+}
+
+
+def verify(test: Stress, storage_factory: Callable[[], IStorage]) -> None:
+    """Проверяет итог: уникальность ID и совпадение памяти с хранилищем."""
+    dm = test.dm
+    for kind, ids in (('заказов', test.order_ids), ('товаров', test.product_ids)):
+        duplicates = [i for i, count in Counter(ids).items() if count > 1]
+        if duplicates:
+            test.fail(f"повторяющиеся ID {kind}: {duplicates[:10]}")
+    
+    metrics = dm.get_sales_metrics()
+    if metrics.orders_count != len(test.order_ids):
+        test.fail(f"статистика учла {metrics.orders_count} заказов из {len(test.order_ids)}")
+    
+    # Новый «процесс» читает то же хранилище: ничего не должно потеряться
+    fresh_storage = storage_factory()
+    try:
+        fresh = DataManager(storage=fresh_storage)
+        stored_ids = sorted(order.id for order in fresh.get_all_orders())
+        if stored_ids != sorted(test.order_ids):
+            test.fail(f"в хранилище {len(stored_ids)} заказов, создано {len(test.order_ids)}")
+        if dict(fresh.get_catalog()) != dict(dm.get_catalog()):
+            lost = [pid for pid, p in dm.get_catalog().items() if fresh.get_product(pid) != p]
+            test.fail(f"каталог в памяти и в хранилище расходится: товары {lost[:10]}")
+    finally:
+        fresh_storage.close()
+
+
+def main() -> int:
+    """Запускает стресс-тест и выводит итог."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32, help='количество потоков')
+    parser.add_argument('--seconds', type=float, default=5.0, help='длительность нагрузки')
+    parser.add_argument('--products', type=int, default=200, help='размер каталога')
+    parser.add_argument('--db', action='store_true', help='SQLite вместо JSON-файлов')
+    parser.add_argument('--columnar', action='store_true', help='ColumnarOrderStore для заказов')
+    parser.add_argument('--group-commit', action='store_true',
+                        help='запись заказов фоновым потоком пакетами (GroupCommitWriter)')
+    parser.add_argument('--switch-interval', type=float, default=1e-5,
+                        help='интервал переключения потоков интерпретатора (с); '
+                             'маленькое значение чаще прерывает потоки посреди операций')
+    args = parser.parse_args()
+    
+    data_dir = tempfile.mkdtemp(prefix='shop_stress_')
+    # Регистрируется до создания хранилищ: atexit выполняется в обратном
+    # порядке, и директория удаляется после их закрытия
+    atexit.register(shutil.rmtree, data_dir, True)
+    if args.db:
+        storage_factory = lambda: SQLiteStorage(str(Path(data_dir) / 'shop.db'))
+    else:
+        storage_factory = lambda: AppendLogStorage(data_dir)
+    storage = storage_factory()
+    try:
+        dm = DataManager(storage=storage, columnar_orders=args.columnar,
+                         group_commit=args.group_commit)
+        dm.bulk_upsert_products(product_version(i, 0) for i in range(1, args.products + 1))
+        dm.get_order_index()
+        
+        sys.setswitchinterval(args.switch_interval)
+        test = Stress(dm, args.seconds)
+        roles = ['reader', 'editor', 'buyer', 'reader', 'buyer', 'editor', 'reader', 'admin']
+        threads = [threading.Thread(target=ROLES[roles[i % len(roles)]], args=(test, i))
+                   for i in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        sys.setswitchinterval(0.005)
+        
+        verify(test, storage_factory)
+    finally:
+        storage.close()
+    
+    print(f"Хранилище: {'SQLite' if args.db else 'JSON + журнал'}"
+          f"{', групповая фиксация' if args.group_commit else ''}, потоков: {args.threads}, "
+          f"{elapsed:.1f} с")
+    for role, n in sorted(test.operations.items()):
+        print(f"  {role:<8} {n:>8} операций ({n / elapsed:,.0f}/с)")
+    if test.errors:
+        print("\nНарушения:")
+        for message in test.errors:
+            print(f"  [!] {message}")
+        return 1
+    print("\n[OK] Разорванных чтений, повторяющихся ID и потерянных изменений не найдено")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Кэширование отрисованного HTML."""
+
+from .fragment_cache import FragmentCache
+from .page_cache import CachedPage, PageCache
+
+__all__ = ['FragmentCache', 'CachedPage', 'PageCache']
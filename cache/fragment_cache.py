@@ -0,0 +1,158 @@
+"""Кэш отрисованных HTML-фрагментов товаров (карточки, страницы товара)."""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+# Ключ фрагмента: (вид фрагмента, ID товара, валюта)
+FragmentKey = Tuple[str, int, str]
+
+
+class FragmentCache:
+    """
+    LRU-кэш HTML-фрагментов с ограничением по памяти.
+    
+    Фрагмент принадлежит одному товару и хранится по ключу
+    (вид фрагмента, ID товара, валюта) вместе с версией товара,
+    для которой он отрисован. Версия товара — сам объект Product:
+    товары неизменяемы, и каждое изменение создаёт новый объект,
+    поэтому фрагмент, отрисованный для другой версии, считается
+    промахом и перерисовывается. Кроме того, DataManager сообщает
+    об изменённых товарах (invalidate), и их фрагменты удаляются
+    сразу, не дожидаясь вытеснения. Если фрагмент зависит и от других
+    данных (например, от записи манифеста изображений), их версия
+    передаётся в extra_version и тоже сравнивается.
+    
+    Фрагменты не должны зависеть от пользователя (корзина, сессия).
+    """
+    
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Инициализирует кэш.
+        
+        Args:
+            max_bytes: Бюджет памяти на фрагменты в байтах (0 — кэш выключен)
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Ключ -> (версия товара, HTML, размер в байтах, дополнительная версия)
+        self._entries: 'OrderedDict[FragmentKey, Tuple[Any, str, int, Hashable]]' = OrderedDict()
+        self._by_product: Dict[int, Set[FragmentKey]] = {}
+        self._bytes = 0
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._evictions = 0
+    
+    def get_or_render(self, kind: str, product: Any, currency: str,
+                      render: Callable[[], str], extra_version: Hashable = None) -> str:
+        """
+        Возвращает фрагмент из кэша или отрисовывает и сохраняет его.
+        
+        Args:
+            kind: Вид фрагмента ('card', 'detail', ...)
+            product: Товар (его версия)
+            currency: Код валюты
+            render: Функция отрисовки фрагмента
+            extra_version: Версия других данных фрагмента (например,
+                хэш записи манифеста изображений)
+        
+        Returns:
+            HTML фрагмента
+        """
+        if self.max_bytes <= 0:
+            return render()
+        
+        key = (kind, product.id, currency)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is not None and (entry[0] is product or entry[0] == product)
+                    and entry[3] == extra_version):
+                self._entries.move_to_end(key)
+                self._hits[kind] = self._hits.get(kind, 0) + 1
+                return entry[1]
+            self._misses[kind] = self._misses.get(kind, 0) + 1
+        
+        # Отрисовка вне блокировки: одновременные промахи по одному ключу
+        # просто отрисуют фрагмент дважды
+        html = render()
+        self._store(key, product, html, extra_version)
+        return html
+    
+    def _store(self, key: FragmentKey, product: Any, html: str,
+               extra_version: Hashable = None) -> None:
+        """Сохраняет фрагмент и вытесняет давно неиспользуемые сверх бюджета."""
+        size = sys.getsizeof(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (product, html, size, extra_version)
+            self._by_product.setdefault(key[1], set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self._evictions += 1
+    
+    def _discard(self, key: FragmentKey) -> None:
+        """Удаляет фрагмент (вызывается под блокировкой)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        keys = self._by_product.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_product[key[1]]
+    
+    def invalidate(self, product_ids: Iterable[int]) -> None:
+        """Удаляет все фрагменты указанных товаров."""
+        with self._lock:
+            for product_id in product_ids:
+                for key in list(self._by_product.get(product_id, ())):
+                    self._discard(key)
+    
+    def clear(self) -> None:
+        """Удаляет все фрагменты."""
+        with self._lock:
+            self._entries.clear()
+            self._by_product.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику кэша.
+        
+        Returns:
+            Словарь: hits, misses, hit_rate, evictions, entries, bytes,
+            max_bytes и by_kind — попадания и промахи по видам фрагментов
+        """
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            kinds = sorted(set(self._hits) | set(self._misses))
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'by_kind': {kind: {'hits': self._hits.get(kind, 0),
+                                   'misses': self._misses.get(kind, 0)} for kind in kinds},
+            }
+    
+    def metrics(self) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """Статистика для MetricsRegistry.add_collector (формат Prometheus)."""
+        stats = self.stats()
+        samples = []
+        for kind, counts in stats['by_kind'].items():
+            samples.append(('shop_fragment_cache_hits_total', 'counter', {'kind': kind}, counts['hits']))
+            samples.append(('shop_fragment_cache_misses_total', 'counter', {'kind': kind}, counts['misses']))
+        samples.append(('shop_fragment_cache_evictions_total', 'counter', {}, stats['evictions']))
+        samples.append(('shop_fragment_cache_entries', 'gauge', {}, stats['entries']))
+        samples.append(('shop_fragment_cache_bytes', 'gauge', {}, stats['bytes']))
+        return samples
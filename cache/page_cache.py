@@ -0,0 +1,153 @@
+"""Кэш целых HTML-страниц, не зависящих от пользователя."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+# Оценка памяти на запись без содержимого (ключ, ETag, версия)
+ENTRY_OVERHEAD = 256
+
+
+class CachedPage(NamedTuple):
+    """Отрисованная страница (или только её валидаторы) для условных запросов."""
+    version: Hashable
+    body: Optional[bytes]
+    etag: str
+    last_modified: datetime
+    content_type: str
+
+
+class PageCache:
+    """
+    LRU-кэш целых страниц с ограничением по памяти.
+    
+    Страница хранится по ключу (путь и параметры запроса) вместе
+    с версией данных, из которых она отрисована (например, версией
+    каталога или товара); при другой версии запись считается промахом.
+    ETag — хэш содержимого, поэтому он совпадает у всех процессов,
+    отрисовавших одинаковую страницу, а Last-Modified — время
+    изменения данных.
+    
+    Содержимое можно хранить только у страниц, одинаковых для всех
+    посетителей: без корзины, сообщений и признаков администратора.
+    Для остальных запоминаются только валидаторы (keep_body=False):
+    их достаточно, чтобы ответить 304 без отрисовки.
+    """
+    
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Инициализирует кэш.
+        
+        Args:
+            max_bytes: Бюджет памяти на страницы в байтах (0 — кэш выключен)
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Ключ -> (страница, размер в байтах)
+        self._entries: 'OrderedDict[str, Tuple[CachedPage, int]]' = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """Включён ли кэш."""
+        return self.max_bytes > 0
+    
+    def get(self, key: str, version: Hashable) -> Optional[CachedPage]:
+        """
+        Возвращает страницу, отрисованную для версии version.
+        
+        Args:
+            key: Ключ страницы
+            version: Текущая версия данных
+        
+        Returns:
+            Страница или None (промах)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0].version == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            return None
+    
+    def put(self, key: str, version: Hashable, body: bytes, content_type: str,
+            changed_at: float, keep_body: bool = True) -> CachedPage:
+        """
+        Сохраняет отрисованную страницу.
+        
+        Args:
+            key: Ключ страницы
+            version: Версия данных, из которых отрисована страница
+            body: Содержимое ответа
+            content_type: Заголовок Content-Type
+            changed_at: Время изменения данных (Unix time) для Last-Modified
+            keep_body: Хранить содержимое (иначе только валидаторы)
+        
+        Returns:
+            Запись кэша с вычисленными ETag и Last-Modified (с содержимым)
+        """
+        page = CachedPage(
+            version=version,
+            body=body,
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            last_modified=datetime.fromtimestamp(int(changed_at), timezone.utc),
+            content_type=content_type,
+        )
+        stored = page if keep_body else page._replace(body=None)
+        size = len(key) + ENTRY_OVERHEAD + (len(body) if keep_body else 0)
+        if not self.enabled or size > self.max_bytes:
+            return page
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (stored, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, oldest_size) = self._entries.popitem(last=False)
+                self._bytes -= oldest_size
+                self._evictions += 1
+        return page
+    
+    def clear(self) -> None:
+        """Удаляет все страницы."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику кэша.
+        
+        Returns:
+            Словарь: hits, misses, hit_rate, evictions, entries, bytes, max_bytes
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / total if total else 0.0,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+    
+    def metrics(self) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """Статистика для MetricsRegistry.add_collector (формат Prometheus)."""
+        stats = self.stats()
+        return [
+            ('shop_page_cache_hits_total', 'counter', {}, stats['hits']),
+            ('shop_page_cache_misses_total', 'counter', {}, stats['misses']),
+            ('shop_page_cache_evictions_total', 'counter', {}, stats['evictions']),
+            ('shop_page_cache_entries', 'gauge', {}, stats['entries']),
+            ('shop_page_cache_bytes', 'gauge', {}, stats['bytes']),
+        ]
@@ -4,79 +4,358 @@
 Использует репозитории для разделения ответственности (SOLID).
 """
 
-from typing import Dict, List, Optional
-from models import Product, Order, Cart
-from storage import IStorage, JSONStorage
-from repositories import ProductRepository, OrderRepository, CartRepository
+import atexit
+import threading
+import time
+from dataclasses import replace
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional,
+                    Tuple, Union)
+from models import Product, Order, Cart, CatalogSnapshot, OrderIndex, ColumnarOrderStore
+from models.order_index import Timestamp, timestamp_key
+from storage import IStorage, AppendLogStorage, ICartStore, GroupCommitWriter
+from repositories import ProductRepository, OrderRepository, CartRepository, MetricsRepository
+from search import SearchIndex
+from services.sales_metrics import SalesMetrics
+
+
+class DataVersion(NamedTuple):
+    """Версия данных: номер изменения и его время (Unix time)."""
+    number: int
+    changed_at: float
 
 
 class DataManager:
-    """Класс для управления всеми данными интернет-магазина."""
+    """
+    Класс для управления всеми данными интернет-магазина.
+    
+    Товары кэшируются в памяти процесса. История заказов при запуске
+    не загружается: известен только наибольший ID, отдельные заказы
+    и страницы читаются из хранилища по запросу, а полный индекс заказов
+    строится при первом обращении к нему. Если с хранилищем работают
+    несколько процессов (воркеры gunicorn), изменения выполняются под
+    блокировкой хранилища, ID выделяются хранилищем, а refresh_if_changed()
+    перечитывает товары или заказы, изменённые другими процессами.
+    
+    Модель потоков (многопоточные WSGI-серверы): читатели не берут
+    блокировок и работают с опубликованными неизменяемыми снимками —
+    каталог (CatalogSnapshot из неизменяемых Product) и статистика продаж
+    заменяются целиком одним присваиванием, поэтому чтение никогда
+    не видит наполовину обновлённых данных. Все изменения (включая
+    перечитывание данных других процессов и первую загрузку индекса
+    заказов) выполняются под одной блокировкой записи, которая
+    захватывается раньше блокировки хранилища; новая версия
+    публикуется до её освобождения, поэтому изменения не теряются,
+    а ID выдаются без повторов.
+    
+    Каждое изменение товаров или заказов (своё или прочитанное у других
+    процессов) увеличивает номер версии этого вида данных, а для товаров —
+    и версию каждого изменённого товара (get_version). По версиям
+    веб-приложение отвечает на условные запросы, не отрисовывая страницы.
+    Номера версий действуют только внутри процесса.
+    """
     
-    def __init__(self, storage: Optional[IStorage] = None):
+    # Статистика продаж сохраняется раз в столько заказов, после свёртки
+    # журнала заказов и при завершении; при перезапуске недостающие
+    # заказы досчитываются по истории
+    METRICS_SAVE_INTERVAL = 100
+    # Изменяемые поля товара
+    PRODUCT_FIELDS = ('name', 'description', 'price', 'in_stock', 'image', 'sku')
+    
+    def __init__(self, storage: Optional[IStorage] = None,
+                 cart_store: Optional[ICartStore] = None,
+                 columnar_orders: bool = False,
+                 group_commit: bool = False):
         """
         Инициализирует менеджер данных.
         
         Args:
-            storage: Экземпляр хранилища. Если None, создаётся новый JSONStorage
+            storage: Экземпляр хранилища. Если None, создаётся новый AppendLogStorage
+            cart_store: Хранилище корзин по сессиям. Если None, используется
+                одна общая корзина из storage (консольный режим)
+            columnar_orders: Хранить историю заказов в колонках
+                (ColumnarOrderStore) — в несколько раз меньше памяти,
+                объекты Order создаются при чтении
+            group_commit: Записывать заказы фоновым потоком пакетами
+                с fsync (GroupCommitWriter); create_order ждёт записи
+                своего пакета. Только для одного процесса
         """
-        self.storage = storage or JSONStorage()
+        self.storage = storage or AppendLogStorage()
         
         # Инициализируем репозитории (Dependency Injection)
         self.product_repo = ProductRepository(self.storage)
         self.order_repo = OrderRepository(self.storage)
-        self.cart_repo = CartRepository(self.storage)
+        self.cart_repo = CartRepository(self.storage, cart_store)
+        self.metrics_repo = MetricsRepository(self.storage)
         
-        self._products: Dict[int, Product] = {}
-        self._orders: List[Order] = []
+        self._catalog = CatalogSnapshot({})
+        self.search_index = SearchIndex()
+        self._order_store = ColumnarOrderStore if columnar_orders else OrderIndex
+        # Индекс всех заказов; None — ещё не загружен (см. get_order_index)
+        self._orders: Optional[Union[OrderIndex, ColumnarOrderStore]] = None
+        self._last_order_id = 0
         self._next_product_id = 1
         self._next_order_id = 1
+        self._sales_metrics = SalesMetrics()
+        self._unsaved_metrics = 0
+        # ID, после учёта которого статистика сохраняется вне очереди:
+        # наибольший ID свёрнутого снимка (None — не нужно, см. _on_compact)
+        self._metrics_save_at: Optional[int] = None
+        # Снимок статистики для читателей; None — устарел (см. get_sales_metrics)
+        self._metrics_view: Optional[SalesMetrics] = None
+        # Метки версий данных, соответствующие содержимому кэша
+        self._generations: Dict[str, Any] = {}
+        # Блокировка записи: изменения и публикация новых версий данных
+        self._write_lock = threading.RLock()
+        # Подписчики на изменения товаров (например, кэш HTML-фрагментов)
+        self._product_listeners: List[Callable[[List[int]], None]] = []
+        # Версии данных по видам и по товарам (см. get_version)
+        started_at = time.time()
+        self._versions: Dict[str, DataVersion] = {kind: DataVersion(0, started_at)
+                                                  for kind in ('products', 'orders')}
+        self._product_versions: Dict[int, DataVersion] = {}
+        
+        # Фоновая запись заказов пакетами (None — заказ пишется в create_order)
+        self.order_writer: Optional[GroupCommitWriter] = None
+        # Записанные пакетами заказы, ждущие учёта в статистике по порядку
+        # ID (None — заказ не записан), и последний учтённый ID
+        self._unrecorded: Dict[int, Optional[Tuple[Order, Mapping[int, Product]]]] = {}
+        self._recorded_order_id = 0
         
         # Загружаем данные при инициализации
         self.load_all_data()
+        
+        if isinstance(self.storage, AppendLogStorage):
+            self.storage.on_compact = self._on_compact
+        # Регистрируется до потока записи: atexit выполняется в обратном
+        # порядке, и статистика сохраняется после записи очереди заказов
+        atexit.register(self.close)
+        if group_commit:
+            self._recorded_order_id = self._next_order_id - 1
+            self.order_writer = GroupCommitWriter(
+                lambda orders: self.order_repo.save_many(orders, sync=True)
+            )
     
     def load_all_data(self) -> None:
         """Загружает все данные из хранилища."""
-        self._products = self.product_repo.get_all()
+        with self._write_lock:
+            self._load_products()
+            
+            # Заказы не загружаются: достаточно наибольшего ID. Метка
+            # запоминается до чтения: изменение во время чтения будет
+            # замечено при следующей проверке
+            self._generations['orders'] = self.storage.generation('orders')
+            self._orders = None
+            self._last_order_id = self.order_repo.get_max_id()
+            self._next_order_id = self._last_order_id + 1
+            
+            self._sales_metrics = self._load_sales_metrics()
+            self._metrics_view = None
+            self._bump_version('orders')
+    
+    def _load_products(self) -> None:
+        """Загружает товары и публикует новый снимок каталога (под блокировкой записи)."""
+        self._generations['products'] = self.storage.generation('products')
+        products = self.product_repo.get_all()
+        previous = self._catalog
+        self._catalog = CatalogSnapshot(products, previous.version + 1)
+        self.search_index.rebuild(products.values())
+        self._notify_products([pid for pid in products.keys() | previous.keys()
+                               if products.get(pid) != previous.get(pid)])
         
         # Определяем следующий ID для товаров
-        if self._products:
-            self._next_product_id = max(self._products.keys()) + 1
+        if products:
+            self._next_product_id = max(products.keys()) + 1
+    
+    def _load_new_orders(self) -> None:
+        """
+        Дочитывает заказы, созданные другими процессами.
         
-        self._orders = self.order_repo.get_all()
+        Читаются только заказы новее последнего известного; они
+        добавляются в статистику и (если он загружен) в индекс заказов.
+        Вызывается под блокировкой записи.
+        """
+        self._generations['orders'] = self.storage.generation('orders')
+        for order in self.order_repo.get_after(self._last_order_id):
+            if self._orders is not None:
+                self._orders.add(order)
+            self._sales_metrics.record(order, self._catalog)
+            self._last_order_id = order.id
+            self._unsaved_metrics += 1
+        self._next_order_id = max(self._next_order_id, self._last_order_id + 1)
+        self._metrics_view = None
+        self._bump_version('orders')
+    
+    def _changed_kinds(self) -> List[str]:
+        """Возвращает виды данных, изменённые в хранилище после последнего чтения."""
+        changed = []
+        for kind in ('products', 'orders'):
+            if kind == 'orders' and self.order_writer is not None:
+                # С групповой фиксацией заказы пишет только этот процесс,
+                # а файл заказов меняется при каждой записи пакета
+                continue
+            generation = self.storage.generation(kind)
+            if generation is not None and generation != self._generations.get(kind):
+                changed.append(kind)
+        return changed
+    
+    def refresh_if_changed(self) -> bool:
+        """
+        Перечитывает данные, изменённые другими процессами.
         
-        # Определяем следующий ID для заказов
-        if self._orders:
-            self._next_order_id = max(o.id for o in self._orders) + 1
+        Проверка дешёвая (метки версий хранилища, например mtime и размер
+        файлов) и выполняется без блокировки, поэтому её можно делать
+        перед каждым запросом; перечитывание идёт под блокировкой записи
+        с повторной проверкой, чтобы одновременные запросы не перечитывали
+        одни и те же данные.
+        
+        Returns:
+            True если что-то было перечитано
+        """
+        if not self._changed_kinds():
+            return False
+        with self._write_lock:
+            changed = self._changed_kinds()
+            if 'products' in changed:
+                self._load_products()
+            if 'orders' in changed:
+                self._load_new_orders()
+        return bool(changed)
+    
+    def _remember_generation(self, kind: str) -> None:
+        """Запоминает версию данных после собственного изменения (под блокировкой)."""
+        self._generations[kind] = self.storage.generation(kind)
+    
+    def _load_sales_metrics(self) -> SalesMetrics:
+        """
+        Загружает сохранённую статистику продаж и досчитывает новые заказы.
+        
+        Читаются только заказы новее сохранённой статистики. Если
+        статистики нет или она не согласуется с историей заказов,
+        она пересчитывается по всей истории (один раз) и сохраняется.
+        """
+        metrics = self.metrics_repo.load()
+        if metrics is not None and metrics.last_order_id <= self._last_order_id:
+            for order in self.order_repo.get_after(metrics.last_order_id):
+                metrics.record(order, self._catalog)
+            return metrics
+        
+        metrics = SalesMetrics.rebuild(self.order_repo.get_all(), self._catalog)
+        self.metrics_repo.save(metrics)
+        return metrics
     
     def save_all_data(self) -> None:
         """Сохраняет все данные в хранилище."""
-        self.product_repo.save_all(self._products)
-        self.order_repo.save_all(self._orders)
+        with self._write_lock:
+            # Снимок истории не должен опередить заказы в очереди записи;
+            # поток записи берёт блокировку хранилища, поэтому ждём до неё
+            if self.order_writer is not None:
+                self.order_writer.flush()
+            with self.storage.lock():
+                self.product_repo.save_all(dict(self._catalog))
+                # Заказы сохраняются при создании; снимок пишется, только если
+                # история загружена в память
+                if self._orders is not None:
+                    self.order_repo.save_all(self._orders.all())
+                self.metrics_repo.save(self._sales_metrics)
     
     # Работа с товарами
-    def get_all_products(self) -> Dict[int, Product]:
-        """Возвращает все товары."""
-        return self._products.copy()
+    def get_catalog(self) -> CatalogSnapshot:
+        """
+        Возвращает текущий снимок каталога.
+        
+        Снимок неизменяем и разделяется между всеми запросами без
+        копирования; при изменении каталога публикуется новый снимок.
+        """
+        return self._catalog
+    
+    def get_all_products(self) -> Mapping[int, Product]:
+        """Возвращает все товары (снимок каталога только для чтения)."""
+        return self._catalog
     
     def get_product(self, product_id: int) -> Optional[Product]:
         """Возвращает товар по ID."""
-        return self._products.get(product_id)
+        return self._catalog.get(product_id)
+    
+    def _publish(self, changes: Dict[int, Optional[Product]]) -> None:
+        """
+        Публикует новый снимок каталога с указанными изменениями.
+        
+        Вызывается под блокировкой записи: иначе два писателя, собравшие
+        снимки из одной версии, потеряли бы изменения друг друга.
+        """
+        self._catalog = self._catalog.replace(changes)
+        self._notify_products(list(changes))
+    
+    def subscribe_products(self, listener: Callable[[List[int]], None]) -> None:
+        """
+        Подписывает на изменения товаров.
+        
+        Подписчик вызывается после публикации нового снимка каталога
+        (под блокировкой записи) со списком ID добавленных, изменённых
+        и удалённых товаров, в том числе изменённых другими процессами.
+        
+        Args:
+            listener: Функция, принимающая список ID товаров
+        """
+        self._product_listeners.append(listener)
+    
+    def _notify_products(self, product_ids: List[int]) -> None:
+        """Увеличивает версии изменённых товаров и сообщает о них подписчикам."""
+        if not product_ids:
+            return
+        version = self._bump_version('products')
+        for product_id in product_ids:
+            self._product_versions[product_id] = version
+        for listener in self._product_listeners:
+            listener(product_ids)
+    
+    def _bump_version(self, kind: str) -> DataVersion:
+        """Увеличивает версию вида данных (под блокировкой записи)."""
+        current = self._versions.get(kind)
+        version = DataVersion(current.number + 1 if current else 1, time.time())
+        self._versions[kind] = version
+        return version
+    
+    def get_version(self, kind: str, product_id: Optional[int] = None) -> DataVersion:
+        """
+        Возвращает версию данных.
+        
+        Версия меняется при каждом изменении данных этого вида, в том
+        числе при перечитывании изменений других процессов; одинаковая
+        версия означает одинаковые данные (в пределах процесса).
+        
+        Args:
+            kind: Вид данных ('products' или 'orders')
+            product_id: ID товара — версия одного товара (только для 'products');
+                для несуществующего товара — версия каталога
+        
+        Returns:
+            Номер версии и время изменения
+        """
+        if product_id is not None:
+            version = self._product_versions.get(product_id)
+            if version is not None:
+                return version
+        return self._versions[kind]
     
     def add_product(self, product: Product) -> Product:
         """
         Добавляет новый товар.
         
         Args:
-            product: Товар для добавления (ID будет перезаписан)
-            
+            product: Товар для добавления (ID не используется)
+        
         Returns:
-            Товар с присвоенным ID
+            Копия товара с присвоенным ID
         """
-        product.id = self._next_product_id
-        self._next_product_id += 1
-        self._products[product.id] = product
-        self.product_repo.save(product)
+        with self._write_lock, self.storage.lock():
+            self.refresh_if_changed()
+            product = replace(product, id=self.storage.allocate_id('products', self._next_product_id - 1))
+            self._next_product_id = product.id + 1
+            self.product_repo.save(product)
+            self._remember_generation('products')
+            self._publish({product.id: product})
+            self.search_index.add(product)
         return product
     
     def update_product(self, product_id: int, **kwargs) -> Optional[Product]:
@@ -85,27 +364,24 @@ class DataManager:
         
         Args:
             product_id: ID товара
-            **kwargs: Поля для обновления (name, description, price, in_stock)
-            
+            **kwargs: Поля для обновления (name, description, price, in_stock, image, sku)
+        
         Returns:
             Обновлённый товар или None, если товар не найден
         """
-        if product_id not in self._products:
-            return None
-        
-        product = self._products[product_id]
-        if 'name' in kwargs:
-            product.name = kwargs['name']
-        if 'description' in kwargs:
-            product.description = kwargs['description']
-        if 'price' in kwargs:
-            product.price = kwargs['price']
-        if 'in_stock' in kwargs:
-            product.in_stock = kwargs['in_stock']
-        if 'image' in kwargs:
-            product.image = kwargs['image']
-        
-        self.product_repo.save(product)
+        with self._write_lock, self.storage.lock():
+            self.refresh_if_changed()
+            current = self._catalog.get(product_id)
+            if current is None:
+                return None
+            
+            # Товары в опубликованном снимке не изменяются: создаём новую версию
+            product = replace(current, **{k: v for k, v in kwargs.items() if k in self.PRODUCT_FIELDS})
+            
+            self.product_repo.save(product)
+            self._remember_generation('products')
+            self._publish({product_id: product})
+            self.search_index.add(product)
         return product
     
     def delete_product(self, product_id: int) -> bool:
@@ -114,55 +390,339 @@ class DataManager:
         
         Args:
             product_id: ID товара
-            
+        
         Returns:
             True если товар удалён, False если не найден
         """
-        if product_id in self._products:
-            if self.product_repo.delete(product_id):
-                del self._products[product_id]
-                return True
-        return False
+        with self._write_lock, self.storage.lock():
+            self.refresh_if_changed()
+            if product_id not in self._catalog or not self.product_repo.delete(product_id):
+                return False
+            self._remember_generation('products')
+            self._publish({product_id: None})
+            self.search_index.remove(product_id)
+        return True
+    
+    def bulk_upsert_products(self, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Добавляет или обновляет товары из потока записей (импорт каталога).
+        
+        Запись сопоставляется с существующим товаром по артикулу (sku),
+        а если артикула нет — по названию без учёта регистра. Найденный
+        товар обновляется только полями, присутствующими в записи; для
+        новых товаров ID выделяются одним блоком. Все изменения
+        сохраняются одной записью в хранилище, поэтому импорт N товаров
+        стоит O(N), а не O(N²). Если перебор записей прерывается
+        исключением, хранилище не изменяется.
+        
+        Args:
+            records: Записи с полями товара (name, price, description,
+                in_stock, image, sku), уже проверенные
+        
+        Returns:
+            Количество записей по результату: created, updated, unchanged
+        """
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        with self._write_lock, self.storage.lock():
+            self.refresh_if_changed()
+            catalog = self._catalog
+            by_sku = {p.sku: p.id for p in catalog.all_products if p.sku}
+            by_name = {p.name.casefold(): p.id for p in catalog.all_products}
+            changes: Dict[int, Product] = {}
+            # Новые товары копятся как наборы полей: ID выделяются одним блоком в конце
+            created: List[Dict[str, Any]] = []
+            
+            for record in records:
+                fields = {k: v for k, v in record.items() if k in self.PRODUCT_FIELDS}
+                sku = fields.get('sku')
+                # Ключ: ID существующего товара или -(номер нового товара)
+                key = by_sku.get(sku) if sku else None
+                if key is None and 'name' in fields:
+                    key = by_name.get(fields['name'].casefold())
+                
+                if key is None:
+                    created.append({'description': '', **fields})
+                    key = -len(created)
+                    counts['created'] += 1
+                elif key < 0:
+                    created[-key - 1].update(fields)
+                    counts['updated'] += 1
+                else:
+                    current = changes.get(key) or catalog[key]
+                    product = replace(current, **fields)
+                    if product == current:
+                        counts['unchanged'] += 1
+                        continue
+                    changes[key] = product
+                    counts['updated'] += 1
+                
+                if sku:
+                    by_sku[sku] = key
+                if 'name' in fields:
+                    by_name[fields['name'].casefold()] = key
+            
+            if created:
+                first_id = self.storage.allocate_id('products', self._next_product_id - 1,
+                                                    count=len(created))
+                for offset, fields in enumerate(created):
+                    changes[first_id + offset] = Product(id=first_id + offset, **fields)
+                self._next_product_id = first_id + len(created)
+            
+            if changes and not self.product_repo.save_many(changes.values()):
+                raise IOError("Не удалось сохранить товары")
+            self._remember_generation('products')
+            
+            if changes:
+                self._publish(changes)
+                self.search_index.add_many(changes.values())
+        return counts
     
     # Работа с заказами
     def get_all_orders(self) -> List[Order]:
-        """Возвращает все заказы."""
-        return self._orders.copy()
+        """Возвращает все заказы (загружает историю при первом обращении)."""
+        return self.get_order_index().all()
+    
+    def get_order_index(self) -> Union[OrderIndex, ColumnarOrderStore]:
+        """
+        Возвращает индекс заказов (по ID и по дате создания).
+        
+        Вся история загружается при первом обращении (один раз, даже
+        если первыми обратились несколько потоков) и затем поддерживается
+        в актуальном состоянии.
+        """
+        orders = self._orders
+        if orders is None:
+            with self._write_lock:
+                if self._orders is None:
+                    if self.order_writer is not None:
+                        # Заказы из очереди записи должны попасть в загрузку
+                        self.order_writer.flush()
+                    # Заказы новее _last_order_id, попавшие в загрузку, ещё не учтены
+                    # в статистике: они будут повторно добавлены при следующей проверке
+                    self._orders = self._order_store(self.order_repo.get_all())
+                orders = self._orders
+        return orders
     
     def get_order(self, order_id: int) -> Optional[Order]:
-        """Возвращает заказ по ID."""
-        for order in self._orders:
-            if order.id == order_id:
-                return order
-        return None
+        """
+        Возвращает заказ по ID.
+        
+        Если индекс заказов ещё не загружен, заказ читается из хранилища.
+        """
+        orders = self._orders
+        if orders is not None:
+            return orders.get(order_id)
+        return self.order_repo.get_by_id(order_id)
     
-    def create_order(self, cart: Cart, products: Dict[int, Product]) -> Order:
+    def get_orders_page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+                        start: Optional[Timestamp] = None,
+                        end: Optional[Timestamp] = None) -> List[Order]:
+        """
+        Возвращает страницу заказов, новые первыми.
+        
+        Пока индекс заказов в памяти не загружен, хранилища с индексами
+        (SQLite, индекс положений заказов в снимке JSON) отдают страницу
+        сами, не загружая историю.
+        
+        Args:
+            before: Ключ (created_at, id) последнего заказа предыдущей страницы
+            limit: Размер страницы
+            start: Начало интервала дат (включительно)
+            end: Конец интервала дат (не включительно)
+        """
+        if self._orders is None and self.storage.indexed_orders:
+            if self.order_writer is not None:
+                self.order_writer.flush()
+            return self.order_repo.get_page(
+                before, limit,
+                timestamp_key(start) if start is not None else None,
+                timestamp_key(end) if end is not None else None,
+            )
+        return self.get_order_index().page(before, limit, start, end)
+    
+    def get_orders_between(self, start: Optional[Timestamp] = None,
+                           end: Optional[Timestamp] = None) -> List[Order]:
+        """
+        Возвращает заказы, созданные в интервале [start, end).
+        
+        Args:
+            start: Начало интервала (включительно), None — с начала истории
+            end: Конец интервала (не включительно), None — до конца истории
+        """
+        return self.get_order_index().between(start, end)
+    
+    def iter_orders(self, start: Optional[Timestamp] = None,
+                    end: Optional[Timestamp] = None) -> Iterator[Order]:
+        """
+        Перебирает заказы интервала [start, end) по возрастанию ID.
+        
+        Заказы читаются из хранилища порциями, а не из индекса в памяти,
+        поэтому выгрузка всей истории не требует её загрузки.
+        
+        Args:
+            start: Начало интервала (включительно), None — с начала истории
+            end: Конец интервала (не включительно), None — до конца истории
+        """
+        return self.order_repo.iter_between(
+            timestamp_key(start) if start is not None else None,
+            timestamp_key(end) if end is not None else None,
+        )
+    
+    def get_last_orders(self, n: int) -> List[Order]:
+        """Возвращает последние n заказов (новые первыми)."""
+        return self.get_orders_page(None, n) if n > 0 else []
+    
+    def create_order(self, cart: Cart, products: Mapping[int, Product]) -> Order:
         """
         Создаёт новый заказ из корзины.
         
+        С групповой фиксацией ID выделяется под блокировкой, а запись
+        на диск выполняет фоновый поток: блокировка освобождается до
+        записи, и одновременные заказы записываются одним пакетом.
+        В индексе и статистике заказ учитывается только после
+        подтверждения записи, и метод возвращается после него.
+        
         Args:
             cart: Корзина с товарами
             products: Словарь товаров для расчёта суммы
-            
+        
         Returns:
             Созданный заказ
+        
+        Raises:
+            IOError: Если заказ не удалось записать (групповая фиксация)
         """
         total = cart.calculate_total(products)
-        order = Order(
-            id=self._next_order_id,
-            cart=Cart.from_dict(cart.to_dict()),  # Копируем корзину
-            total=total
-        )
-        self._next_order_id += 1
-        self._orders.append(order)
-        self.order_repo.save(order)
+        ticket = None
+        with self._write_lock, self.storage.lock():
+            self.refresh_if_changed()
+            if self.order_writer is not None:
+                # Заказы пишет только этот процесс, а после перезапуска
+                # allocate_id продолжит нумерацию после загруженных заказов
+                order_id = self._next_order_id
+            else:
+                order_id = self.storage.allocate_id('orders', self._next_order_id - 1)
+            order = Order(
+                id=order_id,
+                cart=Cart.from_dict(cart.to_dict()),  # Копируем корзину
+                total=total
+            )
+            self._next_order_id = order.id + 1
+            if self.order_writer is not None:
+                ticket = self.order_writer.submit(order)
+            else:
+                self.order_repo.save(order)
+                self._remember_generation('orders')
+                if self._orders is not None:
+                    self._orders.add(order)
+                self._record_order(order, products)
+        
+        if ticket is not None:
+            saved = ticket.result()
+            with self._write_lock, self.storage.lock():
+                self._record_committed(order, products if saved else None)
+            if not saved:
+                raise IOError(f"Не удалось сохранить заказ #{order.id}")
         return order
     
+    def _record_committed(self, order: Order,
+                          products: Optional[Mapping[int, Product]]) -> None:
+        """
+        Учитывает заказ после подтверждения групповой фиксации.
+        
+        Вызывается под блокировкой записи. Потоки возвращаются после
+        записи пакета в произвольном порядке, а статистика учитывает
+        заказы только по возрастанию ID, поэтому заказ ждёт в очереди
+        учёта, пока не будут учтены все предыдущие.
+        
+        Args:
+            order: Заказ
+            products: Товары на момент оформления (None — заказ не записан)
+        """
+        if products is not None and self._orders is not None and self._orders.get(order.id) is None:
+            # Индекс, загруженный после записи пакета, может уже содержать заказ
+            self._orders.add(order)
+            self._bump_version('orders')
+        self._unrecorded[order.id] = (order, products) if products is not None else None
+        while self._recorded_order_id + 1 in self._unrecorded:
+            self._recorded_order_id += 1
+            entry = self._unrecorded.pop(self._recorded_order_id)
+            if entry is not None:
+                self._record_order(*entry)
+    
+    def _record_order(self, order: Order, products: Mapping[int, Product]) -> None:
+        """Учитывает записанный заказ в статистике продаж (под блокировкой записи)."""
+        self._last_order_id = max(self._last_order_id, order.id)
+        self._sales_metrics.record(order, products)
+        self._metrics_view = None
+        self._bump_version('orders')
+        self._unsaved_metrics += 1
+        save_at = self._metrics_save_at
+        if (self._unsaved_metrics >= self.METRICS_SAVE_INTERVAL or
+                save_at is not None and order.id >= save_at):
+            self._save_sales_metrics()
+    
+    def _save_sales_metrics(self) -> None:
+        """Сохраняет статистику продаж (под блокировкой записи и хранилища)."""
+        self.metrics_repo.save(self._sales_metrics)
+        self._unsaved_metrics = 0
+        self._metrics_save_at = None
+    
+    def _on_compact(self, max_id: int) -> None:
+        """
+        Отмечает свёртку журнала заказов в снимок с наибольшим ID max_id.
+        
+        Статистика, сохранённая раньше снимка, при запуске потребовала
+        бы чтения заказов из снимка, поэтому она сохраняется, как только
+        учтён заказ max_id. Вызывается хранилищем из потока, записавшего
+        заказ (в том числе из потока групповой фиксации), поэтому
+        только запоминает ID и не берёт блокировок.
+        """
+        self._metrics_save_at = max_id
+    
+    def close(self) -> None:
+        """
+        Дожидается записи заказов из очереди и сохраняет статистику продаж.
+        
+        Регистрируется в atexit, поэтому при следующем запуске статистику
+        не нужно досчитывать по истории заказов.
+        """
+        if self.order_writer is not None:
+            self.order_writer.close()
+        with self._write_lock, self.storage.lock():
+            if self._unsaved_metrics:
+                self._save_sales_metrics()
+    
+    def get_sales_metrics(self) -> SalesMetrics:
+        """
+        Возвращает статистику продаж (снимок только для чтения).
+        
+        Статистика обновляется при каждом заказе под блокировкой записи;
+        читателям отдаётся её копия, которая снимается один раз после
+        изменения и затем разделяется между запросами без блокировок.
+        """
+        view = self._metrics_view
+        if view is None:
+            with self._write_lock:
+                view = self._metrics_view = self._sales_metrics.copy()
+        return view
+    
     # Работа с корзиной (сессия)
-    def load_cart(self) -> Cart:
-        """Загружает корзину из хранилища."""
-        return self.cart_repo.load()
+    def load_cart(self, cart_id: Optional[str] = None) -> Cart:
+        """
+        Загружает корзину из хранилища.
+        
+        Args:
+            cart_id: Идентификатор корзины сессии (None — общая корзина)
+        """
+        return self.cart_repo.load(cart_id)
     
-    def save_cart(self, cart: Cart) -> None:
-        """Сохраняет корзину в хранилище."""
-        self.cart_repo.save(cart)
+    def save_cart(self, cart: Cart, cart_id: Optional[str] = None) -> None:
+        """
+        Сохраняет корзину в хранилище.
+        
+        Args:
+            cart: Корзина
+            cart_id: Идентификатор корзины сессии (None — общая корзина)
+        """
+        self.cart_repo.save(cart, cart_id)
@@ -3,5 +3,8 @@
 from .product import Product
 from .order import Order
 from .cart import Cart
+from .catalog import CatalogSnapshot
+from .order_index import OrderIndex
+from .columnar_order_store import ColumnarOrderStore
 
-__all__ = ['Product', 'Order', 'Cart']
+__all__ = ['Product', 'Order', 'Cart', 'CatalogSnapshot', 'OrderIndex', 'ColumnarOrderStore']
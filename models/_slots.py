@@ -0,0 +1,8 @@
+"""Параметры dataclass для компактных моделей."""
+
+import sys
+
+# Модели хранятся в памяти в больших количествах (каталог, история заказов),
+# поэтому объявляются со __slots__: без __dict__ у каждого экземпляра.
+# Параметр slots у dataclass появился в Python 3.10.
+SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
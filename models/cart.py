@@ -1,11 +1,12 @@
 """Модель корзины покупок."""
 
-from typing import Dict
+from typing import Dict, Mapping
 from dataclasses import dataclass, field
 from .product import Product
+from ._slots import SLOTS
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Cart:
     """Класс для представления корзины покупок."""
     
@@ -38,7 +39,7 @@ class Cart:
         """Очищает корзину."""
         self.items.clear()
     
-    def calculate_total(self, products: Dict[int, Product]) -> float:
+    def calculate_total(self, products: Mapping[int, Product]) -> float:
         """Вычисляет общую стоимость корзины."""
         total = 0.0
         for product_id, quantity in self.items.items():
@@ -57,9 +58,8 @@ class Cart:
     @classmethod
     def from_dict(cls, data: dict) -> 'Cart':
         """Создаёт объект Cart из словаря."""
-        cart = cls()
-        cart.items = data.get('items', {}).copy()
-        return cart
+        # Ключи JSON-объектов всегда строки, приводим их к ID товаров
+        return cls({int(pid): qty for pid, qty in data.get('items', {}).items()})
     
     def __len__(self) -> int:
         """Возвращает количество позиций в корзине."""
@@ -0,0 +1,97 @@
+"""Неизменяемый снимок каталога товаров."""
+
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from .product import Product
+
+
+class CatalogSnapshot(Mapping[int, Product]):
+    """
+    Версионированный снимок каталога (только для чтения).
+    
+    Снимок создаётся заново при каждом изменении каталога и больше
+    не меняется, поэтому его можно без копирования разделять между
+    запросами и сервисами. Ведёт себя как словарь id -> Product.
+    """
+    
+    __slots__ = ('_products', 'version', 'all_products', 'available', '_sorted')
+    
+    def __init__(self, products: Dict[int, Product], version: int = 0):
+        """
+        Создаёт снимок каталога.
+        
+        Args:
+            products: Словарь товаров; снимок становится его владельцем,
+                и словарь больше не должен изменяться
+            version: Номер версии каталога
+        """
+        self._products = products
+        self.version = version
+        self.all_products: Tuple[Product, ...] = tuple(products.values())
+        self.available: Tuple[Product, ...] = tuple(
+            p for p in self.all_products if p.in_stock
+        )
+        self._sorted: Dict[str, Tuple[List[Tuple[Any, ...]], Tuple[Product, ...]]] = {}
+    
+    def __getitem__(self, product_id: int) -> Product:
+        """Возвращает товар по ID."""
+        return self._products[product_id]
+    
+    def __contains__(self, product_id: object) -> bool:
+        """Проверяет наличие товара в каталоге."""
+        return product_id in self._products
+    
+    def __iter__(self) -> Iterator[int]:
+        """Итерирует по ID товаров."""
+        return iter(self._products)
+    
+    def __len__(self) -> int:
+        """Возвращает количество товаров."""
+        return len(self._products)
+    
+    def get(self, product_id: int, default: Optional[Product] = None) -> Optional[Product]:
+        """Возвращает товар по ID или default."""
+        return self._products.get(product_id, default)
+    
+    def sorted_by(self, name: str, key: Callable[[Product], Tuple[Any, ...]]
+                  ) -> Tuple[List[Tuple[Any, ...]], Tuple[Product, ...]]:
+        """
+        Возвращает товары, отсортированные по ключу, вместе со списком ключей.
+        
+        Результат вычисляется один раз для снимка и кэшируется по имени
+        сортировки, поэтому постраничный вывод сводится к бинарному поиску.
+        
+        Args:
+            name: Имя сортировки (ключ кэша)
+            key: Функция ключа сортировки
+            
+        Returns:
+            Кортеж (ключи по возрастанию, товары в том же порядке)
+        """
+        cached = self._sorted.get(name)
+        if cached is None:
+            products = tuple(sorted(self.all_products, key=key))
+            cached = ([key(p) for p in products], products)
+            self._sorted[name] = cached
+        return cached
+    
+    def replace(self, changes: Dict[int, Optional[Product]]) -> 'CatalogSnapshot':
+        """
+        Возвращает новый снимок с применёнными изменениями.
+        
+        Args:
+            changes: Словарь id -> новый товар (None — удалить товар)
+        
+        Returns:
+            Новый снимок со следующим номером версии
+        """
+        products = dict(self._products)
+        for product_id, product in changes.items():
+            if product is None:
+                products.pop(product_id, None)
+            else:
+                products[product_id] = product
+        return CatalogSnapshot(products, self.version + 1)
+    
+    def __repr__(self) -> str:
+        """Строковое представление снимка."""
+        return f"CatalogSnapshot(version={self.version}, products={len(self)})"
@@ -0,0 +1,237 @@
+"""Колоночное хранилище заказов в памяти."""
+
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from .cart import Cart
+from .order import Order
+from .order_index import Timestamp, timestamp_key
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _micros(dt: datetime) -> int:
+    """Переводит дату в микросекунды от начала эпохи (часовой пояс отбрасывается)."""
+    delta = dt.replace(tzinfo=None) - _EPOCH if dt.tzinfo is not None else dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _to_micros(value: str) -> int:
+    """Переводит дату ISO 8601 в микросекунды от начала эпохи (для сравнения)."""
+    return _micros(datetime.fromisoformat(value))
+
+
+def _is_canonical(text: str, dt: datetime) -> bool:
+    """
+    Проверяет, что text совпадает с dt.isoformat() (без вызова isoformat).
+    
+    Только такие даты восстанавливаются из микросекунд без потерь.
+    """
+    if dt.tzinfo is not None or text[10:11] != 'T':
+        return False
+    if dt.microsecond:
+        return len(text) == 26 and text[19] == '.'
+    return len(text) == 19
+
+
+def _from_micros(value: int) -> str:
+    """Переводит микросекунды от начала эпохи обратно в ISO 8601."""
+    return (_EPOCH + value * _MICROSECOND).isoformat()
+
+
+class ColumnarOrderStore:
+    """
+    Хранилище заказов в колонках (массивах array) вместо объектов.
+    
+    ID, суммы и даты создания хранятся в отдельных массивах, позиции
+    всех заказов — в общих плоских массивах (ID товара, количество)
+    со смещениями. Заказ занимает несколько десятков байт вместо
+    сотен для объектов Order/Cart со словарями. Интерфейс совпадает
+    с OrderIndex; объекты Order создаются при чтении.
+    
+    Для поиска поддерживаются две перестановки строк: по ID и по
+    (дате, ID). Новые заказы обычно добавляются в конец обеих,
+    поэтому вставка выполняется за O(1).
+    """
+    
+    def __init__(self, orders: Iterable[Order] = ()):
+        """
+        Создаёт хранилище.
+        
+        Args:
+            orders: Начальный набор заказов
+        """
+        self._ids = array('q')
+        self._totals = array('d')
+        self._created = array('q')          # микросекунды от начала эпохи
+        self._item_start = array('q', [0])  # позиции строки i: [start[i], start[i + 1])
+        self._item_product = array('q')
+        self._item_quantity = array('i')
+        # Даты, которые не восстанавливаются из микросекунд без потерь
+        # (например, с часовым поясом): строка -> исходный текст
+        self._created_text: Dict[int, str] = {}
+        self._deleted: Set[int] = set()
+        
+        self._rows_by_id = array('q')
+        self._rows_by_date = array('q')
+        self._count = 0
+        for order in orders:
+            self.add(order)
+    
+    # Поиск по перестановкам
+    
+    def _search(self, rows: array, key: Callable[[int], tuple], target: tuple) -> int:
+        """Возвращает первую позицию в rows, где key(row) >= target (bisect_left)."""
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(rows[mid]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _id_key(self, row: int) -> tuple:
+        """Ключ строки в перестановке по ID."""
+        return (self._ids[row],)
+    
+    def _date_key(self, row: int) -> tuple:
+        """Ключ строки в перестановке по дате создания."""
+        return (self._created[row], self._ids[row])
+    
+    def _find_row(self, order_id: int) -> Optional[int]:
+        """Возвращает строку заказа по ID или None."""
+        rows = self._rows_by_id
+        if not rows:
+            return None
+        # Частый случай: ID возрастают вместе со строками
+        last = rows[-1]
+        if self._ids[last] == order_id:
+            return last
+        pos = self._search(rows, self._id_key, (order_id,))
+        if pos < len(rows) and self._ids[rows[pos]] == order_id:
+            return rows[pos]
+        return None
+    
+    def _bound(self, value: Optional[Timestamp]) -> Optional[int]:
+        """Переводит границу интервала в микросекунды."""
+        return None if value is None else _to_micros(timestamp_key(value))
+    
+    def _order(self, row: int) -> Order:
+        """Создаёт объект Order из строки."""
+        start, end = self._item_start[row], self._item_start[row + 1]
+        items = dict(zip(self._item_product[start:end], self._item_quantity[start:end]))
+        created_at = self._created_text.get(row)
+        if created_at is None:
+            created_at = _from_micros(self._created[row])
+        return Order(self._ids[row], Cart(items), self._totals[row], created_at)
+    
+    # Интерфейс OrderIndex
+    
+    def add(self, order: Order) -> None:
+        """Добавляет заказ (заменяет заказ с тем же ID)."""
+        if order.id <= self.max_id() and self._find_row(order.id) is not None:
+            self.remove(order.id)
+        
+        row = len(self._ids)
+        self._ids.append(order.id)
+        self._totals.append(order.total)
+        created = datetime.fromisoformat(order.created_at)
+        micros = _micros(created)
+        self._created.append(micros)
+        if not _is_canonical(order.created_at, created):
+            self._created_text[row] = order.created_at
+        items = order.cart.items
+        self._item_product.extend(items.keys())
+        self._item_quantity.extend(items.values())
+        self._item_start.append(len(self._item_product))
+        
+        by_id, by_date = self._rows_by_id, self._rows_by_date
+        if not by_id or order.id > self._ids[by_id[-1]]:
+            by_id.append(row)
+        else:
+            by_id.insert(self._search(by_id, self._id_key, (order.id,)), row)
+        if not by_date or (micros, order.id) >= self._date_key(by_date[-1]):
+            by_date.append(row)
+        else:
+            by_date.insert(self._search(by_date, self._date_key, (micros, order.id)), row)
+        self._count += 1
+    
+    def remove(self, order_id: int) -> Optional[Order]:
+        """
+        Удаляет заказ.
+        
+        Строка помечается удалённой и исключается из перестановок;
+        место в колонках не освобождается.
+        """
+        row = self._find_row(order_id)
+        if row is None:
+            return None
+        order = self._order(row)
+        self._rows_by_id.pop(self._search(self._rows_by_id, self._id_key, self._id_key(row)))
+        self._rows_by_date.pop(self._search(self._rows_by_date, self._date_key, self._date_key(row)))
+        self._deleted.add(row)
+        self._count -= 1
+        return order
+    
+    def get(self, order_id: int) -> Optional[Order]:
+        """Возвращает заказ по ID."""
+        row = self._find_row(order_id)
+        return self._order(row) if row is not None else None
+    
+    def all(self) -> List[Order]:
+        """Возвращает все заказы в порядке добавления."""
+        return list(self)
+    
+    def _date_range(self, start: Optional[Timestamp], end: Optional[Timestamp]) -> Tuple[int, int]:
+        """Возвращает границы интервала [start, end) в перестановке по дате."""
+        rows = self._rows_by_date
+        start_us, end_us = self._bound(start), self._bound(end)
+        lo = self._search(rows, self._date_key, (start_us, -1)) if start_us is not None else 0
+        hi = self._search(rows, self._date_key, (end_us, -1)) if end_us is not None else len(rows)
+        return lo, hi
+    
+    def between(self, start: Optional[Timestamp] = None,
+                end: Optional[Timestamp] = None) -> List[Order]:
+        """Возвращает заказы, созданные в интервале [start, end), в порядке создания."""
+        lo, hi = self._date_range(start, end)
+        return [self._order(row) for row in self._rows_by_date[lo:hi]]
+    
+    def last(self, n: int) -> List[Order]:
+        """Возвращает последние n заказов (новые первыми)."""
+        if n <= 0:
+            return []
+        return [self._order(row) for row in reversed(self._rows_by_date[-n:])]
+    
+    def page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+             start: Optional[Timestamp] = None,
+             end: Optional[Timestamp] = None) -> List[Order]:
+        """Возвращает страницу заказов, новые первыми (см. OrderIndex.page)."""
+        lo, hi = self._date_range(start, end)
+        if before is not None:
+            created_at, order_id = before
+            hi = min(hi, self._search(self._rows_by_date, self._date_key,
+                                      (_to_micros(created_at), order_id)))
+        lo = max(lo, hi - limit)
+        return [self._order(row) for row in reversed(self._rows_by_date[lo:hi])]
+    
+    def max_id(self) -> int:
+        """Возвращает наибольший ID заказа (0, если заказов нет)."""
+        return self._ids[self._rows_by_id[-1]] if self._rows_by_id else 0
+    
+    def __contains__(self, order_id: object) -> bool:
+        """Проверяет наличие заказа с указанным ID."""
+        return isinstance(order_id, int) and self._find_row(order_id) is not None
+    
+    def __iter__(self) -> Iterator[Order]:
+        """Итерирует по заказам в порядке добавления."""
+        deleted = self._deleted
+        # Колонка границ позиций дополняется последней: строки до неё записаны целиком
+        for row in range(len(self._item_start) - 1):
+            if row not in deleted:
+                yield self._order(row)
+    
+    def __len__(self) -> int:
+        """Возвращает количество заказов."""
+        return self._count
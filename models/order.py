@@ -4,11 +4,12 @@ from typing import Dict
 from dataclasses import dataclass, field
 from datetime import datetime
 from .cart import Cart
+from ._slots import SLOTS
 
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class Order:
-    """Класс для представления заказа."""
+    """Класс для представления заказа (неизменяем после создания)."""
     
     id: int
     cart: Cart
@@ -28,12 +29,9 @@ class Order:
     def from_dict(cls, data: dict) -> 'Order':
         """Создаёт объект Order из словаря."""
         cart = Cart.from_dict(data['cart'])
-        return cls(
-            id=data['id'],
-            cart=cart,
-            total=data['total'],
-            created_at=data.get('created_at', datetime.now().isoformat())
-        )
+        # Текущее время вычисляется только для записей без даты
+        created_at = data.get('created_at') or datetime.now().isoformat()
+        return cls(data['id'], cart, data['total'], created_at)
     
     def __str__(self) -> str:
         """Строковое представление заказа."""
@@ -0,0 +1,123 @@
+"""Индексы заказов по ID и по дате создания."""
+
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .order import Order
+
+Timestamp = Union[str, datetime]
+
+
+def timestamp_key(value: Timestamp) -> str:
+    """Приводит границу диапазона к формату поля created_at (ISO 8601)."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class OrderIndex:
+    """
+    Хранилище заказов в памяти с индексами.
+    
+    Поддерживает поиск по ID за O(1) и выборки по дате создания
+    (диапазон, последние N заказов) без обхода всей истории.
+    """
+    
+    def __init__(self, orders: Iterable[Order] = ()):
+        """
+        Создаёт индекс.
+        
+        Args:
+            orders: Начальный набор заказов
+        """
+        self._by_id: Dict[int, Order] = {}
+        self._by_date: List[Tuple[str, int]] = []
+        for order in orders:
+            self.add(order)
+    
+    def add(self, order: Order) -> None:
+        """Добавляет заказ в индекс."""
+        if order.id in self._by_id:
+            self.remove(order.id)
+        self._by_id[order.id] = order
+        key = (order.created_at, order.id)
+        if not self._by_date or key >= self._by_date[-1]:
+            self._by_date.append(key)
+        else:
+            insort(self._by_date, key)
+    
+    def remove(self, order_id: int) -> Optional[Order]:
+        """Удаляет заказ из индекса."""
+        order = self._by_id.pop(order_id, None)
+        if order is not None:
+            del self._by_date[bisect_left(self._by_date, (order.created_at, order.id))]
+        return order
+    
+    def get(self, order_id: int) -> Optional[Order]:
+        """Возвращает заказ по ID."""
+        return self._by_id.get(order_id)
+    
+    def all(self) -> List[Order]:
+        """Возвращает все заказы в порядке добавления."""
+        return list(self._by_id.values())
+    
+    def between(self, start: Optional[Timestamp] = None,
+                end: Optional[Timestamp] = None) -> List[Order]:
+        """
+        Возвращает заказы, созданные в интервале [start, end).
+        
+        Args:
+            start: Начало интервала (включительно), None — с начала истории
+            end: Конец интервала (не включительно), None — до конца истории
+        
+        Returns:
+            Заказы в порядке создания
+        """
+        lo = bisect_left(self._by_date, (timestamp_key(start), -1)) if start is not None else 0
+        hi = (bisect_left(self._by_date, (timestamp_key(end), -1))
+              if end is not None else len(self._by_date))
+        return [self._by_id[order_id] for _, order_id in self._by_date[lo:hi]]
+    
+    def last(self, n: int) -> List[Order]:
+        """Возвращает последние n заказов (новые первыми)."""
+        if n <= 0:
+            return []
+        return [self._by_id[order_id] for _, order_id in reversed(self._by_date[-n:])]
+    
+    def page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+             start: Optional[Timestamp] = None,
+             end: Optional[Timestamp] = None) -> List[Order]:
+        """
+        Возвращает страницу заказов, новые первыми.
+        
+        Args:
+            before: Ключ (created_at, id), строго до которого выбираются заказы
+                (ключ последнего заказа предыдущей страницы)
+            limit: Размер страницы
+            start: Начало интервала дат (включительно)
+            end: Конец интервала дат (не включительно)
+        
+        Returns:
+            Не более limit заказов в порядке убывания даты создания
+        """
+        lo = bisect_left(self._by_date, (timestamp_key(start), -1)) if start is not None else 0
+        hi = (bisect_left(self._by_date, (timestamp_key(end), -1))
+              if end is not None else len(self._by_date))
+        if before is not None:
+            hi = min(hi, bisect_left(self._by_date, tuple(before)))
+        lo = max(lo, hi - limit)
+        return [self._by_id[order_id] for _, order_id in reversed(self._by_date[lo:hi])]
+    
+    def max_id(self) -> int:
+        """Возвращает наибольший ID заказа (0, если заказов нет)."""
+        return max(self._by_id, default=0)
+    
+    def __contains__(self, order_id: object) -> bool:
+        """Проверяет наличие заказа с указанным ID."""
+        return order_id in self._by_id
+    
+    def __iter__(self) -> Iterator[Order]:
+        """Итерирует по заказам в порядке добавления."""
+        return iter(self._by_id.values())
+    
+    def __len__(self) -> int:
+        """Возвращает количество заказов."""
+        return len(self._by_id)
@@ -1,12 +1,17 @@
 """Модель товара."""
 
 from typing import Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from ._slots import SLOTS
 
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class Product:
-    """Класс для представления товара в магазине."""
+    """
+    Класс для представления товара в магазине.
+    
+    Неизменяем: новая версия товара создаётся через dataclasses.replace.
+    """
     
     id: int
     name: str
@@ -14,22 +19,26 @@ class Product:
     price: float
     in_stock: bool = True
     image: Optional[str] = None
+    sku: Optional[str] = None  # Артикул поставщика (ключ при импорте каталога)
     
     def to_dict(self) -> dict:
-        """Преобразует объект Product в словарь."""
-        return asdict(self)
+        """Преобразует объект Product в словарь (без рекурсивного копирования asdict)."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'price': self.price,
+            'in_stock': self.in_stock,
+            'image': self.image,
+            'sku': self.sku,
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Product':
         """Создаёт объект Product из словаря."""
-        return cls(
-            id=data['id'],
-            name=data['name'],
-            description=data['description'],
-            price=data['price'],
-            in_stock=data.get('in_stock', True),
-            image=data.get('image', None)
-        )
+        get = data.get
+        return cls(data['id'], data['name'], data['description'], data['price'],
+                   get('in_stock', True), get('image'), get('sku'))
     
     def __str__(self) -> str:
         """Строковое представление товара."""
@@ -0,0 +1,9 @@
+"""Метрики производительности: время запросов, вызовов хранилища, ввод-вывод и профилирование."""
+
+from .metrics import Histogram, MetricsRegistry
+from .instrument import timed, instrument_methods
+from .middleware import Monitoring
+from .profiler import RequestProfiler, StackSampler
+
+__all__ = ['Histogram', 'MetricsRegistry', 'Monitoring', 'RequestProfiler', 'StackSampler',
+           'timed', 'instrument_methods']
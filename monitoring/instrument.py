@@ -0,0 +1,86 @@
+"""Декораторы для замера времени вызовов хранилища и репозиториев."""
+
+import inspect
+import time
+from functools import wraps
+from typing import Any, Callable, Iterable, List, Optional
+from .metrics import MetricsRegistry
+
+# Семейство метрик для вызовов методов
+CALL_METRIC = 'shop_call_duration_seconds'
+
+# Методы, которые не замеряются: блокировки и завершение работы
+SKIP_METHODS = frozenset({'lock', 'close'})
+
+
+def timed(registry: MetricsRegistry, name: str = CALL_METRIC,
+          is_enabled: Optional[Callable[[], bool]] = None, **labels: Any) -> Callable:
+    """
+    Декоратор: записывает время выполнения функции в гистограмму.
+    
+    Args:
+        registry: Реестр метрик
+        name: Имя семейства метрик
+        is_enabled: Функция, проверяемая при каждом вызове
+            (None — замер включён всегда)
+        **labels: Метки гистограммы
+    
+    Returns:
+        Декоратор
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if is_enabled is not None and not is_enabled():
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - started, **labels)
+        return wrapper
+    return decorator
+
+
+def public_methods(obj: Any) -> List[str]:
+    """
+    Возвращает имена публичных методов объекта, пригодных для замера.
+    
+    Генераторные функции пропускаются: их вызов только создаёт
+    итератор, а работа выполняется позже, при переборе.
+    """
+    names = []
+    for name, member in inspect.getmembers(type(obj), inspect.isfunction):
+        if (name.startswith('_') or name in SKIP_METHODS or
+                inspect.isgeneratorfunction(member)):
+            continue
+        names.append(name)
+    return names
+
+
+def instrument_methods(obj: Any, registry: MetricsRegistry, layer: str,
+                       methods: Optional[Iterable[str]] = None,
+                       name: str = CALL_METRIC) -> Any:
+    """
+    Оборачивает методы объекта замером времени.
+    
+    Обёртки устанавливаются как атрибуты экземпляра, класс не меняется;
+    пока мониторинг выключен, instrument_methods не вызывается
+    и накладных расходов нет вовсе.
+    
+    Args:
+        obj: Объект (хранилище, репозиторий, поисковый индекс)
+        registry: Реестр метрик
+        layer: Слой для метки layer ('storage', 'repository', ...)
+        methods: Имена методов (None — все публичные)
+        name: Имя семейства метрик
+    
+    Returns:
+        Тот же объект
+    """
+    class_name = type(obj).__name__
+    for method in (public_methods(obj) if methods is None else methods):
+        bound = getattr(obj, method)
+        decorator = timed(registry, name, layer=layer, call=f"{class_name}.{method}")
+        setattr(obj, method, decorator(bound))
+    return obj
@@ -0,0 +1,257 @@
+"""Гистограммы задержек и счётчики с выводом в формате Prometheus."""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Метки метрики: отсортированные пары (имя, значение)
+Labels = Tuple[Tuple[str, str], ...]
+
+# Значение от внешнего источника: (имя, тип 'counter'/'gauge', метки, значение)
+Sample = Tuple[str, str, Dict[str, Any], float]
+
+# Границы корзин гистограммы задержек в секундах (как в клиентах Prometheus)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными корзинами.
+    
+    Хранит только количество наблюдений в каждой корзине, сумму
+    и максимум, поэтому память не зависит от числа запросов,
+    а квантили оцениваются интерполяцией внутри корзины.
+    """
+    
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Инициализирует гистограмму.
+        
+        Args:
+            buckets: Верхние границы корзин по возрастанию
+                (корзина +Inf добавляется автоматически)
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float) -> None:
+        """Добавляет наблюдение."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    @property
+    def mean(self) -> float:
+        """Среднее значение."""
+        return self.sum / self.count if self.count else 0.0
+    
+    def quantile(self, q: float) -> float:
+        """
+        Оценивает квантиль по корзинам.
+        
+        Args:
+            q: Уровень квантиля от 0 до 1
+        
+        Returns:
+            Оценка квантиля (не больше наблюдавшегося максимума)
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= target:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                estimate = lower + (upper - lower) * (target - cumulative) / bucket_count
+                return min(estimate, self.max)
+            cumulative += bucket_count
+        return self.max
+    
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Возвращает накопленные счётчики корзин: [(le, количество), ...]."""
+        result = []
+        total = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            total += bucket_count
+            result.append((_format_value(bound), total))
+        result.append(('+Inf', self.count))
+        return result
+
+
+class MetricsRegistry:
+    """
+    Потокобезопасный реестр метрик.
+    
+    Метрика определяется именем семейства и набором меток; для каждой
+    комбинации заводится своя гистограмма или счётчик. Метки должны
+    иметь ограниченное число значений (маршрут, метод хранилища,
+    имя файла), а не идентификаторы записей.
+    """
+    
+    def __init__(self):
+        """Инициализирует пустой реестр."""
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self.started_at = time.time()
+    
+    def describe(self, name: str, help_text: str) -> None:
+        """Задаёт описание семейства метрик (строка # HELP)."""
+        self._help[name] = help_text
+    
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Добавляет источник метрик, опрашиваемый при выводе (например, кэш).
+        
+        Args:
+            collector: Функция, возвращающая значения (имя, тип, метки, значение)
+        """
+        self._collectors.append(collector)
+    
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Добавляет наблюдение в гистограмму.
+        
+        Args:
+            name: Имя семейства
+            value: Значение (для задержек — секунды)
+            **labels: Метки
+        """
+        key = _labels_key(labels)
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            histogram = family.get(key)
+            if histogram is None:
+                histogram = family[key] = Histogram()
+            histogram.observe(value)
+    
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Увеличивает счётчик.
+        
+        Args:
+            name: Имя семейства
+            value: Приращение
+            **labels: Метки
+        """
+        key = _labels_key(labels)
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[key] = family.get(key, 0) + value
+    
+    def histograms(self, name: str) -> List[Tuple[Dict[str, str], Histogram]]:
+        """Возвращает копии гистограмм семейства: [(метки, гистограмма), ...]."""
+        with self._lock:
+            items = sorted(self._histograms.get(name, {}).items())
+            return [(dict(key), _copy_histogram(histogram)) for key, histogram in items]
+    
+    def counters(self, name: str) -> List[Tuple[Dict[str, str], float]]:
+        """Возвращает значения счётчиков семейства: [(метки, значение), ...]."""
+        with self._lock:
+            items = sorted(self._counters.get(name, {}).items())
+        return [(dict(key), value) for key, value in items]
+    
+    def counter_value(self, name: str, **labels: Any) -> float:
+        """Возвращает значение одного счётчика (0, если его нет)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels_key(labels), 0)
+    
+    def reset(self) -> None:
+        """Сбрасывает все метрики."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+    
+    def render_prometheus(self) -> str:
+        """
+        Выводит все метрики в текстовом формате Prometheus (version 0.0.4).
+        
+        Returns:
+            Текст для ответа на /metrics
+        """
+        with self._lock:
+            histograms = {name: [(key, _copy_histogram(h)) for key, h in sorted(family.items())]
+                          for name, family in self._histograms.items()}
+            counters = {name: sorted(family.items())
+                        for name, family in self._counters.items()}
+        
+        lines = []
+        for name in sorted(counters):
+            self._render_header(lines, name, 'counter')
+            for key, value in counters[name]:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        collected: Dict[Tuple[str, str], List[Tuple[Labels, float]]] = {}
+        for collector in self._collectors:
+            for name, kind, labels, value in collector():
+                collected.setdefault((name, kind), []).append((_labels_key(labels), value))
+        for (name, kind), samples in sorted(collected.items()):
+            self._render_header(lines, name, kind)
+            for key, value in samples:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        for name in sorted(histograms):
+            self._render_header(lines, name, 'histogram')
+            for key, histogram in histograms[name]:
+                for le, total in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', le),))} {total}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n' if lines else ''
+    
+    def _render_header(self, lines: List[str], name: str, kind: str) -> None:
+        """Добавляет строки # HELP и # TYPE семейства."""
+        help_text = self._help.get(name)
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _labels_key(labels: Dict[str, Any]) -> Labels:
+    """Приводит метки к неизменяемому ключу."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _copy_histogram(histogram: Histogram) -> Histogram:
+    """Копирует гистограмму (чтобы читать её без блокировки реестра)."""
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.count = histogram.count
+    copy.sum = histogram.sum
+    copy.max = histogram.max
+    return copy
+
+
+def _format_labels(key: Labels) -> str:
+    """Форматирует метки: {name="value",...}."""
+    if not key:
+        return ''
+    pairs = ','.join(f'{k}="{_escape(v)}"' for k, v in key)
+    return '{' + pairs + '}'
+
+
+def _escape(value: str) -> str:
+    """Экранирует значение метки."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: Optional[float]) -> str:
+    """Форматирует число без лишних знаков (целые — без дробной части)."""
+    if value is None:
+        return 'NaN'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
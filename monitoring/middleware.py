@@ -0,0 +1,176 @@
+"""Замер времени запросов Flask и подключение мониторинга к приложению."""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+from flask import Flask, Response, g, request, before_render_template, template_rendered
+from .instrument import CALL_METRIC, instrument_methods, timed
+from .metrics import MetricsRegistry
+
+REQUEST_METRIC = 'shop_http_request_duration_seconds'
+REQUESTS_TOTAL = 'shop_http_requests_total'
+TEMPLATE_METRIC = 'shop_template_render_seconds'
+IO_BYTES = 'shop_storage_bytes_total'
+IO_OPERATIONS = 'shop_storage_operations_total'
+
+
+class Monitoring:
+    """
+    Сбор метрик производительности приложения.
+    
+    Хуки before_request/after_request замеряют время каждого запроса
+    (гистограммы по маршруту и методу, счётчики по коду ответа),
+    сигналы Flask — время отрисовки шаблонов, обёртки методов —
+    время вызовов хранилища, репозиториев и поиска, а наблюдатель
+    ввода-вывода хранилищ — объём прочитанных и записанных данных.
+    
+    Выключенный мониторинг ничего не регистрирует и не оборачивает,
+    поэтому его накладные расходы сводятся к одной проверке флага
+    в функциях, отмеченных декоратором timed().
+    """
+    
+    def __init__(self, enabled: bool = False, registry: Optional[MetricsRegistry] = None):
+        """
+        Инициализирует мониторинг.
+        
+        Args:
+            enabled: Включить сбор метрик
+            registry: Реестр метрик (None — новый)
+        """
+        self.enabled = enabled
+        self.registry = registry or MetricsRegistry()
+        self.registry.describe(REQUEST_METRIC, 'Время обработки HTTP-запроса, с')
+        self.registry.describe(REQUESTS_TOTAL, 'Количество HTTP-запросов')
+        self.registry.describe(TEMPLATE_METRIC, 'Время отрисовки шаблона, с')
+        self.registry.describe(CALL_METRIC, 'Время вызова метода хранилища, репозитория или поиска, с')
+        self.registry.describe(IO_BYTES, 'Объём прочитанных и записанных данных, байт')
+        self.registry.describe(IO_OPERATIONS, 'Количество операций чтения и записи файлов')
+    
+    def init_app(self, app: Flask) -> None:
+        """
+        Подключает замер запросов и шаблонов к приложению.
+        
+        Хук начала запроса ставится первым, чтобы в замер попали
+        остальные хуки (например, перечитывание данных).
+        """
+        if not self.enabled:
+            return
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._start_template, app)
+        template_rendered.connect(self._finish_template, app)
+    
+    def instrument(self, layer: str, *objects: Any,
+                   methods: Optional[List[str]] = None) -> None:
+        """
+        Подключает замер вызовов и ввода-вывода объектов.
+        
+        Args:
+            layer: Слой для метки layer ('storage', 'repository', ...)
+            *objects: Объекты, методы которых нужно замерять
+            methods: Имена методов (None — все публичные)
+        """
+        if not self.enabled:
+            return
+        for obj in objects:
+            instrument_methods(obj, self.registry, layer, methods)
+            if hasattr(obj, 'io_observer'):
+                obj.io_observer = self.observe_io
+    
+    def timed(self, call: str, layer: str = 'app') -> Callable:
+        """
+        Декоратор для функций приложения (например, get_cart_service).
+        
+        Args:
+            call: Имя вызова для метки call
+            layer: Слой для метки layer
+        """
+        return timed(self.registry, CALL_METRIC, lambda: self.enabled, layer=layer, call=call)
+    
+    def observe_io(self, direction: str, file: str, size: int) -> None:
+        """Наблюдатель ввода-вывода хранилищ (см. IStorage.io_observer)."""
+        self.registry.inc(IO_BYTES, size, direction=direction, file=file)
+        self.registry.inc(IO_OPERATIONS, 1, direction=direction, file=file)
+    
+    def _start_request(self) -> None:
+        """Запоминает время начала запроса."""
+        g._metrics_started = time.perf_counter()
+    
+    def _record_request(self, status: int) -> None:
+        """Записывает время и код ответа текущего запроса (один раз)."""
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return
+        endpoint = request.endpoint or '<unmatched>'
+        self.registry.observe(REQUEST_METRIC, time.perf_counter() - started,
+                              endpoint=endpoint, method=request.method)
+        self.registry.inc(REQUESTS_TOTAL, 1, endpoint=endpoint, method=request.method,
+                          status=status)
+    
+    def _finish_request(self, response: Response) -> Response:
+        """Записывает метрики успешно обработанного запроса."""
+        self._record_request(response.status_code)
+        return response
+    
+    def _teardown_request(self, exc: Optional[BaseException]) -> None:
+        """Учитывает запрос, завершившийся необработанным исключением."""
+        self._record_request(500)
+    
+    def _start_template(self, sender: Flask, template: Any, context: Dict[str, Any],
+                        **extra: Any) -> None:
+        """Запоминает время начала отрисовки (шаблоны могут быть вложенными)."""
+        g.setdefault('_metrics_templates', []).append(time.perf_counter())
+    
+    def _finish_template(self, sender: Flask, template: Any, context: Dict[str, Any],
+                         **extra: Any) -> None:
+        """Записывает время отрисовки шаблона."""
+        starts = g.get('_metrics_templates')
+        if starts:
+            self.registry.observe(TEMPLATE_METRIC, time.perf_counter() - starts.pop(),
+                                  template=template.name or '<string>')
+    
+    def summary(self, name: str, *label_names: str) -> List[Dict[str, Any]]:
+        """
+        Сводка гистограмм семейства для страницы метрик.
+        
+        Args:
+            name: Имя семейства
+            *label_names: Метки, выводимые в таблице
+        
+        Returns:
+            Строки таблицы (метки, количество, среднее, p50/p95/p99, максимум
+            в миллисекундах), по убыванию суммарного времени
+        """
+        rows = []
+        for labels, histogram in self.registry.histograms(name):
+            row: Dict[str, Any] = {key: labels.get(key, '') for key in label_names}
+            row.update({
+                'count': histogram.count,
+                'total_ms': histogram.sum * 1000,
+                'mean_ms': histogram.mean * 1000,
+                'p50_ms': histogram.quantile(0.5) * 1000,
+                'p95_ms': histogram.quantile(0.95) * 1000,
+                'p99_ms': histogram.quantile(0.99) * 1000,
+                'max_ms': histogram.max * 1000,
+            })
+            rows.append(row)
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+    
+    def io_summary(self) -> List[Dict[str, Any]]:
+        """Сводка ввода-вывода по файлам: операции и байты чтения/записи."""
+        files: Dict[str, Dict[str, Any]] = {}
+        for metric, field in ((IO_BYTES, 'bytes'), (IO_OPERATIONS, 'ops')):
+            for labels, value in self.registry.counters(metric):
+                row = files.setdefault(labels['file'], {
+                    'file': labels['file'], 'read_ops': 0, 'read_bytes': 0,
+                    'write_ops': 0, 'write_bytes': 0,
+                })
+                row[f"{labels['direction']}_{field}"] = int(value)
+        return sorted(files.values(), key=lambda row: row['read_bytes'] + row['write_bytes'],
+                      reverse=True)
+    
+    def status_summary(self) -> List[Dict[str, Any]]:
+        """Количество запросов по маршрутам и кодам ответа."""
+        return [dict(labels, count=int(value))
+                for labels, value in self.registry.counters(REQUESTS_TOTAL)]
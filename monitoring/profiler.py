@@ -0,0 +1,309 @@
+"""Выборочное профилирование запросов с сохранением трасс на диск."""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from flask import Flask, g, request
+
+# Идентификатор трассы: время, PID и порядковый номер (сортируется по времени)
+_TRACE_ID = re.compile(r'^\d{8}-\d{6}-\d+-\d+$')
+
+
+class StackSampler:
+    """
+    Семплирующий профилировщик стеков.
+    
+    Фоновый поток раз в interval секунд снимает стеки потоков,
+    обрабатывающих запросы, и считает одинаковые стеки. Накладные
+    расходы малы и не зависят от глубины вызовов, поэтому семплер
+    можно держать включённым для всех запросов; поток спит, пока
+    отслеживаемых запросов нет.
+    """
+    
+    def __init__(self, interval: float = 0.01):
+        """
+        Инициализирует семплер.
+        
+        Args:
+            interval: Интервал между снимками стеков в секундах
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active: Dict[int, Counter] = {}
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, thread_id: int) -> None:
+        """Начинает снимать стеки потока."""
+        with self._lock:
+            self._active[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler',
+                                                daemon=True)
+                self._thread.start()
+            self._wakeup.set()
+    
+    def stop(self, thread_id: int) -> Counter:
+        """
+        Прекращает снимать стеки потока.
+        
+        Returns:
+            Количество снимков по свёрнутым стекам ("внешний;...;внутренний")
+        """
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+    
+    def _run(self) -> None:
+        """Цикл фонового потока."""
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._active:
+                    self._wakeup.clear()
+                    continue
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[self.collapse(frame)] += 1
+    
+    @staticmethod
+    def collapse(frame: Any) -> str:
+        """Сворачивает стек в строку (формат folded stacks для flame graph)."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+class RequestProfiler:
+    """
+    Профилирование медленных запросов в рабочем режиме.
+    
+    Доля sample_rate случайных запросов профилируется cProfile целиком.
+    Если задан порог slow_ms, остальные запросы отслеживаются
+    семплером стеков, и трасса сохраняется, когда запрос выполнялся
+    дольше порога. Трассы (.prof для cProfile, .folded для стеков)
+    и их описания (.json: маршрут, параметры, время, код ответа)
+    пишутся в кольцевую директорию: хранятся только последние keep.
+    """
+    
+    def __init__(self, directory: str, sample_rate: float = 0.0, slow_ms: float = 0.0,
+                 keep: int = 50, interval: float = 0.01):
+        """
+        Инициализирует профилировщик.
+        
+        Args:
+            directory: Директория трасс
+            sample_rate: Доля запросов, профилируемых cProfile (0 — выключено)
+            slow_ms: Порог медленного запроса в миллисекундах (0 — выключено)
+            keep: Сколько последних трасс хранить
+            interval: Интервал семплера стеков в секундах
+        """
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.keep = keep
+        self.sampler = StackSampler(interval)
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        """Включено ли профилирование."""
+        return self.sample_rate > 0 or self.slow_ms > 0
+    
+    def init_app(self, app: Flask) -> None:
+        """Подключает профилирование к запросам приложения."""
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+    
+    def _start_request(self) -> None:
+        """Решает, профилировать ли запрос, и запускает профилировщик."""
+        if request.endpoint in ('static', 'fingerprinted_asset'):
+            return
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Уже работает другой профилировщик (например, в соседнем потоке)
+                profile = None
+            if profile is not None:
+                g._profile = profile
+                g._profile_started = time.perf_counter()
+                return
+        if self.slow_ms > 0:
+            self.sampler.start(threading.get_ident())
+            g._profile = 'stack'
+            g._profile_started = time.perf_counter()
+    
+    def _finish_request(self, response: Any) -> Any:
+        """Запоминает код ответа для описания трассы."""
+        if '_profile' in g:
+            g._profile_status = response.status_code
+        return response
+    
+    def _teardown_request(self, exc: Optional[BaseException]) -> None:
+        """Останавливает профилировщик и сохраняет трассу."""
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+        duration_ms = (time.perf_counter() - g.pop('_profile_started')) * 1000
+        status = g.pop('_profile_status', 500)
+        if profile == 'stack':
+            stacks = self.sampler.stop(threading.get_ident())
+            if duration_ms >= self.slow_ms and stacks:
+                self._save('stack', 'slow', duration_ms, status,
+                           lambda path: self._write_folded(path, stacks),
+                           samples=sum(stacks.values()))
+        else:
+            profile.disable()
+            reason = 'slow' if self.slow_ms > 0 and duration_ms >= self.slow_ms else 'sample'
+            self._save('cprofile', reason, duration_ms, status, profile.dump_stats)
+    
+    def _next_id(self) -> str:
+        """Создаёт идентификатор трассы."""
+        with self._counter_lock:
+            self._counter += 1
+            counter = self._counter
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{counter}"
+    
+    def _save(self, kind: str, reason: str, duration_ms: float, status: int,
+              write: Any, **extra: Any) -> None:
+        """
+        Сохраняет трассу и её описание, затем удаляет старые трассы.
+        
+        Описание пишется последним: трасса появляется в списке,
+        только когда файл с данными уже записан.
+        """
+        trace_id = self._next_id()
+        data_file = f"{trace_id}.{'prof' if kind == 'cprofile' else 'folded'}"
+        meta = {
+            'id': trace_id,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'kind': kind,
+            'reason': reason,
+            'endpoint': request.endpoint or '<unmatched>',
+            'method': request.method,
+            'path': request.path,
+            'args': {key: value[:200] for key, value in request.args.items()},
+            'status': status,
+            'duration_ms': round(duration_ms, 2),
+            'file': data_file,
+            **extra,
+        }
+        try:
+            write(str(self.directory / data_file))
+            tmp_path = self.directory / f".{trace_id}.json.tmp"
+            tmp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, self.directory / f"{trace_id}.json")
+        except OSError as e:
+            print(f"Ошибка при сохранении трассы {trace_id}: {e}")
+            return
+        self._prune()
+    
+    @staticmethod
+    def _write_folded(path: str, stacks: Counter) -> None:
+        """Записывает стеки в формате folded stacks: "стек количество"."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+    
+    def _prune(self) -> None:
+        """Оставляет только последние keep трасс."""
+        metas = sorted(self.directory.glob('*.json'), key=self._sort_key)
+        for meta_path in metas[:-self.keep] if self.keep > 0 else metas:
+            trace_id = meta_path.stem
+            for suffix in ('.json', '.prof', '.folded'):
+                try:
+                    (self.directory / f"{trace_id}{suffix}").unlink()
+                except FileNotFoundError:
+                    pass
+    
+    @staticmethod
+    def _sort_key(path: Path) -> tuple:
+        """Ключ сортировки трасс по времени (номер внутри секунды — числом)."""
+        date, clock, pid, counter = path.stem.split('-')
+        return date, clock, int(counter), int(pid)
+    
+    def list_traces(self) -> List[Dict[str, Any]]:
+        """Возвращает описания сохранённых трасс, новые первыми."""
+        if not self.directory.exists():
+            return []
+        traces = []
+        for meta_path in sorted(self.directory.glob('*.json'), key=self._sort_key, reverse=True):
+            try:
+                traces.append(json.loads(meta_path.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                # Трасса удалена другим процессом во время чтения
+                continue
+        return traces
+    
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает описание трассы по идентификатору (None, если её нет)."""
+        if not _TRACE_ID.match(trace_id):
+            return None
+        try:
+            return json.loads((self.directory / f"{trace_id}.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+    
+    def report(self, trace: Dict[str, Any], limit: int = 40) -> str:
+        """
+        Формирует текстовый отчёт по трассе.
+        
+        Для cProfile — функции по суммарному времени (pstats),
+        для стеков — доля снимков, в которых функция была на вершине
+        стека или в любом его месте.
+        
+        Args:
+            trace: Описание трассы (get_trace)
+            limit: Количество строк отчёта
+        """
+        path = self.directory / trace['file']
+        out = io.StringIO()
+        try:
+            if trace['kind'] == 'cprofile':
+                stats = pstats.Stats(str(path), stream=out)
+                stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+                stats.sort_stats('tottime').print_stats(limit)
+                return out.getvalue()
+            
+            own: Counter = Counter()
+            inclusive: Counter = Counter()
+            total = 0
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    names = stack.split(';')
+                    own[names[-1]] += int(count)
+                    for name in set(names):
+                        inclusive[name] += int(count)
+                    total += int(count)
+            out.write(f"Снимков стека: {total}\n")
+            for title, counter in (('на вершине стека', own), ('включая вызванные', inclusive)):
+                out.write(f"\nФункции {title}:\n  доля  снимков  функция\n")
+                for name, count in counter.most_common(limit):
+                    out.write(f"{count / total:6.1%}  {count:7d}  {name}\n")
+            return out.getvalue()
+        except (OSError, ValueError, TypeError) as e:
+            return f"Ошибка при чтении трассы {trace['id']}: {e}"
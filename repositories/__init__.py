@@ -3,6 +3,7 @@
 from .product_repository import ProductRepository
 from .order_repository import OrderRepository
 from .cart_repository import CartRepository
+from .metrics_repository import MetricsRepository
 
-__all__ = ['ProductRepository', 'OrderRepository', 'CartRepository']
+__all__ = ['ProductRepository', 'OrderRepository', 'CartRepository', 'MetricsRepository']
 
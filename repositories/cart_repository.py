@@ -1,28 +1,51 @@
 """Репозиторий для работы с корзиной (Single Responsibility Principle)."""
 
+from typing import Optional
 from models import Cart
-from storage import IStorage
+from storage import IStorage, ICartStore
 
 
 class CartRepository:
     """Репозиторий для работы с корзиной."""
     
-    def __init__(self, storage: IStorage):
+    def __init__(self, storage: IStorage, cart_store: Optional[ICartStore] = None):
         """
         Инициализирует репозиторий корзины.
         
         Args:
             storage: Реализация интерфейса хранилища
+            cart_store: Хранилище корзин по сессиям (если None, используется
+                одна общая корзина из storage)
         """
         self.storage = storage
+        self.cart_store = cart_store
     
-    def load(self) -> Cart:
-        """Загружает корзину из хранилища."""
+    def load(self, cart_id: Optional[str] = None) -> Cart:
+        """
+        Загружает корзину.
+        
+        Args:
+            cart_id: Идентификатор корзины (сессии); None — общая корзина
+        """
+        if cart_id is not None and self.cart_store is not None:
+            cart_data = self.cart_store.load(cart_id)
+            return Cart.from_dict(cart_data) if cart_data else Cart()
         cart_data = self.storage.load_cart()
         return Cart.from_dict(cart_data)
     
-    def save(self, cart: Cart) -> None:
-        """Сохраняет корзину в хранилище."""
+    def save(self, cart: Cart, cart_id: Optional[str] = None) -> None:
+        """
+        Сохраняет корзину.
+        
+        Args:
+            cart: Корзина
+            cart_id: Идентификатор корзины (сессии); None — общая корзина
+        """
         cart_data = cart.to_dict()
+        if cart_id is not None and self.cart_store is not None:
+            if cart.items:
+                self.cart_store.save(cart_id, cart_data)
+            else:
+                self.cart_store.delete(cart_id)
+            return
         self.storage.save_cart(cart_data)
-
@@ -0,0 +1,27 @@
+"""Репозиторий для статистики продаж (Single Responsibility Principle)."""
+
+from typing import Optional
+from services.sales_metrics import SalesMetrics
+from storage import IStorage
+
+
+class MetricsRepository:
+    """Репозиторий для сохранения агрегатов продаж."""
+    
+    def __init__(self, storage: IStorage):
+        """
+        Инициализирует репозиторий статистики.
+        
+        Args:
+            storage: Реализация интерфейса хранилища
+        """
+        self.storage = storage
+    
+    def load(self) -> Optional[SalesMetrics]:
+        """Загружает статистику (None, если она ещё не сохранялась)."""
+        data = self.storage.load_metrics()
+        return SalesMetrics.from_dict(data) if data else None
+    
+    def save(self, metrics: SalesMetrics) -> None:
+        """Сохраняет статистику."""
+        self.storage.save_metrics(metrics.to_dict())
@@ -1,6 +1,6 @@
 """Репозиторий для работы с заказами (Single Responsibility Principle)."""
 
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from models import Order
 from storage import IStorage
 
@@ -18,25 +18,52 @@ class OrderRepository:
         self.storage = storage
     
     def get_all(self) -> List[Order]:
-        """Возвращает все заказы."""
-        orders_data = self.storage.load_orders()
-        return [Order.from_dict(odata) for odata in orders_data]
+        """Возвращает все заказы (типизированным декодером хранилища)."""
+        return self.storage.load_order_models()
     
     def get_by_id(self, order_id: int) -> Optional[Order]:
         """Возвращает заказ по ID."""
-        orders = self.get_all()
-        for order in orders:
-            if order.id == order_id:
-                return order
-        return None
+        order_data = self.storage.load_order(order_id)
+        return Order.from_dict(order_data) if order_data else None
+    
+    def get_after(self, order_id: int) -> List[Order]:
+        """Возвращает заказы с ID больше order_id (в порядке возрастания ID)."""
+        return [Order.from_dict(odata) for odata in self.storage.load_orders_after(order_id)]
+    
+    def get_max_id(self) -> int:
+        """Возвращает наибольший ID заказа (0, если заказов нет)."""
+        return self.storage.max_order_id()
+    
+    def get_page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+                 start: Optional[str] = None, end: Optional[str] = None) -> List[Order]:
+        """Возвращает страницу заказов (новые первыми) без загрузки всей истории."""
+        orders_data = self.storage.load_orders_page(before, limit, start, end)
+        return [Order.from_dict(odata) for odata in orders_data]
+    
+    def iter_between(self, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Iterator[Order]:
+        """Перебирает заказы интервала [start, end) по возрастанию ID, не загружая историю."""
+        for odata in self.storage.iter_orders(start, end):
+            yield Order.from_dict(odata)
     
     def save(self, order: Order) -> Order:
-        """Сохраняет заказ."""
-        orders_data = self.storage.load_orders()
-        orders_data.append(order.to_dict())
-        self.storage.save_orders(orders_data)
+        """Сохраняет заказ (дозаписью, если хранилище это поддерживает)."""
+        self.storage.append_order(order.to_dict())
         return order
     
+    def save_many(self, orders: List[Order], sync: bool = False) -> bool:
+        """
+        Сохраняет пакет новых заказов одной записью.
+        
+        Args:
+            orders: Заказы в порядке возрастания ID
+            sync: Дождаться записи на диск (fsync)
+        
+        Returns:
+            True если запись успешна
+        """
+        return self.storage.append_orders([o.to_dict() for o in orders], sync=sync)
+    
     def save_all(self, orders: List[Order]) -> None:
         """Сохраняет все заказы."""
         orders_data = [o.to_dict() for o in orders]
@@ -1,6 +1,6 @@
 """Репозиторий для работы с товарами (Single Responsibility Principle)."""
 
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 from models import Product
 from storage import IStorage
 
@@ -18,12 +18,8 @@ class ProductRepository:
         self.storage = storage
     
     def get_all(self) -> Dict[int, Product]:
-        """Возвращает все товары."""
-        products_data = self.storage.load_products()
-        return {
-            pid: Product.from_dict(pdata)
-            for pid, pdata in products_data.items()
-        }
+        """Возвращает все товары (типизированным декодером хранилища)."""
+        return self.storage.load_product_models()
     
     def get_by_id(self, product_id: int) -> Optional[Product]:
         """Возвращает товар по ID."""
@@ -34,10 +30,16 @@ class ProductRepository:
     
     def save(self, product: Product) -> Product:
         """Сохраняет товар."""
-        products_data = self.storage.load_products()
-        products_data[product.id] = product.to_dict()
-        self.storage.save_products(products_data)
-        return product
+        # Чтение-изменение-запись под блокировкой: файл могут менять другие процессы
+        with self.storage.lock():
+            products_data = self.storage.load_products()
+            products_data[product.id] = product.to_dict()
+            self.storage.save_products(products_data)
+            return product
+    
+    def save_many(self, products: Iterable[Product]) -> bool:
+        """Добавляет или обновляет несколько товаров одной записью в хранилище."""
+        return self.storage.upsert_products({p.id: p.to_dict() for p in products})
     
     def save_all(self, products: Dict[int, Product]) -> None:
         """Сохраняет все товары."""
@@ -46,9 +48,10 @@ class ProductRepository:
     
     def delete(self, product_id: int) -> bool:
         """Удаляет товар."""
-        products_data = self.storage.load_products()
-        if product_id not in products_data:
-            return False
-        del products_data[product_id]
-        return self.storage.save_products(products_data)
+        with self.storage.lock():
+            products_data = self.storage.load_products()
+            if product_id not in products_data:
+                return False
+            del products_data[product_id]
+            return self.storage.save_products(products_data)
 
@@ -0,0 +1,34 @@
+"""Скрипт для сборки версионированных копий CSS/JS (static/dist)."""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from assets import AssetManifest
+
+
+def build_assets(minify: bool = True, compress: bool = True) -> None:
+    """
+    Собирает манифест статических файлов.
+    
+    Args:
+        minify: Минифицировать CSS
+        compress: Создавать сжатые копии (.gz, .br)
+    """
+    manifest = AssetManifest(static_dir=str(Path(__file__).parent.parent / 'static'))
+    entries = manifest.build(minify=minify, compress=compress)
+    
+    print("SHOP SHIPS - Сборка статических файлов...")
+    for source, target in entries.items():
+        print(f"[OK] {source} -> dist/{target}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--no-minify', action='store_true', help='не минифицировать CSS')
+    parser.add_argument('--no-compress', action='store_true', help='не создавать .gz/.br')
+    args = parser.parse_args()
+    build_assets(minify=not args.no_minify, compress=not args.no_compress)
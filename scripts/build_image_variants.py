@@ -0,0 +1,41 @@
+"""Скрипт для создания уменьшенных копий и WebP-вариантов изображений товаров."""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from assets import ImagePipeline
+from data_manager import DataManager
+
+
+def build_image_variants(force: bool = False) -> None:
+    """
+    Обрабатывает изображения всех товаров каталога.
+    
+    Args:
+        force: Пересоздать варианты даже для неизменённых изображений
+    """
+    root = Path(__file__).parent.parent
+    pipeline = ImagePipeline(static_dir=str(root / 'static'))
+    if not pipeline.available:
+        print("Для обработки изображений установите Pillow: pip install Pillow")
+        return
+    
+    data_manager = DataManager()
+    images = [p.image for p in data_manager.get_all_products().values() if p.image]
+    
+    print(f"SHOP SHIPS - Обработка изображений ({len(set(images))} файлов)...")
+    counts = pipeline.process_all(images, force=force)
+    print(f"[OK] Обработано: {counts['processed']}")
+    if counts['failed']:
+        print(f"[!] Не удалось обработать: {counts['failed']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--force', action='store_true', help='пересоздать все варианты')
+    args = parser.parse_args()
+    build_image_variants(force=args.force)
@@ -0,0 +1,78 @@
+"""Скрипт для выгрузки заказов в CSV или JSON Lines."""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from repositories import OrderRepository, ProductRepository
+from services import ExportService
+from storage import AppendLogStorage, IStorage, SQLiteStorage
+
+
+def parse_day(value: Optional[str], next_day: bool = False) -> Optional[str]:
+    """
+    Преобразует дату ГГГГ-ММ-ДД в границу интервала (ISO 8601).
+    
+    Args:
+        value: Дата или None
+        next_day: Вернуть начало следующего дня (включительная верхняя граница)
+    """
+    if not value:
+        return None
+    day = datetime.strptime(value, '%Y-%m-%d')
+    return (day + timedelta(days=1) if next_day else day).isoformat()
+
+
+def export_orders(storage: IStorage, fmt: str, output: Optional[str] = None,
+                  date_from: Optional[str] = None, date_to: Optional[str] = None) -> None:
+    """
+    Выгружает заказы, не загружая историю в память.
+    
+    Args:
+        storage: Хранилище
+        fmt: Формат: 'csv' или 'jsonl'
+        output: Файл результата (None — стандартный вывод)
+        date_from: Первый день интервала (ГГГГ-ММ-ДД, включительно)
+        date_to: Последний день интервала (ГГГГ-ММ-ДД, включительно)
+    """
+    products = ProductRepository(storage).get_all()
+    orders = OrderRepository(storage).iter_between(parse_day(date_from),
+                                                  parse_day(date_to, next_day=True))
+    
+    out = open(output, 'w', encoding='utf-8', newline='') if output else sys.stdout
+    try:
+        for chunk in ExportService(products).export(orders, fmt):
+            out.write(chunk)
+    finally:
+        if output:
+            out.close()
+    if output:
+        print(f"[OK] Заказы выгружены в {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--format', choices=ExportService.FORMATS, default='csv',
+                        help='формат выгрузки')
+    parser.add_argument('--from', dest='date_from', help='первый день (ГГГГ-ММ-ДД)')
+    parser.add_argument('--to', dest='date_to', help='последний день (ГГГГ-ММ-ДД)')
+    parser.add_argument('-o', '--output', help='файл результата (по умолчанию stdout)')
+    parser.add_argument('--data-dir', default='data', help='директория с JSON-файлами')
+    parser.add_argument('--db', help='путь к базе SQLite (вместо JSON-файлов)')
+    args = parser.parse_args()
+    
+    try:
+        parse_day(args.date_from), parse_day(args.date_to)
+    except ValueError:
+        parser.error('даты указываются в формате ГГГГ-ММ-ДД')
+    
+    storage = SQLiteStorage(args.db) if args.db else AppendLogStorage(args.data_dir)
+    try:
+        export_orders(storage, args.format, args.output, args.date_from, args.date_to)
+    finally:
+        storage.close()
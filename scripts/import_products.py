@@ -0,0 +1,71 @@
+"""Скрипт для массового импорта товаров из CSV или JSON Lines."""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_manager import DataManager
+from services import ImportService
+from storage import AppendLogStorage, SQLiteStorage
+
+
+def import_products(path: str, data_manager: DataManager, fmt: Optional[str] = None,
+                    batch_size: int = 1000, max_errors: Optional[int] = None) -> bool:
+    """
+    Импортирует товары и выводит отчёт.
+    
+    Товары сопоставляются с каталогом по артикулу (sku), а без него —
+    по названию; все изменения сохраняются одной записью.
+    
+    Args:
+        path: Путь к файлу (колонки: name, price, description, in_stock, image, sku)
+        data_manager: Менеджер данных
+        fmt: Формат файла (None — по расширению)
+        batch_size: Размер пакета проверки
+        max_errors: Допустимое количество ошибочных строк
+    
+    Returns:
+        True если импорт выполнен
+    """
+    service = ImportService(batch_size=batch_size, max_errors=max_errors)
+    print(f"SHOP SHIPS - Импорт товаров из {path}...")
+    try:
+        report = service.import_file(path, data_manager.bulk_upsert_products, fmt)
+    except (IOError, ValueError) as e:
+        print(f"Ошибка импорта: {e}. Каталог не изменён.")
+        return False
+    
+    for line_no, message in report.errors[:20]:
+        print(f"[!] Строка {line_no}: {message}")
+    if len(report.errors) > 20:
+        print(f"[!] ... и ещё {len(report.errors) - 20} ошибок")
+    
+    print(f"[OK] Добавлено: {report.created}")
+    print(f"[OK] Обновлено: {report.updated}")
+    print(f"[OK] Без изменений: {report.unchanged}")
+    print(f"\nОбработано {report.rows} строк за {report.elapsed:.2f} с "
+          f"({report.rate:,.0f} строк/с), ошибок: {len(report.errors)}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('path', help='файл CSV или JSON Lines')
+    parser.add_argument('--format', choices=ImportService.FORMATS,
+                        help='формат файла (по умолчанию — по расширению)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='размер пакета проверки')
+    parser.add_argument('--max-errors', type=int,
+                        help='прервать импорт, если ошибочных строк больше')
+    parser.add_argument('--data-dir', default='data', help='директория с JSON-файлами')
+    parser.add_argument('--db', help='путь к базе SQLite (вместо JSON-файлов)')
+    args = parser.parse_args()
+    
+    storage = SQLiteStorage(args.db) if args.db else AppendLogStorage(args.data_dir)
+    ok = import_products(args.path, DataManager(storage=storage), args.format,
+                         args.batch_size, args.max_errors)
+    storage.close()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,40 @@
+"""Скрипт для переноса данных из JSON-файлов в базу SQLite."""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Добавляем корневую директорию в путь
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage import AppendLogStorage, SQLiteStorage
+
+
+def migrate(data_dir: str, db_path: str) -> None:
+    """
+    Переносит товары, заказы и корзину из data/*.json в SQLite.
+    
+    Args:
+        data_dir: Директория с JSON-файлами
+        db_path: Путь к файлу базы данных
+    """
+    source = AppendLogStorage(data_dir)
+    target = SQLiteStorage(db_path)
+    
+    print(f"SHOP SHIPS - Перенос данных из {data_dir} в {db_path}...")
+    counts = target.import_from(source)
+    source.close()
+    target.close()
+    
+    print(f"[OK] Товаров: {counts['products']}")
+    print(f"[OK] Заказов: {counts['orders']}")
+    print(f"[OK] Позиций в корзине: {counts['cart_items']}")
+    print("\nПеренос завершён. Используйте DataManager(storage=SQLiteStorage(...))")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data-dir', default='data', help='директория с JSON-файлами')
+    parser.add_argument('--db', default='data/shop.db', help='путь к базе SQLite')
+    args = parser.parse_args()
+    migrate(args.data_dir, args.db)
@@ -6,7 +6,6 @@ from pathlib import Path
 # Добавляем корневую директорию в путь
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from models import Product
 from data_manager import DataManager
 
 
@@ -169,21 +168,14 @@ def populate_products():
     
     print("SHOP SHIPS - Наполнение магазина товарами...")
     
-    added_count = 0
+    # Одна запись в хранилище вместо перезаписи каталога на каждый товар;
+    # повторный запуск обновляет товары с теми же названиями
+    counts = data_manager.bulk_upsert_products(products_data)
     for product_data in products_data:
-        product = Product(
-            id=0,
-            name=product_data["name"],
-            description=product_data["description"],
-            price=product_data["price"],
-            in_stock=product_data["in_stock"]
-        )
-        
-        created_product = data_manager.add_product(product)
-        added_count += 1
-        print(f"[OK] Добавлен товар: {created_product.name} - ${created_product.price:,.2f}")
+        print(f"[OK] {product_data['name']} - ${product_data['price']:,.2f}")
     
-    print(f"\nУспешно добавлено {added_count} товаров!")
+    print(f"\nДобавлено товаров: {counts['created']}, обновлено: {counts['updated']}, "
+          f"без изменений: {counts['unchanged']}")
     print("Товары доступны в магазине")
 
 
@@ -0,0 +1,6 @@
+"""Полнотекстовый поиск по каталогу товаров."""
+
+from .text import normalize, tokenize, stem
+from .index import SearchIndex
+
+__all__ = ['SearchIndex', 'normalize', 'tokenize', 'stem']
@@ -0,0 +1,214 @@
+"""Инвертированный индекс товаров с ранжированием BM25."""
+
+import heapq
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+from models import Product
+from .text import tokenize
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс по названиям и описаниям товаров.
+    
+    Индекс обновляется инкрементально (add/remove), последний термин
+    запроса сопоставляется по префиксу (поиск по мере ввода), результаты
+    ранжируются по BM25 с повышенным весом названия.
+    """
+    
+    K1 = 1.2
+    B = 0.75
+    NAME_WEIGHT = 3
+    
+    def __init__(self):
+        """Создаёт пустой индекс."""
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+        self._terms: List[str] = []
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        """Возвращает количество проиндексированных товаров."""
+        return len(self._doc_len)
+    
+    def _analyze(self, product: Product) -> Counter:
+        """Считает взвешенные частоты термов товара."""
+        terms = Counter()
+        for term in tokenize(product.name):
+            terms[term] += self.NAME_WEIGHT
+        terms.update(tokenize(product.description))
+        return terms
+    
+    def rebuild(self, products: Iterable[Product]) -> None:
+        """Перестраивает индекс целиком."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_len.clear()
+            self._total_len = 0
+            for product in products:
+                self._add(product, keep_sorted=False)
+            self._terms = sorted(self._postings)
+    
+    def add(self, product: Product) -> None:
+        """Добавляет или переиндексирует товар."""
+        with self._lock:
+            self._remove(product.id)
+            self._add(product)
+    
+    def add_many(self, products: Iterable[Product]) -> None:
+        """
+        Добавляет или переиндексирует несколько товаров.
+        
+        Словарь термов сортируется один раз в конце, а не при каждом
+        новом терме, поэтому массовый импорт не замедляется вставками.
+        """
+        products = list(products)
+        with self._lock:
+            for product in products:
+                self._remove(product.id)
+            for product in products:
+                self._add(product, keep_sorted=False)
+            self._terms = sorted(self._postings)
+    
+    def remove(self, product_id: int) -> None:
+        """Удаляет товар из индекса."""
+        with self._lock:
+            self._remove(product_id)
+    
+    def _add(self, product: Product, keep_sorted: bool = True) -> None:
+        """
+        Добавляет товар (вызывается под блокировкой).
+        
+        Args:
+            product: Товар
+            keep_sorted: Поддерживать отсортированный словарь (при полной
+                перестройке словарь сортируется один раз в конце)
+        """
+        terms = self._analyze(product)
+        self._doc_terms[product.id] = terms
+        length = sum(terms.values())
+        self._doc_len[product.id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if keep_sorted:
+                    insort(self._terms, term)
+            postings[product.id] = tf
+    
+    def _remove(self, product_id: int) -> None:
+        """Удаляет товар (вызывается под блокировкой)."""
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(product_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[product_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+    
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Возвращает все термы словаря, начинающиеся с prefix."""
+        start = bisect_left(self._terms, prefix)
+        matches = []
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+    
+    def search(self, query: str, limit: int = 0) -> List[int]:
+        """
+        Ищет товары по запросу.
+        
+        Все слова запроса должны встречаться в товаре; последнее слово
+        может быть неполным (сопоставляется по префиксу).
+        
+        Args:
+            query: Поисковый запрос
+            limit: Максимальное количество результатов (0 — без ограничения)
+        
+        Returns:
+            ID найденных товаров в порядке убывания релевантности
+        
+        Единственное и множественное число находят одни и те же товары:
+        
+            >>> index = SearchIndex()
+            >>> index.rebuild([Product(1, 'Phone case', '', 10.0),
+            ...                Product(2, 'Game boxes', '', 5.0)])
+            >>> index.search('phones case'), index.search('phone cases')
+            ([1], [1])
+            >>> index.search('games box'), index.search('game boxes')
+            ([2], [2])
+            >>> index.search('cases'), index.search('case')
+            ([1], [1])
+        """
+        query_terms = tokenize(query)
+        if not query_terms:
+            return []
+        
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            
+            # Для каждого слова запроса — список подходящих термов словаря
+            groups = []
+            for position, query_term in enumerate(query_terms):
+                if position == len(query_terms) - 1:
+                    terms = self._expand_prefix(query_term)
+                else:
+                    terms = [query_term] if query_term in self._postings else []
+                if not terms:
+                    return []
+                groups.append([self._postings[term] for term in terms])
+            
+            # Пересекаем множества документов, начиная с самого редкого слова
+            groups.sort(key=lambda postings_list: sum(len(p) for p in postings_list))
+            candidates: Set[int] = set()
+            for postings in groups[0]:
+                candidates.update(postings)
+            for postings_list in groups[1:]:
+                candidates = {
+                    doc_id for doc_id in candidates
+                    if any(doc_id in postings for postings in postings_list)
+                }
+                if not candidates:
+                    return []
+            
+            scores = self._score(candidates, groups, n_docs)
+        
+        if limit:
+            return heapq.nsmallest(limit, candidates, key=lambda d: (-scores[d], d))
+        return sorted(candidates, key=lambda d: (-scores[d], d))
+    
+    def _score(self, candidates: Set[int], groups: List[List[Dict[int, int]]],
+               n_docs: int) -> Dict[int, float]:
+        """Вычисляет BM25 для документов-кандидатов (под блокировкой)."""
+        k1 = self.K1
+        b = self.B
+        avg_len = self._total_len / n_docs
+        doc_len = self._doc_len
+        
+        scores = dict.fromkeys(candidates, 0.0)
+        for postings_list in groups:
+            for postings in postings_list:
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                if df > len(candidates):
+                    pairs = ((d, postings[d]) for d in candidates if d in postings)
+                else:
+                    pairs = ((d, tf) for d, tf in postings.items() if d in scores)
+                for doc_id, tf in pairs:
+                    norm = k1 * (1 - b + b * doc_len[doc_id] / avg_len)
+                    scores[doc_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
@@ -0,0 +1,74 @@
+"""Нормализация и разбиение текста на термы (русский и английский)."""
+
+import re
+from functools import lru_cache
+from typing import List
+
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+_CYRILLIC_RE = re.compile(r'[а-я]')
+
+# Окончания русских слов (от длинных к коротким)
+_RU_ENDINGS = (
+    'иями', 'ями', 'ами', 'его', 'ого', 'ему', 'ому', 'ыми', 'ими',
+    'ией', 'иях', 'ах', 'ях', 'ам', 'ям', 'ов', 'ев', 'ей', 'ой',
+    'ий', 'ый', 'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ую', 'юю', 'ом', 'ем',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+)
+
+# Окончания английских слов и их замены
+_EN_ENDINGS = (
+    ('ies', 'y'), ('sses', 'ss'), ('ing', ''), ('ed', ''), ('es', ''), ('s', ''),
+)
+# Основы, после которых множественное число образуется через -es (boxes, watches);
+# в остальных словах отбрасывается только -s (phones, cases), а -sses — правило выше
+_EN_ES_STEMS = ('x', 'z', 'ch', 'sh')
+
+_MIN_STEM = 3
+
+
+def normalize(text: str) -> str:
+    """Приводит текст к нижнему регистру и заменяет «ё» на «е»."""
+    return text.lower().replace('ё', 'е')
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """
+    Отбрасывает типичное окончание слова (упрощённый стемминг).
+    
+    Args:
+        token: Нормализованный токен
+    
+    Returns:
+        Основа слова; числа и короткие слова возвращаются без изменений
+    """
+    if len(token) <= _MIN_STEM or token.isdigit():
+        return token
+    
+    if _CYRILLIC_RE.search(token):
+        for ending in _RU_ENDINGS:
+            if token.endswith(ending) and len(token) - len(ending) >= _MIN_STEM:
+                return token[:-len(ending)]
+        return token
+    
+    for ending, replacement in _EN_ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= _MIN_STEM:
+            if ending == 's' and token.endswith('ss'):
+                break
+            if ending == 'es' and not token[:-2].endswith(_EN_ES_STEMS):
+                continue
+            return token[:-len(ending)] + replacement
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Разбивает текст на нормализованные основы слов.
+    
+    Args:
+        text: Исходный текст
+    
+    Returns:
+        Список термов в порядке следования
+    """
+    return [stem(token) for token in _TOKEN_RE.findall(normalize(text))]
@@ -3,6 +3,9 @@
 from .cart_service import CartService
 from .product_service import ProductService
 from .order_service import OrderService
+from .export_service import ExportService
+from .import_service import ImportService, ImportReport
+from .pagination import Page
 
-__all__ = ['CartService', 'ProductService', 'OrderService']
+__all__ = ['CartService', 'ProductService', 'OrderService', 'ExportService', 'ImportService', 'ImportReport', 'Page']
 
@@ -1,18 +1,18 @@
 """Базовые классы для сервисов (DRY принцип)."""
 
-from typing import Dict
+from typing import Mapping
 from models import Product
 
 
 class BaseService:
     """Базовый класс для сервисов с общими методами."""
     
-    def __init__(self, products: Dict[int, Product]):
+    def __init__(self, products: Mapping[int, Product]):
         """
         Инициализирует базовый сервис.
         
         Args:
-            products: Словарь товаров
+            products: Словарь товаров (или снимок каталога)
         """
         self.products = products
     
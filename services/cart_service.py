@@ -1,6 +1,6 @@
 """Сервис для работы с корзиной покупок."""
 
-from typing import Dict
+from typing import Dict, Mapping
 from models import Cart, Product
 from .base_service import BaseService
 
@@ -8,7 +8,7 @@ from .base_service import BaseService
 class CartService(BaseService):
     """Сервис для работы с корзиной покупок."""
     
-    def __init__(self, cart: Cart, products: Dict[int, Product]):
+    def __init__(self, cart: Cart, products: Mapping[int, Product]):
         """
         Инициализирует сервис корзины.
         
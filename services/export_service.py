@@ -0,0 +1,135 @@
+"""Сервис потоковой выгрузки заказов (CSV и JSON Lines)."""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+from models import Order
+from .base_service import BaseService
+
+
+class ExportService(BaseService):
+    """
+    Сервис выгрузки заказов.
+    
+    Заказы перебираются по одному, а результат отдаётся небольшими
+    фрагментами текста, поэтому расход памяти не зависит от размера
+    истории, а первые байты доступны сразу. Позиции заказов дополняются
+    названиями товаров из каталога; цена — текущая цена товара
+    (в заказе хранятся только количества и итоговая сумма).
+    """
+    
+    FORMATS = ('csv', 'jsonl')
+    MIMETYPES = {
+        'csv': 'text/csv; charset=utf-8',
+        'jsonl': 'application/x-ndjson; charset=utf-8',
+    }
+    CSV_COLUMNS = ('order_id', 'created_at', 'order_total', 'product_id',
+                   'product_name', 'quantity', 'price', 'subtotal')
+    # Сколько заказов собирается в один фрагмент ответа
+    BATCH_SIZE = 100
+    
+    def export(self, orders: Iterable[Order], fmt: str) -> Iterator[str]:
+        """
+        Выгружает заказы в заданном формате.
+        
+        Args:
+            orders: Заказы (итератор, например DataManager.iter_orders)
+            fmt: Формат: 'csv' или 'jsonl'
+        
+        Returns:
+            Итератор фрагментов текста
+        
+        Raises:
+            ValueError: Если формат неизвестен
+        """
+        if fmt == 'csv':
+            return self.iter_csv(orders)
+        if fmt == 'jsonl':
+            return self.iter_jsonl(orders)
+        raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+    
+    def _line_items(self, order: Order) -> List[Dict[str, Any]]:
+        """Возвращает позиции заказа с названиями и ценами товаров."""
+        items = []
+        for product_id, quantity in order.cart.items.items():
+            product = self.products.get(product_id)
+            price = product.price if product else None
+            items.append({
+                'product_id': product_id,
+                'product_name': product.name if product else '',
+                'quantity': quantity,
+                'price': price,
+                'subtotal': round(price * quantity, 2) if price is not None else None,
+            })
+        return items
+    
+    def iter_csv(self, orders: Iterable[Order]) -> Iterator[str]:
+        """
+        Выгружает заказы в CSV: одна строка на позицию заказа.
+        
+        Заказ без позиций занимает одну строку с пустыми полями товара.
+        Файл начинается с BOM, чтобы Excel распознал UTF-8.
+        
+        Args:
+            orders: Заказы
+        
+        Returns:
+            Итератор фрагментов CSV (первый — заголовок)
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.CSV_COLUMNS)
+        yield '\ufeff' + self._drain(buffer)
+        
+        pending = 0
+        for order in orders:
+            head = [order.id, order.created_at, f"{order.total:.2f}"]
+            items = self._line_items(order)
+            if not items:
+                writer.writerow(head + [''] * 5)
+            for item in items:
+                price, subtotal = item['price'], item['subtotal']
+                writer.writerow(head + [
+                    item['product_id'], item['product_name'], item['quantity'],
+                    f"{price:.2f}" if price is not None else '',
+                    f"{subtotal:.2f}" if subtotal is not None else '',
+                ])
+            pending += 1
+            if pending >= self.BATCH_SIZE:
+                yield self._drain(buffer)
+                pending = 0
+        if pending:
+            yield self._drain(buffer)
+    
+    def iter_jsonl(self, orders: Iterable[Order]) -> Iterator[str]:
+        """
+        Выгружает заказы в JSON Lines: один заказ на строку.
+        
+        Args:
+            orders: Заказы
+        
+        Returns:
+            Итератор фрагментов текста
+        """
+        lines = []
+        for order in orders:
+            lines.append(json.dumps({
+                'id': order.id,
+                'created_at': order.created_at,
+                'total': order.total,
+                'items': self._line_items(order),
+            }, ensure_ascii=False))
+            if len(lines) >= self.BATCH_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+    
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        """Забирает накопленный текст и очищает буфер."""
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
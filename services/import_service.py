@@ -0,0 +1,218 @@
+"""Сервис массового импорта каталога товаров (CSV и JSON Lines)."""
+
+import csv
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Значения поля in_stock в файлах поставщиков
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'да', 'в наличии', '+'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'нет', 'нет в наличии', '-'}
+
+
+@dataclass
+class ImportReport:
+    """Итоги импорта."""
+    
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (строка, сообщение)
+    elapsed: float = 0.0
+    
+    @property
+    def rate(self) -> float:
+        """Скорость импорта (строк в секунду)."""
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ImportService:
+    """
+    Сервис импорта товаров из файлов поставщиков.
+    
+    Файл читается построчно, строки проверяются пакетами по batch_size
+    и передаются дальше потоком, поэтому в памяти находится только
+    текущий пакет. Сохранение выполняет функция upsert (например,
+    DataManager.bulk_upsert_products) — одной записью в хранилище.
+    """
+    
+    FORMATS = ('csv', 'jsonl')
+    
+    def __init__(self, batch_size: int = 1000, max_errors: Optional[int] = None):
+        """
+        Инициализирует сервис.
+        
+        Args:
+            batch_size: Размер пакета проверяемых строк
+            max_errors: Допустимое количество ошибочных строк; при превышении
+                импорт прерывается без изменения каталога (None — без ограничения)
+        """
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+    
+    @staticmethod
+    def detect_format(path: str) -> str:
+        """Определяет формат файла по расширению (.csv, .jsonl, .ndjson)."""
+        suffix = Path(path).suffix.lower()
+        if suffix == '.csv':
+            return 'csv'
+        if suffix in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        raise ValueError(f"Неизвестный формат файла: {path}")
+    
+    def read_rows(self, path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Читает строки файла по одной.
+        
+        Args:
+            path: Путь к файлу
+            fmt: Формат ('csv' или 'jsonl'; None — по расширению)
+        
+        Returns:
+            Итератор пар (номер строки, данные); строка JSON Lines,
+            которую не удалось разобрать, возвращается как исключение ValueError
+        """
+        fmt = fmt or self.detect_format(path)
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            if fmt == 'csv':
+                reader = csv.DictReader(f)
+                for row in reader:
+                    yield reader.line_num, row
+            elif fmt == 'jsonl':
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_no, json.loads(line)
+                    except ValueError as e:
+                        yield line_no, ValueError(f"некорректный JSON: {e}")
+            else:
+                raise ValueError(f"Неизвестный формат файла: {fmt}")
+    
+    @staticmethod
+    def validate(row: Any) -> Dict[str, Any]:
+        """
+        Проверяет строку и приводит её к полям товара.
+        
+        Обязательны название и цена; необязательные поля (description,
+        in_stock, image, sku) попадают в результат, только если заданы,
+        чтобы при обновлении не затирать значения, отсутствующие в файле.
+        
+        Args:
+            row: Словарь полей строки
+        
+        Returns:
+            Поля товара
+        
+        Raises:
+            ValueError: Если строка некорректна
+        """
+        if isinstance(row, Exception):
+            raise ValueError(str(row))
+        if not isinstance(row, dict):
+            raise ValueError("строка должна быть объектом")
+        
+        name = str(row.get('name') or '').strip()
+        if not name:
+            raise ValueError("не указано название")
+        
+        price = row.get('price')
+        if isinstance(price, str):
+            price = price.strip().replace('\xa0', '').replace(' ', '').replace(',', '.')
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            raise ValueError(f"неверная цена: {row.get('price')!r}")
+        if not math.isfinite(price) or price < 0:
+            raise ValueError(f"неверная цена: {row.get('price')!r}")
+        
+        record: Dict[str, Any] = {'name': name, 'price': price}
+        if row.get('description') is not None:
+            record['description'] = str(row['description']).strip()
+        
+        in_stock = row.get('in_stock')
+        if isinstance(in_stock, str):
+            value = in_stock.strip().lower()
+            if value in TRUE_VALUES:
+                in_stock = True
+            elif value in FALSE_VALUES:
+                in_stock = False
+            elif value:
+                raise ValueError(f"неверное значение in_stock: {row['in_stock']!r}")
+            else:
+                in_stock = None
+        if in_stock is not None:
+            record['in_stock'] = bool(in_stock)
+        
+        for key in ('image', 'sku'):
+            value = str(row.get(key) or '').strip()
+            if value:
+                record[key] = value
+        return record
+    
+    def iter_valid(self, rows: Iterable[Tuple[int, Any]],
+                   report: ImportReport) -> Iterator[Dict[str, Any]]:
+        """
+        Проверяет строки пакетами и возвращает корректные.
+        
+        Ошибки записываются в отчёт.
+        
+        Raises:
+            ValueError: Если превышено max_errors
+        """
+        batch: List[Tuple[int, Any]] = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield from self._validate_batch(batch, report)
+                batch = []
+        yield from self._validate_batch(batch, report)
+    
+    def _validate_batch(self, batch: List[Tuple[int, Any]],
+                        report: ImportReport) -> List[Dict[str, Any]]:
+        """Проверяет пакет строк."""
+        valid = []
+        for line_no, row in batch:
+            try:
+                valid.append(self.validate(row))
+            except ValueError as e:
+                report.errors.append((line_no, str(e)))
+        report.rows += len(batch)
+        if self.max_errors is not None and len(report.errors) > self.max_errors:
+            raise ValueError(f"Слишком много ошибок ({len(report.errors)}), импорт прерван")
+        return valid
+    
+    def import_file(self, path: str,
+                    upsert: Callable[[Iterable[Dict[str, Any]]], Dict[str, int]],
+                    fmt: Optional[str] = None) -> ImportReport:
+        """
+        Импортирует товары из файла.
+        
+        Args:
+            path: Путь к файлу CSV или JSON Lines
+            upsert: Функция сохранения потока записей, возвращающая
+                количество created/updated/unchanged
+            fmt: Формат файла (None — по расширению)
+        
+        Returns:
+            Отчёт об импорте
+        
+        Raises:
+            ValueError: Если формат неизвестен или превышено max_errors
+        """
+        fmt = fmt or self.detect_format(path)
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Неизвестный формат файла: {fmt}")
+        
+        report = ImportReport()
+        started = time.perf_counter()
+        counts = upsert(self.iter_valid(self.read_rows(path, fmt), report))
+        report.created = counts.get('created', 0)
+        report.updated = counts.get('updated', 0)
+        report.unchanged = counts.get('unchanged', 0)
+        report.elapsed = time.perf_counter() - started
+        return report
@@ -1,23 +1,68 @@
 """Сервис для работы с заказами."""
 
-from typing import List, Optional
-from models import Order
+from typing import Callable, List, Optional, Union
+from models import Order, OrderIndex, ColumnarOrderStore
+from models.order_index import Timestamp
+from .pagination import Page, DEFAULT_PAGE_SIZE, clamp_limit, decode_cursor, encode_cursor
+
+# Хранилища заказов с индексами по ID и дате (общий интерфейс)
+INDEXED_ORDERS = (OrderIndex, ColumnarOrderStore)
+
+
+def paginate_orders(fetch: Callable[..., List[Order]], cursor: Optional[str] = None,
+                    limit: int = DEFAULT_PAGE_SIZE,
+                    date_from: Optional[Timestamp] = None,
+                    date_to: Optional[Timestamp] = None) -> Page[Order]:
+    """
+    Возвращает страницу заказов (новые первыми) по курсору.
+    
+    Args:
+        fetch: Функция выборки fetch(before, limit, start, end), например
+            OrderIndex.page или DataManager.get_orders_page
+        cursor: Курсор следующей страницы (None — первая страница)
+        limit: Размер страницы
+        date_from: Начало интервала дат (включительно)
+        date_to: Конец интервала дат (не включительно)
+    
+    Returns:
+        Страница заказов
+    
+    Raises:
+        ValueError: Если курсор некорректен
+    """
+    limit = clamp_limit(limit)
+    before = decode_cursor(cursor)
+    if before is not None and not (
+        len(before) == 2 and isinstance(before[0], str)
+        and isinstance(before[1], int) and not isinstance(before[1], bool)
+    ):
+        raise ValueError(f"Некорректный курсор: {cursor!r}")
+    
+    # Запрашиваем на один заказ больше, чтобы узнать о следующей странице
+    orders = fetch(before, limit + 1, date_from, date_to)
+    if len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        return Page(orders, encode_cursor((last.created_at, last.id)), limit)
+    return Page(orders, None, limit)
 
 
 class OrderService:
     """Сервис для работы с заказами."""
     
-    def __init__(self, orders: List[Order]):
+    def __init__(self, orders: Union[List[Order], OrderIndex, ColumnarOrderStore]):
         """
         Инициализирует сервис заказов.
         
         Args:
-            orders: Список заказов
+            orders: Список заказов или индекс заказов (OrderIndex, ColumnarOrderStore)
         """
         self.orders = orders
     
     def get_all_orders(self) -> List[Order]:
         """Возвращает все заказы."""
+        if isinstance(self.orders, INDEXED_ORDERS):
+            return self.orders.all()
         return self.orders.copy()
     
     def get_order(self, order_id: int) -> Optional[Order]:
@@ -26,15 +71,61 @@ class OrderService:
         
         Args:
             order_id: ID заказа
-            
+        
         Returns:
             Заказ или None если не найден
         """
+        if isinstance(self.orders, INDEXED_ORDERS):
+            return self.orders.get(order_id)
         for order in self.orders:
             if order.id == order_id:
                 return order
         return None
     
+    def get_orders_between(self, start: Optional[Timestamp] = None,
+                           end: Optional[Timestamp] = None) -> List[Order]:
+        """
+        Возвращает заказы, созданные в интервале [start, end).
+        
+        Args:
+            start: Начало интервала (включительно)
+            end: Конец интервала (не включительно)
+        
+        Returns:
+            Заказы в порядке создания
+        """
+        if isinstance(self.orders, INDEXED_ORDERS):
+            return self.orders.between(start, end)
+        return OrderIndex(self.orders).between(start, end)
+    
+    def get_last_orders(self, n: int) -> List[Order]:
+        """Возвращает последние n заказов (новые первыми)."""
+        if isinstance(self.orders, INDEXED_ORDERS):
+            return self.orders.last(n)
+        return OrderIndex(self.orders).last(n)
+    
+    def list_orders(self, cursor: Optional[str] = None,
+                    limit: int = DEFAULT_PAGE_SIZE,
+                    date_from: Optional[Timestamp] = None,
+                    date_to: Optional[Timestamp] = None) -> Page[Order]:
+        """
+        Возвращает страницу заказов (новые первыми).
+        
+        Args:
+            cursor: Курсор следующей страницы (None — первая страница)
+            limit: Размер страницы
+            date_from: Начало интервала дат (включительно)
+            date_to: Конец интервала дат (не включительно)
+        
+        Returns:
+            Страница заказов
+        
+        Raises:
+            ValueError: Если курсор некорректен
+        """
+        index = self.orders if isinstance(self.orders, INDEXED_ORDERS) else OrderIndex(self.orders)
+        return paginate_orders(index.page, cursor, limit, date_from, date_to)
+    
     def get_orders_count(self) -> int:
         """Возвращает общее количество заказов."""
         return len(self.orders)
@@ -42,4 +133,3 @@ class OrderService:
     def get_total_revenue(self) -> float:
         """Возвращает общую выручку от всех заказов."""
         return sum(order.total for order in self.orders)
-
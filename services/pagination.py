@@ -0,0 +1,79 @@
+"""Постраничная выдача с курсорами по ключу (keyset pagination)."""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class Page(Generic[T]):
+    """Страница результатов."""
+    
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    limit: int = DEFAULT_PAGE_SIZE
+    
+    @property
+    def has_more(self) -> bool:
+        """Есть ли следующая страница."""
+        return self.next_cursor is not None
+    
+    def __iter__(self):
+        """Итерирует по элементам страницы."""
+        return iter(self.items)
+    
+    def __len__(self) -> int:
+        """Возвращает количество элементов на странице."""
+        return len(self.items)
+
+
+def encode_cursor(key: Tuple[Any, ...]) -> str:
+    """
+    Кодирует ключ последнего элемента страницы в курсор.
+    
+    Args:
+        key: Ключ сортировки элемента (например, (price, id))
+    
+    Returns:
+        Строка, безопасная для использования в URL
+    """
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, ...]]:
+    """
+    Декодирует курсор в ключ сортировки.
+    
+    Args:
+        cursor: Курсор из запроса (None или пустая строка — первая страница)
+    
+    Returns:
+        Ключ или None для первой страницы
+    
+    Raises:
+        ValueError: Если курсор повреждён
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Некорректный курсор: {cursor!r}") from e
+    if not isinstance(key, list):
+        raise ValueError(f"Некорректный курсор: {cursor!r}")
+    return tuple(key)
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Ограничивает размер страницы допустимым диапазоном."""
+    if not limit or limit <= 0:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
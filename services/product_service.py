@@ -1,36 +1,56 @@
 """Сервис для работы с товарами."""
 
-from typing import Dict, List
-from models import Product
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from models import Product, CatalogSnapshot
+from search import SearchIndex
+from .pagination import Page, DEFAULT_PAGE_SIZE, clamp_limit, decode_cursor, encode_cursor
+
+
+# Ключи сортировки для постраничного вывода (ID в конце делает ключ уникальным)
+SORT_KEYS: Dict[str, Callable[[Product], Tuple[Any, ...]]] = {
+    'id': lambda p: (p.id,),
+    'price': lambda p: (p.price, p.id),
+    'price_desc': lambda p: (-p.price, p.id),
+    'name': lambda p: (p.name.lower(), p.id),
+}
 
 
 class ProductService:
     """Сервис для работы с товарами."""
     
-    def __init__(self, products: Dict[int, Product]):
+    def __init__(self, products: Mapping[int, Product],
+                 search_index: Optional[SearchIndex] = None):
         """
         Инициализирует сервис товаров.
         
         Args:
-            products: Словарь товаров (id -> Product)
+            products: Словарь товаров (id -> Product) или снимок каталога
+            search_index: Полнотекстовый индекс (если None, поиск
+                выполняется перебором)
         """
         self.products = products
+        self.search_index = search_index
     
-    def get_all_products(self) -> List[Product]:
+    def get_all_products(self) -> Sequence[Product]:
         """Возвращает все товары."""
+        if isinstance(self.products, CatalogSnapshot):
+            return self.products.all_products
         return list(self.products.values())
     
-    def get_available_products(self) -> List[Product]:
+    def get_available_products(self) -> Sequence[Product]:
         """Возвращает только товары в наличии."""
+        if isinstance(self.products, CatalogSnapshot):
+            return self.products.available
         return [p for p in self.products.values() if p.in_stock]
     
-    def get_product(self, product_id: int) -> Product:
+    def get_product(self, product_id: int) -> Optional[Product]:
         """
         Возвращает товар по ID.
         
         Args:
             product_id: ID товара
-            
+        
         Returns:
             Товар или None если не найден
         """
@@ -42,10 +62,17 @@ class ProductService:
         
         Args:
             query: Поисковый запрос
-            
+        
         Returns:
-            Список найденных товаров
+            Список найденных товаров (при наличии индекса — по релевантности)
         """
+        if self.search_index is not None:
+            return [
+                self.products[pid]
+                for pid in self.search_index.search(query)
+                if pid in self.products
+            ]
+        
         query_lower = query.lower()
         results = []
         for product in self.products.values():
@@ -53,4 +80,66 @@ class ProductService:
                 query_lower in product.description.lower()):
                 results.append(product)
         return results
-
+    
+    def list_products(self, cursor: Optional[str] = None,
+                      limit: int = DEFAULT_PAGE_SIZE, sort: str = 'id',
+                      min_price: Optional[float] = None,
+                      max_price: Optional[float] = None,
+                      in_stock: Optional[bool] = None) -> Page[Product]:
+        """
+        Возвращает страницу товаров с фильтрами и курсором.
+        
+        Args:
+            cursor: Курсор следующей страницы (None — первая страница)
+            limit: Размер страницы
+            sort: Сортировка: 'id', 'price', 'price_desc' или 'name'
+            min_price: Минимальная цена (включительно)
+            max_price: Максимальная цена (включительно)
+            in_stock: Фильтр по наличию (None — все товары)
+        
+        Returns:
+            Страница товаров
+        
+        Raises:
+            ValueError: Если сортировка неизвестна или курсор некорректен
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Неизвестная сортировка: {sort}")
+        key = SORT_KEYS[sort]
+        limit = clamp_limit(limit)
+        
+        if isinstance(self.products, CatalogSnapshot):
+            keys, products = self.products.sorted_by(sort, key)
+        else:
+            products = tuple(sorted(self.products.values(), key=key))
+            keys = [key(p) for p in products]
+        
+        after = decode_cursor(cursor)
+        try:
+            start = bisect_right(keys, after) if after is not None else 0
+        except TypeError:
+            raise ValueError(f"Курсор не подходит к сортировке {sort}: {cursor!r}")
+        
+        # При сортировке по цене сразу переходим к нижней границе диапазона
+        if sort == 'price' and min_price is not None:
+            start = max(start, bisect_left(keys, (min_price,)))
+        elif sort == 'price_desc' and max_price is not None:
+            start = max(start, bisect_left(keys, (-max_price,)))
+        
+        items: List[Product] = []
+        for index in range(start, len(products)):
+            product = products[index]
+            if sort == 'price' and max_price is not None and product.price > max_price:
+                break
+            if sort == 'price_desc' and min_price is not None and product.price < min_price:
+                break
+            if in_stock is not None and product.in_stock != in_stock:
+                continue
+            if min_price is not None and product.price < min_price:
+                continue
+            if max_price is not None and product.price > max_price:
+                continue
+            if len(items) == limit:
+                return Page(items, encode_cursor(key(items[-1])), limit)
+            items.append(product)
+        return Page(items, None, limit)
@@ -0,0 +1,152 @@
+"""Инкрементально обновляемая статистика продаж."""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+from models import Order, Product
+
+
+class SalesMetrics:
+    """
+    Агрегаты продаж, обновляемые при каждом новом заказе.
+    
+    Хранит итоговые суммы, продажи по товарам и разбивку по дням и часам,
+    поэтому статистика для панели управления вычисляется за O(1)
+    независимо от размера истории заказов.
+    """
+    
+    # Сколько дней хранить почасовую разбивку
+    HOURLY_RETENTION_DAYS = 7
+    
+    def __init__(self):
+        """Создаёт пустую статистику."""
+        self.orders_count = 0
+        self.total_revenue = 0.0
+        self.last_order_id = 0
+        self.product_units: Dict[int, int] = {}
+        self.product_revenue: Dict[int, float] = {}
+        self.daily: Dict[str, List[float]] = {}   # 'ГГГГ-ММ-ДД' -> [заказы, выручка]
+        self.hourly: Dict[str, List[float]] = {}  # 'ГГГГ-ММ-ДДTЧЧ' -> [заказы, выручка]
+    
+    @property
+    def average_order_value(self) -> float:
+        """Средний чек."""
+        return self.total_revenue / self.orders_count if self.orders_count else 0.0
+    
+    def record(self, order: Order, products: Mapping[int, Product]) -> None:
+        """
+        Учитывает новый заказ.
+        
+        Args:
+            order: Заказ
+            products: Товары для расчёта выручки по позициям
+                (цены на момент оформления заказа)
+        """
+        if order.id <= self.last_order_id:
+            return
+        
+        self.orders_count += 1
+        self.total_revenue += order.total
+        self.last_order_id = order.id
+        
+        for product_id, quantity in order.cart.items.items():
+            self.product_units[product_id] = self.product_units.get(product_id, 0) + quantity
+            product = products.get(product_id)
+            if product is not None:
+                self.product_revenue[product_id] = (
+                    self.product_revenue.get(product_id, 0.0) + product.price * quantity
+                )
+        
+        day, hour = order.created_at[:10], order.created_at[:13]
+        self._add_bucket(self.daily, day, order.total)
+        self._add_bucket(self.hourly, hour, order.total)
+        self._prune_hourly(hour)
+    
+    @staticmethod
+    def _add_bucket(buckets: Dict[str, List[float]], key: str, total: float) -> None:
+        """Увеличивает счётчики корзины (bucket) статистики."""
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [1, total]
+        else:
+            bucket[0] += 1
+            bucket[1] += total
+    
+    def _prune_hourly(self, current_hour: str) -> None:
+        """Удаляет почасовые данные старше HOURLY_RETENTION_DAYS."""
+        try:
+            now = datetime.strptime(current_hour, '%Y-%m-%dT%H')
+        except ValueError:
+            return
+        threshold = (now - timedelta(days=self.HOURLY_RETENTION_DAYS)).strftime('%Y-%m-%dT%H')
+        if len(self.hourly) > self.HOURLY_RETENTION_DAYS * 24:
+            for key in [k for k in self.hourly if k < threshold]:
+                del self.hourly[key]
+    
+    def top_products(self, n: int = 5) -> List[Tuple[int, int, float]]:
+        """
+        Возвращает самые продаваемые товары.
+        
+        Returns:
+            Список (product_id, штук, выручка), по убыванию количества
+        """
+        ranked = sorted(self.product_units.items(), key=lambda item: (-item[1], item[0]))
+        return [(pid, units, self.product_revenue.get(pid, 0.0)) for pid, units in ranked[:n]]
+    
+    def last_days(self, n: int = 7) -> List[Tuple[str, int, float]]:
+        """
+        Возвращает продажи за последние n дней, в которые были заказы.
+        
+        Returns:
+            Список (дата, заказов, выручка), новые первыми
+        """
+        days = sorted(self.daily, reverse=True)[:n]
+        return [(day, int(self.daily[day][0]), self.daily[day][1]) for day in days]
+    
+    def copy(self) -> 'SalesMetrics':
+        """Возвращает независимую копию статистики."""
+        metrics = SalesMetrics()
+        metrics.orders_count = self.orders_count
+        metrics.total_revenue = self.total_revenue
+        metrics.last_order_id = self.last_order_id
+        metrics.product_units = dict(self.product_units)
+        metrics.product_revenue = dict(self.product_revenue)
+        metrics.daily = {key: list(bucket) for key, bucket in self.daily.items()}
+        metrics.hourly = {key: list(bucket) for key, bucket in self.hourly.items()}
+        return metrics
+    
+    @classmethod
+    def rebuild(cls, orders: Iterable[Order], products: Mapping[int, Product]) -> 'SalesMetrics':
+        """
+        Пересчитывает статистику по всей истории заказов.
+        
+        Выручка по товарам считается по текущим ценам.
+        """
+        metrics = cls()
+        for order in sorted(orders, key=lambda o: o.id):
+            metrics.record(order, products)
+        return metrics
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразует статистику в словарь для сохранения."""
+        return {
+            'orders_count': self.orders_count,
+            'total_revenue': self.total_revenue,
+            'last_order_id': self.last_order_id,
+            'product_units': self.product_units,
+            'product_revenue': self.product_revenue,
+            'daily': self.daily,
+            'hourly': self.hourly,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SalesMetrics':
+        """Восстанавливает статистику из словаря."""
+        metrics = cls()
+        metrics.orders_count = data.get('orders_count', 0)
+        metrics.total_revenue = data.get('total_revenue', 0.0)
+        metrics.last_order_id = data.get('last_order_id', 0)
+        metrics.product_units = {int(k): v for k, v in data.get('product_units', {}).items()}
+        metrics.product_revenue = {int(k): v for k, v in data.get('product_revenue', {}).items()}
+        metrics.daily = dict(data.get('daily', {}))
+        metrics.hourly = dict(data.get('hourly', {}))
+        return metrics
@@ -1,6 +1,23 @@
 // Main JavaScript for SHOP SHIPS
 
 document.addEventListener('DOMContentLoaded', function() {
+    // Cart badge: catalog pages are the same for every visitor (and cached),
+    // so the item count is loaded separately
+    const cartBadge = document.getElementById('cart-count');
+    if (cartBadge && cartBadge.dataset.source) {
+        fetch(cartBadge.dataset.source, { credentials: 'same-origin', cache: 'no-store' })
+            .then(function(response) {
+                return response.ok ? response.json() : null;
+            })
+            .then(function(data) {
+                if (data && data.count > 0) {
+                    cartBadge.textContent = data.count;
+                    cartBadge.classList.remove('d-none');
+                }
+            })
+            .catch(function() {});
+    }
+    
     // Auto-dismiss alerts after 5 seconds
     const alerts = document.querySelectorAll('.alert');
     alerts.forEach(function(alert) {
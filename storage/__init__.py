@@ -2,5 +2,10 @@
 
 from .base_storage import IStorage
 from .json_storage import JSONStorage
+from .append_log_storage import AppendLogStorage
+from .sqlite_storage import SQLiteStorage
+from .cart_store import ICartStore, MemoryCartStore, ShardedFileCartStore
+from .group_commit import GroupCommitWriter
 
-__all__ = ['IStorage', 'JSONStorage']
+__all__ = ['IStorage', 'JSONStorage', 'AppendLogStorage', 'SQLiteStorage',
+           'ICartStore', 'MemoryCartStore', 'ShardedFileCartStore', 'GroupCommitWriter']
@@ -0,0 +1,385 @@
+"""JSON-хранилище с журналом заказов только на дозапись (JSON Lines)."""
+
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Any, Hashable, Optional, Tuple
+from .codecs import Codec, gc_paused
+from .json_storage import JSONStorage
+
+
+class AppendLogStorage(JSONStorage):
+    """
+    Хранилище, в котором новые заказы дописываются в журнал JSON Lines.
+    
+    Заказы хранятся как снимок (orders.json) плюс хвост журнала
+    (orders.log.jsonl). Оформление заказа дописывает одну строку в журнал,
+    поэтому его стоимость не зависит от размера истории. Периодически
+    журнал сворачивается в новый снимок.
+    """
+    
+    def __init__(self, data_dir: str = "data", fsync_batch: int = 32,
+                 fsync_interval: float = 1.0, compact_threshold: int = 10000,
+                 flush_interval: float = 0.0, codec: Optional[Codec] = None):
+        """
+        Инициализирует хранилище.
+        
+        Args:
+            data_dir: Директория для хранения файлов
+            fsync_batch: Количество записей, после которого выполняется fsync
+            fsync_interval: Максимальный интервал между fsync (в секундах)
+            compact_threshold: Количество записей в журнале, после которого
+                журнал сворачивается в снимок
+            flush_interval: Окно объединения записей остальных файлов
+                (см. JSONStorage)
+            codec: Кодек JSON (None — самый быстрый из установленных)
+        """
+        super().__init__(data_dir, flush_interval, codec)
+        self.orders_log_file = self.data_dir / "orders.log.jsonl"
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        
+        self._lock = threading.Lock()
+        self._log: Optional[BinaryIO] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._log_records = self._count_log_records()
+        # Вызывается после свёртки журнала с наибольшим ID нового снимка
+        # (под блокировками хранилища, из потока, записавшего заказ)
+        self.on_compact: Optional[Callable[[int], None]] = None
+        atexit.register(self.close)
+    
+    def _count_log_records(self) -> int:
+        """Подсчитывает количество записей в журнале."""
+        if not self.orders_log_file.exists():
+            return 0
+        with open(self.orders_log_file, 'rb') as f:
+            return sum(1 for line in f if line.strip())
+    
+    def _open_log(self) -> BinaryIO:
+        """
+        Открывает журнал на дозапись (лениво).
+        
+        Если другой процесс свернул журнал (файл удалён или заменён),
+        открытый дескриптор указывает на старый файл и открывается заново.
+        """
+        if self._log is not None:
+            try:
+                replaced = os.stat(self.orders_log_file).st_ino != os.fstat(self._log.fileno()).st_ino
+            except FileNotFoundError:
+                replaced = True
+            if replaced:
+                self._log.close()
+                self._log = None
+                self._log_records = self._count_log_records()
+        if self._log is None:
+            self._log = open(self.orders_log_file, 'ab')
+        return self._log
+    
+    def _sync_log(self) -> None:
+        """Сбрасывает буферы журнала на диск."""
+        if self._log is not None and self._unsynced:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def _close_log(self) -> None:
+        """Закрывает журнал, предварительно сбросив его на диск."""
+        if self._log is not None:
+            self._sync_log()
+            self._log.close()
+            self._log = None
+    
+    def _read_log(self, file_path: Path) -> List[Dict[str, Any]]:
+        """
+        Читает записи журнала.
+        
+        Недописанная последняя строка (например, после сбоя) пропускается.
+        
+        Args:
+            file_path: Путь к журналу
+        
+        Returns:
+            Список заказов из журнала
+        """
+        if not file_path.exists():
+            return []
+        
+        records = []
+        loads = self.codec.loads
+        size = 0
+        with open(file_path, 'rb') as f, gc_paused():
+            for line in f:
+                size += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(loads(line))
+                except ValueError:
+                    print(f"Пропущена повреждённая запись журнала {file_path}")
+        if self.io_observer is not None:
+            self.io_observer('read', file_path.name, size)
+        return records
+    
+    def _replay(self) -> List[Dict[str, Any]]:
+        """
+        Восстанавливает список заказов: снимок плюс хвост журнала.
+        
+        Записи журнала, уже попавшие в снимок (сбой между записью снимка
+        и очисткой журнала), пропускаются. Вызывается под блокировкой.
+        """
+        if self._log is not None:
+            self._log.flush()
+        orders = super().load_orders()
+        last_id = max((o.get('id', 0) for o in orders), default=0)
+        orders.extend(
+            o for o in self._read_log(self.orders_log_file)
+            if o.get('id', 0) > last_id
+        )
+        return orders
+    
+    def generation(self, kind: str) -> Optional[Hashable]:
+        """Для заказов метка учитывает и снимок, и журнал."""
+        if kind == 'orders':
+            return (self._stat_token(self.orders_file), self._stat_token(self.orders_log_file))
+        return super().generation(kind)
+    
+    def load_orders(self) -> List[Dict[str, Any]]:
+        """Загружает заказы: снимок плюс хвост журнала."""
+        with self._lock:
+            return self._replay()
+    
+    def _log_after(self, order_id: int) -> List[Dict[str, Any]]:
+        """
+        Возвращает записи журнала с ID больше order_id и больше ID снимка.
+        
+        Вызывается под блокировкой.
+        """
+        if self._log is not None:
+            self._log.flush()
+        last_id = max(order_id, self._orders_meta().get('max_id', 0))
+        return [o for o in self._read_log(self.orders_log_file) if o.get('id', 0) > last_id]
+    
+    def max_order_id(self) -> int:
+        """Возвращает наибольший ID заказа: сводка снимка плюс хвост журнала."""
+        with self._lock:
+            snapshot_max = self._orders_meta().get('max_id', 0)
+            return max((o['id'] for o in self._log_after(snapshot_max)), default=snapshot_max)
+    
+    def load_orders_after(self, order_id: int) -> List[Dict[str, Any]]:
+        """
+        Загружает заказы с ID больше order_id.
+        
+        Если все они новее снимка, читается только журнал; иначе
+        из снимка по индексу положений читаются только нужные заказы.
+        """
+        with self._lock:
+            if order_id >= self._orders_meta().get('max_id', 0):
+                return sorted(self._log_after(order_id), key=lambda o: o['id'])
+            return self._load_snapshot_after(order_id) + sorted(self._log_after(order_id),
+                                                                key=lambda o: o['id'])
+    
+    def load_orders_page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Загружает страницу заказов, новые первыми.
+        
+        Заказы снимка читаются по индексу положений, хвост журнала
+        (не больше compact_threshold записей) перебирается целиком.
+        """
+        if limit <= 0:
+            return []
+        with self._lock:
+            orders = self._load_snapshot_page(before, limit, start, end)
+            orders.extend(
+                o for o in self._log_after(0)
+                if self._in_date_range(o, start, end) and
+                   (before is None or (o.get('created_at', ''), o.get('id', 0)) < tuple(before))
+            )
+        orders.sort(key=lambda o: (o.get('created_at', ''), o.get('id', 0)), reverse=True)
+        return orders[:limit]
+    
+    def load_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """Загружает заказ по ID: новые ищутся в журнале, старые — в снимке."""
+        with self._lock:
+            if order_id <= self._orders_meta().get('max_id', 0):
+                return self._load_snapshot_order(order_id)
+            records = self._log_after(order_id - 1)
+        return next((o for o in records if o.get('id') == order_id), None)
+    
+    def load_order_models(self) -> List[Any]:
+        """
+        Загружает заказы как объекты Order.
+        
+        Снимок разбирается типизированным декодером, хвост журнала —
+        построчно через Order.from_dict.
+        """
+        from models import Order
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+            orders = super().load_order_models()
+            last_id = max((o.id for o in orders), default=0)
+            orders.extend(
+                Order.from_dict(o) for o in self._read_log(self.orders_log_file)
+                if o.get('id', 0) > last_id
+            )
+            return orders
+    
+    def iter_orders(self, start: Optional[str] = None,
+                    end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Перебирает заказы: снимок поэлементно, затем журнал построчно.
+        
+        Снимок и журнал открываются под блокировкой, а читаются без неё,
+        чтобы долгая выгрузка не задерживала оформление заказов. Свёртка
+        журнала заменяет оба файла, но открытые дескрипторы продолжают
+        указывать на согласованную пару старых файлов.
+        """
+        with self._file_lock, self._lock:
+            if self._log is not None:
+                self._log.flush()
+            try:
+                snapshot = open(self.orders_file, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                snapshot = None
+            try:
+                log = open(self.orders_log_file, 'rb')
+            except FileNotFoundError:
+                log = None
+        
+        last_id = 0
+        try:
+            if snapshot is not None:
+                for order in self._stream_snapshot(snapshot):
+                    last_id = max(last_id, order.get('id', 0))
+                    if self._in_date_range(order, start, end):
+                        yield order
+            if log is not None:
+                loads = self.codec.loads
+                for line in log:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        order = loads(line)
+                    except ValueError:
+                        print(f"Пропущена повреждённая запись журнала {self.orders_log_file}")
+                        continue
+                    if order.get('id', 0) > last_id and self._in_date_range(order, start, end):
+                        yield order
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+            if log is not None:
+                log.close()
+    
+    def save_orders(self, orders: List[Dict[str, Any]]) -> bool:
+        """Сохраняет полный список заказов как новый снимок и очищает журнал."""
+        with self._file_lock, self._lock:
+            return self._write_snapshot(orders)
+    
+    def _write_snapshot(self, orders: List[Dict[str, Any]]) -> bool:
+        """
+        Записывает снимок заказов и обнуляет журнал.
+        
+        Вызывается под блокировкой.
+        """
+        self._close_log()
+        # Снимок пишется сразу: после него журнал удаляется
+        if not self._write_json(self.orders_file, orders, sync=True):
+            return False
+        self._write_orders_meta(orders)
+        
+        try:
+            self.orders_log_file.unlink()
+        except FileNotFoundError:
+            pass
+        self._log_records = 0
+        return True
+    
+    def append_order(self, order: Dict[str, Any]) -> bool:
+        """
+        Дописывает заказ в журнал.
+        
+        Запись выполняется под межпроцессной блокировкой и сразу
+        передаётся ОС (видна другим процессам), а fsync
+        выполняется пакетно: раз в fsync_batch записей или
+        не реже чем раз в fsync_interval секунд.
+        """
+        return self.append_orders([order])
+    
+    def append_orders(self, orders: List[Dict[str, Any]], sync: bool = False) -> bool:
+        """
+        Дописывает пакет заказов в журнал одной записью.
+        
+        С sync=True метод возвращается после fsync журнала. fsync
+        выполняется после освобождения блокировок (через копию
+        дескриптора), чтобы следующий пакет мог записываться,
+        пока этот сбрасывается на диск.
+        """
+        data = b''.join(self.codec.dumps(order) + b'\n' for order in orders)
+        fd = None
+        with self._file_lock, self._lock:
+            try:
+                log = self._open_log()
+                log.write(data)
+                log.flush()
+                self._unsynced += len(orders)
+                self._log_records += len(orders)
+                
+                if sync:
+                    fd = os.dup(log.fileno())
+                elif (self._unsynced >= self.fsync_batch or
+                        time.monotonic() - self._last_sync >= self.fsync_interval):
+                    self._sync_log()
+            except IOError as e:
+                print(f"Ошибка при записи журнала {self.orders_log_file}: {e}")
+                return False
+            if self.io_observer is not None:
+                self.io_observer('write', self.orders_log_file.name, len(data))
+            
+            if self._log_records >= self.compact_threshold:
+                # Свёртка сама сбрасывает журнал на диск
+                self._compact()
+        
+        if fd is not None:
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                print(f"Ошибка при записи журнала {self.orders_log_file}: {e}")
+                return False
+            finally:
+                os.close(fd)
+            with self._lock:
+                self._unsynced = max(0, self._unsynced - len(orders))
+        return True
+    
+    def _compact(self) -> None:
+        """Сворачивает журнал в новый снимок (вызывается под блокировкой)."""
+        self._sync_log()
+        if self._write_snapshot(self._replay()) and self.on_compact is not None:
+            self.on_compact(self._orders_meta().get('max_id', 0))
+    
+    def compact(self) -> None:
+        """Принудительно сворачивает журнал в снимок."""
+        with self._file_lock, self._lock:
+            self._compact()
+    
+    def flush(self) -> bool:
+        """Сбрасывает на диск журнал и отложенные записи остальных файлов."""
+        with self._lock:
+            self._sync_log()
+        return super().flush()
+    
+    def close(self) -> None:
+        """Сбрасывает и закрывает журнал, записывает отложенные изменения."""
+        with self._lock:
+            self._close_log()
+        super().flush()
@@ -1,12 +1,63 @@
 """Базовые интерфейсы для хранилища (Dependency Inversion Principle)."""
 
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Callable, ContextManager, Dict, Iterator, List, Any, Hashable, Optional, Tuple
 
 
 class IStorage(ABC):
     """Интерфейс для хранилища данных (Interface Segregation Principle)."""
     
+    _process_lock = None
+    
+    # Поддерживает ли хранилище быстрые выборки заказов (страницы, поиск
+    # по ID) без загрузки всей истории
+    indexed_orders = False
+    
+    # Наблюдатель ввода-вывода: функция (direction, file, size), которую
+    # файловые хранилища вызывают после чтения и записи файлов
+    # (None — наблюдение выключено, накладных расходов нет)
+    io_observer: Optional[Callable[[str, str, int], None]] = None
+    
+    def lock(self) -> ContextManager:
+        """
+        Возвращает блокировку для операций чтения-изменения-записи.
+        
+        Реализация по умолчанию защищает только от других потоков этого
+        процесса; файловые хранилища возвращают межпроцессную блокировку.
+        """
+        if self._process_lock is None:
+            self._process_lock = threading.RLock()
+        return self._process_lock
+    
+    def allocate_id(self, kind: str, last_used: int, count: int = 1) -> int:
+        """
+        Выделяет новый ID для товара или заказа.
+        
+        Вызывается под lock(). Реализация по умолчанию продолжает
+        нумерацию после last_used; хранилища, общие для нескольких
+        процессов, хранят счётчик сами.
+        
+        Args:
+            kind: Тип записи ('products' или 'orders')
+            last_used: Наибольший ID, известный вызывающему
+            count: Количество выделяемых подряд ID (для массового импорта)
+        
+        Returns:
+            Новый ID (первый ID блока)
+        """
+        return last_used + 1
+    
+    def generation(self, kind: str) -> Optional[Hashable]:
+        """
+        Возвращает метку версии данных ('products' или 'orders').
+        
+        Метка меняется при каждом изменении данных, в том числе другим
+        процессом, и сравнивается с запомненной, чтобы перечитывать
+        данные только при изменениях. None — отслеживание не поддерживается.
+        """
+        return None
+    
     @abstractmethod
     def load_products(self) -> Dict[int, Dict[str, Any]]:
         """Загружает товары из хранилища."""
@@ -17,6 +68,24 @@ class IStorage(ABC):
         """Сохраняет товары в хранилище."""
         pass
     
+    def upsert_products(self, products: Dict[int, Dict[str, Any]]) -> bool:
+        """
+        Добавляет или обновляет несколько товаров одной записью.
+        
+        Реализация по умолчанию перезаписывает каталог один раз под
+        lock(); SQLite выполняет вставку одной транзакцией.
+        
+        Args:
+            products: Словарь {id: данные товара}
+        
+        Returns:
+            True если запись успешна
+        """
+        with self.lock():
+            current = self.load_products()
+            current.update(products)
+            return self.save_products(current)
+    
     @abstractmethod
     def load_orders(self) -> List[Dict[str, Any]]:
         """Загружает заказы из хранилища."""
@@ -36,4 +105,159 @@ class IStorage(ABC):
     def save_cart(self, cart_data: Dict[str, Any]) -> bool:
         """Сохраняет корзину в хранилище."""
         pass
-
+    
+    def load_product_models(self) -> Dict[int, Any]:
+        """
+        Загружает товары сразу как объекты Product.
+        
+        Реализация по умолчанию преобразует словари из load_products();
+        хранилища с типизированными декодерами переопределяют этот метод.
+        """
+        from models import Product
+        return {pid: Product.from_dict(pdata) for pid, pdata in self.load_products().items()}
+    
+    def load_order_models(self) -> List[Any]:
+        """Загружает заказы сразу как объекты Order (см. load_product_models)."""
+        from models import Order
+        return [Order.from_dict(odata) for odata in self.load_orders()]
+    
+    def append_order(self, order: Dict[str, Any]) -> bool:
+        """
+        Добавляет один заказ в хранилище.
+        
+        Реализация по умолчанию перезаписывает весь список заказов;
+        хранилища с поддержкой дозаписи переопределяют этот метод.
+        
+        Args:
+            order: Данные заказа
+        
+        Returns:
+            True если запись успешна
+        """
+        return self.append_orders([order])
+    
+    def append_orders(self, orders: List[Dict[str, Any]], sync: bool = False) -> bool:
+        """
+        Добавляет пакет заказов одной записью (групповая фиксация).
+        
+        Блокировку хранилища метод берёт сам. Реализация по умолчанию
+        перезаписывает весь список заказов один раз на пакет (save_orders
+        файловых хранилищ дожидается записи на диск).
+        
+        Args:
+            orders: Данные заказов в порядке возрастания ID
+            sync: Вернуться только после записи на диск (fsync)
+        
+        Returns:
+            True если запись успешна
+        """
+        with self.lock():
+            stored = self.load_orders()
+            stored.extend(orders)
+            return self.save_orders(stored)
+    
+    def load_metrics(self) -> Dict[str, Any]:
+        """
+        Загружает сохранённую статистику продаж.
+        
+        Хранилища без поддержки статистики возвращают пустой словарь,
+        и статистика пересчитывается по истории заказов.
+        """
+        return {}
+    
+    def save_metrics(self, metrics: Dict[str, Any]) -> bool:
+        """Сохраняет статистику продаж (по умолчанию не сохраняется)."""
+        return False
+    
+    def max_order_id(self) -> int:
+        """
+        Возвращает наибольший ID заказа (0, если заказов нет).
+        
+        Реализация по умолчанию загружает все заказы; хранилища
+        переопределяют метод, чтобы не зависеть от размера истории.
+        """
+        return max((order.get('id', 0) for order in self.load_orders()), default=0)
+    
+    def load_orders_after(self, order_id: int) -> List[Dict[str, Any]]:
+        """
+        Загружает заказы с ID больше order_id в порядке возрастания ID.
+        
+        Используется, чтобы дочитать новые заказы (статистика, изменения
+        других процессов) без загрузки всей истории.
+        
+        Args:
+            order_id: ID последнего уже известного заказа
+        
+        Returns:
+            Список заказов
+        """
+        return sorted((o for o in self.load_orders() if o.get('id', 0) > order_id),
+                      key=lambda o: o['id'])
+    
+    def load_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Загружает один заказ по ID.
+        
+        Реализация по умолчанию перебирает все заказы; хранилища
+        с индексами переопределяют этот метод.
+        
+        Args:
+            order_id: ID заказа
+        
+        Returns:
+            Данные заказа или None, если заказ не найден
+        """
+        for order in self.load_orders():
+            if order.get('id') == order_id:
+                return order
+        return None
+    
+    def load_orders_page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Загружает страницу заказов, новые первыми.
+        
+        Args:
+            before: Ключ (created_at, id) последнего заказа предыдущей страницы
+            limit: Размер страницы
+            start: Начало интервала дат (включительно)
+            end: Конец интервала дат (не включительно)
+        
+        Returns:
+            Не более limit заказов
+        """
+        keyed = sorted(
+            ((o['created_at'], o['id']), o) for o in self.load_orders()
+            if (start is None or o['created_at'] >= start) and
+               (end is None or o['created_at'] < end)
+        )
+        if before is not None:
+            keyed = [item for item in keyed if item[0] < tuple(before)]
+        return [order for _, order in reversed(keyed[-limit:])] if limit > 0 else []
+    
+    def iter_orders(self, start: Optional[str] = None,
+                    end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Перебирает заказы в порядке возрастания ID (для выгрузки).
+        
+        Реализация по умолчанию загружает всю историю; хранилища
+        переопределяют метод, чтобы читать заказы порциями с постоянным
+        расходом памяти.
+        
+        Args:
+            start: Начало интервала дат (включительно)
+            end: Конец интервала дат (не включительно)
+        
+        Returns:
+            Итератор заказов
+        """
+        orders = sorted(self.load_orders(), key=lambda o: o.get('id', 0))
+        yield from (o for o in orders if self._in_date_range(o, start, end))
+    
+    @staticmethod
+    def _in_date_range(order: Dict[str, Any], start: Optional[str],
+                       end: Optional[str]) -> bool:
+        """Проверяет, попадает ли заказ в интервал дат [start, end)."""
+        created_at = order.get('created_at', '')
+        return (start is None or created_at >= start) and (end is None or created_at < end)
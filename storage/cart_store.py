@@ -0,0 +1,167 @@
+"""Хранилища корзин, привязанных к сессиям покупателей."""
+
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, Tuple
+
+
+class ICartStore(ABC):
+    """Интерфейс хранилища корзин по идентификатору сессии."""
+    
+    # Наблюдатель ввода-вывода (см. IStorage.io_observer)
+    io_observer: Optional[Callable[[str, str, int], None]] = None
+    
+    @abstractmethod
+    def load(self, cart_id: str) -> Optional[Dict[str, Any]]:
+        """Загружает корзину по идентификатору (None, если её нет)."""
+        pass
+    
+    @abstractmethod
+    def save(self, cart_id: str, cart_data: Dict[str, Any]) -> bool:
+        """Сохраняет корзину по идентификатору."""
+        pass
+    
+    @abstractmethod
+    def delete(self, cart_id: str) -> None:
+        """Удаляет корзину по идентификатору."""
+        pass
+
+
+class MemoryCartStore(ICartStore):
+    """
+    Хранилище корзин в памяти процесса.
+    
+    Ограничено по количеству корзин (вытесняются давно неиспользуемые, LRU)
+    и по времени жизни (TTL с момента последнего обращения).
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 7 * 24 * 3600):
+        """
+        Инициализирует хранилище.
+        
+        Args:
+            max_entries: Максимальное количество корзин в памяти
+            ttl: Время жизни неиспользуемой корзины (в секундах)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._carts: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def load(self, cart_id: str) -> Optional[Dict[str, Any]]:
+        """Загружает корзину и отмечает её как недавно использованную."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._carts.get(cart_id)
+            if entry is None:
+                return None
+            touched_at, cart_data = entry
+            if now - touched_at > self.ttl:
+                del self._carts[cart_id]
+                return None
+            self._carts[cart_id] = (now, cart_data)
+            self._carts.move_to_end(cart_id)
+            return cart_data
+    
+    def save(self, cart_id: str, cart_data: Dict[str, Any]) -> bool:
+        """Сохраняет корзину, при необходимости вытесняя самые старые."""
+        now = time.monotonic()
+        with self._lock:
+            self._carts[cart_id] = (now, cart_data)
+            self._carts.move_to_end(cart_id)
+            self._evict(now)
+        return True
+    
+    def delete(self, cart_id: str) -> None:
+        """Удаляет корзину из памяти."""
+        with self._lock:
+            self._carts.pop(cart_id, None)
+    
+    def _evict(self, now: float) -> None:
+        """Вытесняет просроченные и лишние корзины (под блокировкой)."""
+        while self._carts:
+            oldest_id, (touched_at, _) = next(iter(self._carts.items()))
+            if len(self._carts) > self.max_entries or now - touched_at > self.ttl:
+                del self._carts[oldest_id]
+            else:
+                break
+    
+    def __len__(self) -> int:
+        """Возвращает количество корзин в памяти."""
+        return len(self._carts)
+
+
+class ShardedFileCartStore(ICartStore):
+    """
+    Хранилище корзин на диске: один небольшой файл на корзину.
+    
+    Файлы раскладываются по подкаталогам (шардам) по первым символам
+    идентификатора, поэтому запись одной корзины не блокирует остальные.
+    Подходит для нескольких процессов, работающих с одним каталогом.
+    """
+    
+    _ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,128}$')
+    
+    def __init__(self, base_dir: str = "data/carts", shard_width: int = 2):
+        """
+        Инициализирует хранилище.
+        
+        Args:
+            base_dir: Каталог для файлов корзин
+            shard_width: Количество символов идентификатора в имени шарда
+        """
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_width = shard_width
+    
+    def _path(self, cart_id: str) -> Path:
+        """Возвращает путь к файлу корзины."""
+        if not self._ID_PATTERN.match(cart_id):
+            raise ValueError(f"Недопустимый идентификатор корзины: {cart_id!r}")
+        return self.base_dir / cart_id[:self.shard_width] / f"{cart_id}.json"
+    
+    def load(self, cart_id: str) -> Optional[Dict[str, Any]]:
+        """Загружает корзину из файла."""
+        path = self._path(cart_id)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            if self.io_observer is not None:
+                self.io_observer('read', 'carts', len(raw))
+            return json.loads(raw)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Ошибка при чтении корзины {path}: {e}")
+            return None
+    
+    def save(self, cart_id: str, cart_data: Dict[str, Any]) -> bool:
+        """Сохраняет корзину в файл (через временный файл и переименование)."""
+        path = self._path(cart_id)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            payload = json.dumps(cart_data, ensure_ascii=False,
+                                 separators=(',', ':')).encode('utf-8')
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            if self.io_observer is not None:
+                self.io_observer('write', 'carts', len(payload))
+            return True
+        except IOError as e:
+            print(f"Ошибка при записи корзины {path}: {e}")
+            return False
+    
+    def delete(self, cart_id: str) -> None:
+        """Удаляет файл корзины."""
+        try:
+            self._path(cart_id).unlink()
+        except FileNotFoundError:
+            pass
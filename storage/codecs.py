@@ -0,0 +1,302 @@
+"""
+Кодеки JSON для хранилищ.
+
+При импорте выбирается самая быстрая доступная библиотека:
+orjson, затем msgspec, затем стандартный модуль json. Выбор можно
+переопределить переменной окружения SHOP_JSON_CODEC (orjson, msgspec, json).
+Все кодеки пишут компактный JSON в UTF-8 и совместимы между собой.
+"""
+
+import gc
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class Codec:
+    """
+    Кодек JSON: сериализация в байты и разбор из байтов или строки.
+    
+    Ошибки разбора приводятся к ValueError, ошибки сериализации — к TypeError.
+    """
+    
+    def __init__(self, name: str, dumps: Callable[[Any], bytes],
+                 loads: Callable[[Any], Any]):
+        """
+        Инициализирует кодек.
+        
+        Args:
+            name: Название библиотеки
+            dumps: Функция сериализации в байты
+            loads: Функция разбора
+        """
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+    
+    def __repr__(self) -> str:
+        return f"Codec({self.name!r})"
+
+
+def _stdlib_codec() -> Codec:
+    """Кодек на стандартном модуле json."""
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    return Codec('json', dumps, json.loads)
+
+
+def _orjson_codec() -> Codec:
+    """Кодек на orjson (ключи-числа записываются строками, как в json)."""
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    
+    return Codec('orjson', dumps, orjson.loads)
+
+
+def _msgspec_codec() -> Codec:
+    """Кодек на msgspec."""
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    
+    def dumps(obj: Any) -> bytes:
+        try:
+            return encoder.encode(obj)
+        except msgspec.EncodeError as e:
+            raise TypeError(str(e)) from e
+    
+    def loads(data: Any) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    
+    return Codec('msgspec', dumps, loads)
+
+
+_FACTORIES = {
+    'orjson': (lambda: orjson is not None, _orjson_codec),
+    'msgspec': (lambda: msgspec is not None, _msgspec_codec),
+    'json': (lambda: True, _stdlib_codec),
+}
+
+
+def available_codecs() -> List[str]:
+    """Возвращает названия доступных кодеков в порядке предпочтения."""
+    return [name for name, (available, _) in _FACTORIES.items() if available()]
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Возвращает кодек по названию.
+    
+    Args:
+        name: orjson, msgspec или json; None — кодек по умолчанию
+    
+    Returns:
+        Кодек
+    
+    Raises:
+        ValueError: Если библиотека неизвестна или не установлена
+    """
+    if name is None:
+        return default_codec
+    if name not in available_codecs():
+        raise ValueError(f"Кодек {name} недоступен (доступны: {', '.join(available_codecs())})")
+    return _FACTORIES[name][1]()
+
+
+def _select_default() -> Codec:
+    """Выбирает кодек по умолчанию (с учётом SHOP_JSON_CODEC)."""
+    requested = os.environ.get('SHOP_JSON_CODEC')
+    if requested:
+        try:
+            return get_codec(requested)
+        except ValueError as e:
+            print(f"Ошибка выбора кодека: {e}")
+    return _FACTORIES[available_codecs()[0]][1]()
+
+
+default_codec = _select_default()
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Приостанавливает сборщик мусора на время разбора больших файлов.
+    
+    Разбор создаёт миллионы объектов без циклических ссылок, и запуски
+    сборщика на каждые несколько сотен выделений занимают больше времени,
+    чем сам разбор.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_array(stream: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Разбирает JSON-массив из текстового потока поэлементно.
+    
+    В памяти одновременно находятся только текущий фрагмент файла
+    и один элемент, поэтому файл любого размера обходится
+    с постоянным расходом памяти.
+    
+    Args:
+        stream: Файл, открытый в текстовом режиме
+        chunk_size: Размер читаемого фрагмента в символах
+    
+    Returns:
+        Итератор элементов массива
+    
+    Raises:
+        ValueError: Если содержимое не является JSON-массивом
+    """
+    for _, _, value in iter_json_array_spans(stream, chunk_size):
+        yield value
+
+
+def iter_json_array_spans(stream: IO[str],
+                          chunk_size: int = 1 << 16) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Разбирает JSON-массив поэлементно, сообщая положение каждого элемента.
+    
+    Положение — смещения начала и конца элемента в символах потока.
+    Чтобы получить смещения в байтах файла UTF-8, откройте его
+    в кодировке latin-1: символы разметки JSON однобайтовые, а байты
+    многобайтовых символов UTF-8 не совпадают с ними. Строки в таких
+    элементах будут прочитаны искажёнными, числа — без изменений.
+    
+    Args:
+        stream: Файл, открытый в текстовом режиме
+        chunk_size: Размер читаемого фрагмента в символах
+    
+    Returns:
+        Итератор кортежей (начало, конец, элемент)
+    
+    Raises:
+        ValueError: Если содержимое не является JSON-массивом
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    base = 0  # Смещение buf[0] от начала потока
+    pos = 0
+    eof = False
+    started = False
+    
+    while True:
+        # Пропускаем пробелы и разделители между элементами
+        while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ',')):
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Неожиданный конец JSON-массива")
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            base += pos
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        
+        if not started:
+            if buf[pos] != '[':
+                raise ValueError("Ожидался JSON-массив")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+        
+        try:
+            value, value_end = decoder.raw_decode(buf, pos)
+            end = _WHITESPACE.match(buf, value_end).end()
+        except json.JSONDecodeError:
+            end = None
+        # Элемент должен заканчиваться разделителем. Иначе он оборвался
+        # на границе фрагмента (например, прочитана только часть числа)
+        # и файл нужно дочитать
+        if end is None or end == len(buf) or buf[end] not in ',]':
+            if eof:
+                raise ValueError(f"Повреждённый элемент JSON-массива в позиции {base + pos}")
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            base += pos
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield base + pos, base + value_end, value
+        pos = end
+
+
+# Типизированные декодеры: из байтов сразу в модели
+
+_typed_decoders: Dict[str, Any] = {}
+
+
+def _typed_decoder(kind: str) -> Any:
+    """Создаёт (один раз) типизированный декодер msgspec для товаров или заказов."""
+    if kind not in _typed_decoders:
+        from models import Product, Order
+        target = Dict[int, Product] if kind == 'products' else List[Order]
+        _typed_decoders[kind] = msgspec.json.Decoder(target)
+    return _typed_decoders[kind]
+
+
+def decode_products(data: bytes, codec: Optional[Codec] = None) -> Dict[int, Any]:
+    """
+    Разбирает JSON каталога сразу в словарь {id: Product}.
+    
+    С msgspec объекты создаются при разборе, без промежуточных словарей.
+    
+    Args:
+        data: Содержимое products.json
+        codec: Кодек для разбора без msgspec (None — кодек по умолчанию)
+    
+    Returns:
+        Словарь товаров
+    """
+    from models import Product
+    if msgspec is not None:
+        try:
+            return _typed_decoder('products').decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    raw = (codec or default_codec).loads(data)
+    return {int(pid): Product.from_dict(pdata) for pid, pdata in raw.items()}
+
+
+def decode_orders(data: bytes, codec: Optional[Codec] = None) -> List[Any]:
+    """
+    Разбирает JSON истории заказов сразу в список Order.
+    
+    Args:
+        data: Содержимое orders.json
+        codec: Кодек для разбора без msgspec (None — кодек по умолчанию)
+    
+    Returns:
+        Список заказов
+    """
+    from models import Order
+    if msgspec is not None:
+        try:
+            return _typed_decoder('orders').decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return [Order.from_dict(odata) for odata in (codec or default_codec).loads(data)]
@@ -0,0 +1,144 @@
+"""Фоновая запись заказов с групповой фиксацией (group commit)."""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class GroupCommitWriter:
+    """
+    Фоновый поток, записывающий заказы в хранилище пакетами.
+    
+    Запрос ставит заказ в очередь (submit) и ждёт подтверждения.
+    Поток забирает из очереди всё накопившееся (до max_batch заказов)
+    и записывает пакет одной операцией с fsync (функция commit,
+    например OrderRepository.save_many с sync=True); пока идёт
+    запись, в очереди копится следующий пакет. Поэтому каждый заказ
+    попадает на диск до ответа покупателю, запрос ждёт не дольше
+    записи одного пакета, а число fsync растёт не с числом заказов,
+    а с числом пакетов.
+    
+    Заказы должны ставиться в очередь в порядке возрастания ID.
+    """
+    
+    def __init__(self, commit: Callable[[List[Any]], bool], max_batch: int = 256):
+        """
+        Инициализирует и запускает поток записи.
+        
+        Args:
+            commit: Записывает пакет заказов на диск, возвращает успех
+            max_batch: Наибольший размер пакета
+        """
+        self.commit = commit
+        self.max_batch = max_batch
+        self._queue: 'queue.Queue[Optional[Tuple[Any, Future]]]' = queue.Queue()
+        self._last: Optional[Future] = None
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._orders = 0
+        self._largest_batch = 0
+        self._commit_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name='order-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def submit(self, order: Any) -> 'Future[bool]':
+        """
+        Ставит заказ в очередь записи.
+        
+        Args:
+            order: Заказ
+        
+        Returns:
+            Подтверждение: результат True, когда заказ записан на диск,
+            False — если запись не удалась
+        """
+        ticket: 'Future[bool]' = Future()
+        self._last = ticket
+        self._queue.put((order, ticket))
+        return ticket
+    
+    def flush(self) -> bool:
+        """Дожидается записи всех поставленных в очередь заказов."""
+        last = self._last
+        return last.result() if last is not None else True
+    
+    def _run(self) -> None:
+        """Цикл потока записи: забирает накопившиеся заказы и записывает пакетом."""
+        while True:
+            item = self._queue.get()
+            stop = item is None
+            batch = [] if stop else [item]
+            while not stop and len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._commit(batch)
+            if stop:
+                return
+    
+    def _commit(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Записывает пакет и сообщает результат ожидающим запросам."""
+        orders = [order for order, _ in batch]
+        started = time.perf_counter()
+        try:
+            ok = self.commit(orders)
+        except Exception as e:
+            print(f"Ошибка при записи пакета заказов: {e}")
+            ok = False
+        elapsed = time.perf_counter() - started
+        
+        with self._stats_lock:
+            self._batches += 1
+            self._orders += len(orders)
+            self._largest_batch = max(self._largest_batch, len(orders))
+            self._commit_seconds += elapsed
+        for _, ticket in batch:
+            ticket.set_result(ok)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику записи.
+        
+        Returns:
+            Словарь: batches, orders, average_batch, largest_batch,
+            average_commit_ms, queued
+        """
+        with self._stats_lock:
+            return {
+                'batches': self._batches,
+                'orders': self._orders,
+                'average_batch': self._orders / self._batches if self._batches else 0.0,
+                'largest_batch': self._largest_batch,
+                'average_commit_ms': (self._commit_seconds / self._batches * 1000
+                                      if self._batches else 0.0),
+                'queued': self._queue.qsize(),
+            }
+    
+    def metrics(self) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """Статистика для MetricsRegistry.add_collector (формат Prometheus)."""
+        stats = self.stats()
+        with self._stats_lock:
+            commit_seconds = self._commit_seconds
+        return [
+            ('shop_order_writer_batches_total', 'counter', {}, stats['batches']),
+            ('shop_order_writer_orders_total', 'counter', {}, stats['orders']),
+            ('shop_order_writer_commit_seconds_total', 'counter', {}, commit_seconds),
+            ('shop_order_writer_largest_batch', 'gauge', {}, stats['largest_batch']),
+            ('shop_order_writer_queued', 'gauge', {}, stats['queued']),
+        ]
+    
+    def close(self) -> None:
+        """Записывает оставшиеся заказы и останавливает поток."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
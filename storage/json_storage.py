@@ -1,70 +1,245 @@
 """Модуль для работы с JSON-файлами для хранения данных."""
 
-import json
+import atexit
+import io
 import os
+import shutil
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import (BinaryIO, IO, Callable, Dict, Iterator, List, Any, Hashable, NamedTuple,
+                    Optional, Tuple)
 from .base_storage import IStorage
+from .codecs import (Codec, get_codec, gc_paused, decode_products, decode_orders,
+                     iter_json_array, iter_json_array_spans)
+from .locking import FileLock
+
+
+class _SnapshotIndex(NamedTuple):
+    """Индекс положений заказов в снимке orders.json (около 32 байт на заказ)."""
+    token: Tuple[int, int, int]  # метка файла снимка (mtime_ns, размер, inode)
+    ids: array                   # ID заказов по возрастанию
+    starts: array                # смещения начал заказов в байтах
+    ends: array                  # смещения концов заказов в байтах
+    by_date: array               # номера заказов по возрастанию (created_at, id)
 
 
 class JSONStorage(IStorage):
-    """Класс для работы с JSON-файлами для хранения данных."""
+    """
+    Класс для работы с JSON-файлами для хранения данных.
+    
+    Запись атомарна: данные пишутся во временный файл, который затем
+    заменяет целевой, поэтому сбой во время записи не оставляет
+    обрезанный файл. При flush_interval > 0 записи откладываются
+    и объединяются: серия изменений одного файла за это окно
+    превращается в одну запись на диск.
+    
+    Несколько процессов могут работать с одной директорией: изменения
+    выполняются под файловой блокировкой (lock()), ID выделяются из
+    общих счётчиков (*.seq), а метки generation() позволяют заметить
+    изменения, сделанные другими процессами. Объединение записей
+    предназначено для одного процесса: отложенные данные не видны
+    остальным до сброса на диск.
+    """
     
-    def __init__(self, data_dir: str = "data"):
+    # Заказы по ID и страницы читаются из снимка по индексу положений
+    indexed_orders = True
+    
+    def __init__(self, data_dir: str = "data", flush_interval: float = 0.0,
+                 codec: Optional[Codec] = None):
         """
         Инициализирует хранилище.
         
         Args:
             data_dir: Директория для хранения JSON-файлов
+            flush_interval: Окно объединения записей в секундах
+                (0 — писать на диск сразу)
+            codec: Кодек JSON (None — самый быстрый из установленных)
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.flush_interval = flush_interval
+        self.codec = codec or get_codec()
+        
+        # Отложенные записи: путь -> данные
+        self._pending: Dict[Path, Any] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        if flush_interval > 0:
+            atexit.register(self.flush)
         
         # Файлы для хранения данных
         self.products_file = self.data_dir / "products.json"
         self.orders_file = self.data_dir / "orders.json"
         self.cart_file = self.data_dir / "cart.json"
+        self.metrics_file = self.data_dir / "metrics.json"
+        # Сводка снимка заказов (наибольший ID, количество) для быстрого запуска
+        self.orders_meta_file = self.data_dir / "orders.meta.json"
+        self._file_lock = FileLock(self.data_dir / ".lock")
+        # Индекс положений заказов в снимке (см. _open_snapshot)
+        self._order_spans: Optional[_SnapshotIndex] = None
+    
+    def lock(self) -> FileLock:
+        """Возвращает межпроцессную блокировку директории данных."""
+        return self._file_lock
+    
+    def allocate_id(self, kind: str, last_used: int, count: int = 1) -> int:
+        """
+        Выделяет новый ID из счётчика <kind>.seq, общего для всех процессов.
+        
+        Args:
+            kind: Тип записи ('products' или 'orders')
+            last_used: Наибольший ID, известный вызывающему
+            count: Количество выделяемых подряд ID
+        
+        Returns:
+            Новый ID (больше всех выделенных ранее; первый ID блока)
+        """
+        seq_file = self.data_dir / f"{kind}.seq"
+        with self._file_lock:
+            try:
+                current = int(seq_file.read_text(encoding='utf-8').strip() or 0)
+            except (FileNotFoundError, ValueError):
+                current = 0
+            new_id = max(current, last_used) + 1
+            # Без fsync: после сбоя счётчик восстанавливается по last_used
+            self._write_atomic(seq_file, new_id + count - 1, fsync=False)
+        return new_id
+    
+    @staticmethod
+    def _stat_token(file_path: Path) -> Tuple[int, int, int]:
+        """Возвращает (mtime, размер, inode) файла — дешёвую метку его версии."""
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return (0, 0, 0)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
+    def generation(self, kind: str) -> Optional[Hashable]:
+        """Возвращает метку версии файла товаров или заказов."""
+        if kind == 'products':
+            return self._stat_token(self.products_file)
+        if kind == 'orders':
+            return self._stat_token(self.orders_file)
+        return None
     
-    def _read_json(self, file_path: Path, default: Any = None) -> Any:
+    def _read_json(self, file_path: Path, default: Any = None,
+                   decode: Optional[Callable[[bytes], Any]] = None) -> Any:
         """
         Читает данные из JSON-файла.
         
         Args:
             file_path: Путь к файлу
             default: Значение по умолчанию, если файл не существует
-            
+            decode: Декодер содержимого (None — кодек хранилища)
+        
         Returns:
             Данные из файла или значение по умолчанию
         """
+        with self._pending_lock:
+            if file_path in self._pending:
+                pending = self._pending[file_path]
+                return pending.copy() if isinstance(pending, (dict, list)) else pending
+        
         if not file_path.exists():
             return default if default is not None else {}
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            if self.io_observer is not None:
+                self.io_observer('read', file_path.name, len(raw))
+            with gc_paused():
+                return (decode or self.codec.loads)(raw)
+        except ValueError as e:
+            # Сохраняем повреждённый файл, чтобы следующая запись его не затёрла
+            backup = file_path.with_name(file_path.name + '.corrupt')
+            print(f"Ошибка при чтении файла {file_path}: {e}. Копия: {backup}")
+            shutil.copyfile(file_path, backup)
+            return default if default is not None else {}
+        except IOError as e:
             print(f"Ошибка при чтении файла {file_path}: {e}")
             return default if default is not None else {}
     
-    def _write_json(self, file_path: Path, data: Any) -> bool:
+    def _write_json(self, file_path: Path, data: Any, sync: bool = False) -> bool:
         """
         Записывает данные в JSON-файл.
         
         Args:
             file_path: Путь к файлу
             data: Данные для записи
-            
+            sync: Записать сразу, даже если включено объединение записей
+        
+        Returns:
+            True если запись успешна (или поставлена в очередь), False в противном случае
+        """
+        if self.flush_interval <= 0 or sync:
+            with self._pending_lock:
+                self._pending.pop(file_path, None)
+            return self._write_atomic(file_path, data)
+        
+        with self._pending_lock:
+            self._pending[file_path] = data
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return True
+    
+    def _write_atomic(self, file_path: Path, data: Any, fsync: bool = True) -> bool:
+        """
+        Атомарно записывает JSON: временный файл, fsync, переименование.
+        
+        Args:
+            file_path: Путь к файлу
+            data: Данные для записи
+            fsync: Дожидаться записи данных на диск перед переименованием
+        
         Returns:
             True если запись успешна, False в противном случае
         """
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            payload = self.codec.dumps(data)
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+            if self.io_observer is not None:
+                self.io_observer('write', file_path.name, len(payload))
             return True
-        except IOError as e:
+        except (IOError, TypeError, ValueError) as e:
             print(f"Ошибка при записи файла {file_path}: {e}")
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
             return False
     
+    def flush(self) -> bool:
+        """
+        Записывает на диск все отложенные изменения.
+        
+        Returns:
+            True если все записи успешны
+        """
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending = self._pending
+            self._pending = {}
+        
+        ok = True
+        with self._file_lock:
+            for file_path, data in pending.items():
+                ok = self._write_atomic(file_path, data) and ok
+        return ok
+    
     def load_products(self) -> Dict[int, Dict[str, Any]]:
         """Загружает товары из файла."""
         data = self._read_json(self.products_file, default={})
@@ -74,14 +249,276 @@ class JSONStorage(IStorage):
         """Сохраняет товары в файл."""
         return self._write_json(self.products_file, products)
     
+    def _has_pending(self, file_path: Path) -> bool:
+        """Проверяет, есть ли для файла отложенная запись."""
+        with self._pending_lock:
+            return file_path in self._pending
+    
+    def load_product_models(self) -> Dict[int, Any]:
+        """Загружает товары, разбирая файл сразу в объекты Product."""
+        if self._has_pending(self.products_file):
+            return super().load_product_models()
+        return self._read_json(self.products_file, default={},
+                               decode=lambda raw: decode_products(raw, self.codec))
+    
     def load_orders(self) -> List[Dict[str, Any]]:
         """Загружает заказы из файла."""
         data = self._read_json(self.orders_file, default=[])
         return data if isinstance(data, list) else []
     
     def save_orders(self, orders: List[Dict[str, Any]]) -> bool:
-        """Сохраняет заказы в файл."""
-        return self._write_json(self.orders_file, orders)
+        """Сохраняет заказы в файл (сразу, вместе со сводкой снимка)."""
+        if not self._write_json(self.orders_file, orders, sync=True):
+            return False
+        self._write_orders_meta(orders)
+        return True
+    
+    def _write_orders_meta(self, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Записывает сводку снимка заказов.
+        
+        Сводка хранит размер и время изменения снимка и считается
+        устаревшей, если файл снимка с тех пор изменился.
+        """
+        mtime_ns, size, _ = self._stat_token(self.orders_file)
+        meta = {
+            'max_id': max((o.get('id', 0) for o in orders), default=0),
+            'count': len(orders),
+            'mtime_ns': mtime_ns,
+            'size': size,
+        }
+        self._write_atomic(self.orders_meta_file, meta, fsync=False)
+        return meta
+    
+    def _orders_meta(self) -> Dict[str, Any]:
+        """
+        Возвращает сводку снимка заказов (max_id, count).
+        
+        Если сводки нет или она устарела, снимок читается один раз
+        и сводка записывается заново.
+        """
+        mtime_ns, size, _ = self._stat_token(self.orders_file)
+        meta = self._read_json(self.orders_meta_file, default={})
+        if meta.get('mtime_ns') != mtime_ns or meta.get('size') != size:
+            meta = self._write_orders_meta(JSONStorage.load_orders(self))
+        return meta
+    
+    def max_order_id(self) -> int:
+        """Возвращает наибольший ID заказа по сводке снимка."""
+        return self._orders_meta().get('max_id', 0)
+    
+    def load_order_models(self) -> List[Any]:
+        """Загружает заказы, разбирая файл сразу в объекты Order."""
+        if self._has_pending(self.orders_file):
+            return super().load_order_models()
+        return self._read_json(self.orders_file, default=[],
+                               decode=lambda raw: decode_orders(raw, self.codec))
+    
+    def load_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """Загружает заказ по ID, читая из снимка только его."""
+        if self._has_pending(self.orders_file):
+            return super().load_order(order_id)
+        return self._load_snapshot_order(order_id)
+    
+    def load_orders_after(self, order_id: int) -> List[Dict[str, Any]]:
+        """Загружает заказы с ID больше order_id, читая из снимка только их."""
+        if self._has_pending(self.orders_file):
+            return super().load_orders_after(order_id)
+        return self._load_snapshot_after(order_id)
+    
+    def load_orders_page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Загружает страницу заказов, читая из снимка только её."""
+        if self._has_pending(self.orders_file):
+            return super().load_orders_page(before, limit, start, end)
+        return self._load_snapshot_page(before, limit, start, end)
+    
+    def _open_snapshot(self) -> Optional[Tuple[BinaryIO, _SnapshotIndex]]:
+        """
+        Открывает снимок заказов и возвращает его вместе с индексом положений.
+        
+        Индекс строится одним поэлементным проходом по снимку и хранится,
+        пока снимок не заменён; затем заказы читаются и разбираются по одному.
+        
+        Returns:
+            Открытый файл и индекс или None, если снимка нет
+        """
+        try:
+            f = open(self.orders_file, 'rb')
+        except FileNotFoundError:
+            return None
+        st = os.fstat(f.fileno())
+        token = (st.st_mtime_ns, st.st_size, st.st_ino)
+        index = self._order_spans
+        if index is None or index.token != token:
+            index = self._order_spans = self._index_snapshot(f, token)
+        return f, index
+    
+    def _read_snapshot_row(self, f: BinaryIO, index: _SnapshotIndex, row: int) -> Dict[str, Any]:
+        """
+        Читает и разбирает заказ снимка по номеру в индексе.
+        
+        Raises:
+            ValueError: Если заказ в файле повреждён
+        """
+        f.seek(index.starts[row])
+        raw = f.read(index.ends[row] - index.starts[row])
+        if self.io_observer is not None:
+            self.io_observer('read', self.orders_file.name, len(raw))
+        return self.codec.loads(raw)
+    
+    def _load_snapshot_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Читает заказ из снимка по индексу положений заказов.
+        
+        Args:
+            order_id: ID заказа
+        
+        Returns:
+            Данные заказа или None, если в снимке его нет
+        """
+        opened = self._open_snapshot()
+        if opened is None:
+            return None
+        f, index = opened
+        with f:
+            i = bisect_left(index.ids, order_id)
+            if i == len(index.ids) or index.ids[i] != order_id:
+                return None
+            try:
+                return self._read_snapshot_row(f, index, i)
+            except ValueError as e:
+                print(f"Ошибка при чтении заказа #{order_id} из {self.orders_file}: {e}")
+                return None
+    
+    def _load_snapshot_after(self, order_id: int) -> List[Dict[str, Any]]:
+        """Читает из снимка заказы с ID больше order_id (по возрастанию ID)."""
+        opened = self._open_snapshot()
+        if opened is None:
+            return []
+        f, index = opened
+        with f:
+            try:
+                return [self._read_snapshot_row(f, index, row)
+                        for row in range(bisect_right(index.ids, order_id), len(index.ids))]
+            except ValueError as e:
+                print(f"Ошибка при чтении файла {self.orders_file}: {e}")
+                return []
+    
+    def _load_snapshot_page(self, before: Optional[Tuple[str, int]], limit: int,
+                            start: Optional[str], end: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Читает из снимка страницу заказов (новые первыми).
+        
+        Границы страницы находятся двоичным поиском по порядку заказов
+        (created_at, id) из индекса; даты в памяти не хранятся, поэтому
+        на каждую границу из файла читается около log2(n) заказов.
+        
+        Args:
+            before: Ключ (created_at, id) последнего заказа предыдущей страницы
+            limit: Размер страницы
+            start: Начало интервала дат (включительно)
+            end: Конец интервала дат (не включительно)
+        
+        Returns:
+            Не более limit заказов
+        """
+        if limit <= 0:
+            return []
+        opened = self._open_snapshot()
+        if opened is None:
+            return []
+        f, index = opened
+        rows = index.by_date
+        
+        def key(position: int) -> Tuple[str, int]:
+            row = rows[position]
+            return self._read_snapshot_row(f, index, row).get('created_at', ''), index.ids[row]
+        
+        def search(target: Tuple[str, int], hi: int) -> int:
+            """Первая позиция в [0, hi) с ключом не меньше target."""
+            lo = 0
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if key(mid) < target:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+        
+        with f:
+            try:
+                # -1 меньше любого ID, поэтому (дата, -1) — начало этой даты
+                hi = len(rows)
+                if end is not None:
+                    hi = search((end, -1), hi)
+                if before is not None:
+                    hi = search(tuple(before), hi)
+                lo = search((start, -1), hi) if start is not None else 0
+                return [self._read_snapshot_row(f, index, rows[position])
+                        for position in range(hi - 1, max(lo, hi - limit) - 1, -1)]
+            except ValueError as e:
+                print(f"Ошибка при чтении файла {self.orders_file}: {e}")
+                return []
+    
+    def _index_snapshot(self, f: BinaryIO, token: Tuple[int, int, int]) -> _SnapshotIndex:
+        """Строит индекс положений заказов открытого снимка."""
+        ids, starts, ends = array('q'), array('q'), array('q')
+        # Даты нужны только для сортировки и после неё не хранятся
+        dates: List[str] = []
+        # В latin-1 смещения в символах совпадают со смещениями в байтах
+        text = io.TextIOWrapper(f, encoding='latin-1')
+        try:
+            for start, end, order in iter_json_array_spans(text):
+                ids.append(order.get('id', 0))
+                starts.append(start)
+                ends.append(end)
+                dates.append(order.get('created_at', ''))
+        except ValueError as e:
+            print(f"Ошибка при чтении файла {self.orders_file}: {e}")
+        finally:
+            text.detach()
+        if self.io_observer is not None:
+            self.io_observer('read', self.orders_file.name, ends[-1] if ends else 0)
+        
+        if any(a > b for a, b in zip(ids, islice(ids, 1, None))):
+            rows = sorted(range(len(ids)), key=ids.__getitem__)
+            ids, starts, ends = (array('q', (column[row] for row in rows))
+                                 for column in (ids, starts, ends))
+            dates = [dates[row] for row in rows]
+        by_date = array('q', sorted(range(len(ids)), key=lambda row: (dates[row], ids[row])))
+        return _SnapshotIndex(token, ids, starts, ends, by_date)
+    
+    def _stream_snapshot(self, stream: IO[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Поэлементно разбирает открытый снимок заказов.
+        
+        При повреждении файла выводится сообщение и перебор заканчивается.
+        """
+        try:
+            yield from iter_json_array(stream)
+        except ValueError as e:
+            print(f"Ошибка при чтении файла {self.orders_file}: {e}")
+    
+    def iter_orders(self, start: Optional[str] = None,
+                    end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Перебирает заказы, разбирая снимок поэлементно.
+        
+        Файл не загружается целиком, поэтому расход памяти не зависит
+        от размера истории. Снимок заменяется атомарно, так что открытый
+        файл остаётся согласованным, даже если его перезапишут во время
+        перебора.
+        """
+        try:
+            stream = open(self.orders_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with stream:
+            for order in self._stream_snapshot(stream):
+                if self._in_date_range(order, start, end):
+                    yield order
     
     def load_cart(self) -> Dict[str, Any]:
         """Загружает корзину из файла."""
@@ -90,4 +527,11 @@ class JSONStorage(IStorage):
     def save_cart(self, cart_data: Dict[str, Any]) -> bool:
         """Сохраняет корзину в файл."""
         return self._write_json(self.cart_file, cart_data)
-
+    
+    def load_metrics(self) -> Dict[str, Any]:
+        """Загружает статистику продаж из файла."""
+        return self._read_json(self.metrics_file, default={})
+    
+    def save_metrics(self, metrics: Dict[str, Any]) -> bool:
+        """Сохраняет статистику продаж в файл."""
+        return self._write_json(self.metrics_file, metrics)
@@ -0,0 +1,100 @@
+"""Межпроцессные блокировки на основе файлов."""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Рекомендательная (advisory) блокировка файла.
+    
+    Исключает одновременную работу нескольких процессов (например,
+    воркеров gunicorn) с одними данными. Внутри процесса блокировка
+    реентерабельна для потока, который её держит, и исключает
+    остальные потоки. Используется как контекстный менеджер.
+    """
+    
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        """
+        Инициализирует блокировку.
+        
+        Args:
+            path: Путь к файлу блокировки (создаётся при необходимости)
+            timeout: Максимальное время ожидания в секундах (None — без ограничения)
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+    
+    def acquire(self) -> None:
+        """Захватывает блокировку (ждёт, пока её отпустят другие процессы)."""
+        if not self._thread_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            raise TimeoutError(f"Не удалось захватить блокировку {self.path}")
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+    
+    def release(self) -> None:
+        """Отпускает блокировку."""
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+    
+    def _lock_file(self) -> None:
+        """Захватывает блокировку файла на уровне ОС."""
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        try:
+            while True:
+                try:
+                    if fcntl is not None:
+                        flags = fcntl.LOCK_EX if deadline is None else fcntl.LOCK_EX | fcntl.LOCK_NB
+                        fcntl.flock(fd, flags)
+                    else:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"Не удалось захватить блокировку {self.path}")
+                    time.sleep(0.01)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+    
+    def _unlock_file(self) -> None:
+        """Отпускает блокировку файла на уровне ОС."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+    
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
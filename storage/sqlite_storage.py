@@ -0,0 +1,449 @@
+"""Хранилище данных на основе SQLite."""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Hashable, Iterable, Optional, Tuple
+from .base_storage import IStorage
+from .locking import FileLock
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT    NOT NULL,
+    description TEXT    NOT NULL DEFAULT '',
+    price       REAL    NOT NULL,
+    in_stock    INTEGER NOT NULL DEFAULT 1,
+    image       TEXT,
+    sku         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_in_stock ON products (in_stock);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id         INTEGER PRIMARY KEY,
+    total      REAL    NOT NULL,
+    created_at TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at);
+
+CREATE TABLE IF NOT EXISTS order_items (
+    order_id   INTEGER NOT NULL REFERENCES orders (id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL,
+    quantity   INTEGER NOT NULL,
+    PRIMARY KEY (order_id, product_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cart_items (
+    product_id INTEGER PRIMARY KEY,
+    quantity   INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+PRODUCT_COLUMNS = "id, name, description, price, in_stock, image, sku"
+INSERT_PRODUCT = f"INSERT INTO products ({PRODUCT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+UPSERT_PRODUCT = (
+    INSERT_PRODUCT + " ON CONFLICT (id) DO UPDATE SET "
+    "name = excluded.name, description = excluded.description, price = excluded.price, "
+    "in_stock = excluded.in_stock, image = excluded.image, sku = excluded.sku"
+)
+INSERT_ORDER = "INSERT INTO orders (id, total, created_at) VALUES (?, ?, ?)"
+INSERT_ORDER_ITEM = (
+    "INSERT INTO order_items (order_id, product_id, quantity) VALUES (?, ?, ?)"
+)
+# Счётчики в таблице meta: версии данных (gen:*) и выделенные ID (seq:*)
+BUMP_COUNTER = (
+    "INSERT INTO meta (key, value) VALUES (?, 1) "
+    "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+)
+# ?2 — наибольший известный ID, ?3 — размер выделяемого блока
+ALLOCATE_ID = (
+    "INSERT INTO meta (key, value) VALUES (?1, ?2 + ?3) "
+    "ON CONFLICT (key) DO UPDATE SET "
+    "value = MAX(CAST(value AS INTEGER), ?2) + ?3"
+)
+
+
+class SQLiteStorage(IStorage):
+    """
+    Хранилище данных в базе SQLite.
+    
+    Использует режим WAL, параметризованные запросы и нормализованные
+    таблицы: позиции заказа хранятся отдельно в order_items.
+    Соединение открывается отдельно для каждого потока. Версии данных
+    и счётчики ID хранятся в таблице meta и общие для всех процессов.
+    """
+    
+    indexed_orders = True
+    
+    def __init__(self, db_path: str = "data/shop.db"):
+        """
+        Инициализирует хранилище.
+        
+        Args:
+            db_path: Путь к файлу базы данных
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._file_lock = FileLock(str(self.db_path) + '.lock')
+        
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+    
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Добавляет столбцы, появившиеся после создания базы."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+        if 'sku' not in columns:
+            conn.execute("ALTER TABLE products ADD COLUMN sku TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_products_sku ON products (sku)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока (создаёт при необходимости)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+    
+    def lock(self) -> FileLock:
+        """Возвращает межпроцессную блокировку базы данных."""
+        return self._file_lock
+    
+    def allocate_id(self, kind: str, last_used: int, count: int = 1) -> int:
+        """Выделяет новый ID (или блок из count ID) из счётчика seq:<kind> одной транзакцией."""
+        with self._connection() as conn:
+            conn.execute(ALLOCATE_ID, (f'seq:{kind}', last_used, count))
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (f'seq:{kind}',)).fetchone()
+        return int(row[0]) - count + 1
+    
+    def generation(self, kind: str) -> Optional[Hashable]:
+        """Возвращает счётчик изменений товаров или заказов."""
+        row = self._connection().execute(
+            "SELECT value FROM meta WHERE key = ?", (f'gen:{kind}',)
+        ).fetchone()
+        return int(row[0]) if row else 0
+    
+    @staticmethod
+    def _product_row(pid: int, data: Dict[str, Any]) -> tuple:
+        """Преобразует словарь товара в строку таблицы products."""
+        return (
+            pid,
+            data['name'],
+            data.get('description', ''),
+            data['price'],
+            1 if data.get('in_stock', True) else 0,
+            data.get('image'),
+            data.get('sku'),
+        )
+    
+    @staticmethod
+    def _order_rows(orders: Iterable[Dict[str, Any]]) -> tuple:
+        """Разбивает заказы на строки таблиц orders и order_items."""
+        order_rows = []
+        item_rows = []
+        for order in orders:
+            order_rows.append((order['id'], order['total'], order['created_at']))
+            items = order.get('cart', {}).get('items', {})
+            for product_id, quantity in items.items():
+                item_rows.append((order['id'], int(product_id), quantity))
+        return order_rows, item_rows
+    
+    @staticmethod
+    def _product_dict(row: tuple) -> Dict[str, Any]:
+        """Преобразует строку таблицы products в словарь товара."""
+        return {
+            'id': row[0],
+            'name': row[1],
+            'description': row[2],
+            'price': row[3],
+            'in_stock': bool(row[4]),
+            'image': row[5],
+            'sku': row[6],
+        }
+    
+    def load_products(self) -> Dict[int, Dict[str, Any]]:
+        """Загружает товары из базы данных."""
+        rows = self._connection().execute(
+            f"SELECT {PRODUCT_COLUMNS} FROM products"
+        )
+        return {row[0]: self._product_dict(row) for row in rows}
+    
+    def save_products(self, products: Dict[int, Dict[str, Any]]) -> bool:
+        """Сохраняет товары в базу данных (полная замена каталога)."""
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM products")
+                conn.executemany(
+                    INSERT_PRODUCT,
+                    (self._product_row(pid, data) for pid, data in products.items())
+                )
+                conn.execute(BUMP_COUNTER, ('gen:products',))
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при записи товаров в {self.db_path}: {e}")
+            return False
+    
+    def upsert_products(self, products: Dict[int, Dict[str, Any]]) -> bool:
+        """Добавляет или обновляет товары одной транзакцией (без перезаписи каталога)."""
+        try:
+            with self._connection() as conn:
+                conn.executemany(
+                    UPSERT_PRODUCT,
+                    (self._product_row(pid, data) for pid, data in products.items())
+                )
+                conn.execute(BUMP_COUNTER, ('gen:products',))
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при записи товаров в {self.db_path}: {e}")
+            return False
+    
+    def load_orders(self) -> List[Dict[str, Any]]:
+        """Загружает заказы из базы данных."""
+        conn = self._connection()
+        orders = {}
+        for order_id, total, created_at in conn.execute(
+                "SELECT id, total, created_at FROM orders ORDER BY id"):
+            orders[order_id] = {
+                'id': order_id,
+                'cart': {'items': {}},
+                'total': total,
+                'created_at': created_at,
+            }
+        for order_id, product_id, quantity in conn.execute(
+                "SELECT order_id, product_id, quantity FROM order_items"):
+            if order_id in orders:
+                orders[order_id]['cart']['items'][product_id] = quantity
+        return list(orders.values())
+    
+    def load_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """Загружает один заказ по первичному ключу."""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id, total, created_at FROM orders WHERE id = ?", (order_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        items = conn.execute(
+            "SELECT product_id, quantity FROM order_items WHERE order_id = ?",
+            (order_id,)
+        )
+        return {
+            'id': row[0],
+            'cart': {'items': {pid: qty for pid, qty in items}},
+            'total': row[1],
+            'created_at': row[2],
+        }
+    
+    def load_orders_page(self, before: Optional[Tuple[str, int]] = None, limit: int = 20,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Загружает страницу заказов по индексу created_at."""
+        conditions = []
+        params: List[Any] = []
+        if before is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        if start is not None:
+            conditions.append("created_at >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("created_at < ?")
+            params.append(end)
+        
+        sql = "SELECT id, total, created_at FROM orders"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        
+        return self._select_orders(sql, params)
+    
+    def _select_orders(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Выполняет запрос к orders (id, total, created_at) и добавляет позиции.
+        
+        Позиции выбранных заказов загружаются одним запросом по order_id.
+        """
+        conn = self._connection()
+        orders = [
+            {'id': row[0], 'cart': {'items': {}}, 'total': row[1], 'created_at': row[2]}
+            for row in conn.execute(sql, params)
+        ]
+        if orders:
+            by_id = {order['id']: order for order in orders}
+            placeholders = ','.join('?' * len(by_id))
+            for order_id, product_id, quantity in conn.execute(
+                    f"SELECT order_id, product_id, quantity FROM order_items "
+                    f"WHERE order_id IN ({placeholders})", list(by_id)):
+                by_id[order_id]['cart']['items'][product_id] = quantity
+        return orders
+    
+    def max_order_id(self) -> int:
+        """Возвращает наибольший ID заказа по первичному ключу."""
+        row = self._connection().execute("SELECT MAX(id) FROM orders").fetchone()
+        return row[0] or 0
+    
+    def load_orders_after(self, order_id: int) -> List[Dict[str, Any]]:
+        """Загружает заказы с ID больше order_id (по первичному ключу)."""
+        orders = []
+        last_id = order_id
+        # Порциями, чтобы не упереться в ограничение на число параметров IN (...)
+        while True:
+            batch = self._select_orders(
+                "SELECT id, total, created_at FROM orders WHERE id > ? ORDER BY id LIMIT 500",
+                [last_id]
+            )
+            orders.extend(batch)
+            if len(batch) < 500:
+                return orders
+            last_id = batch[-1]['id']
+    
+    def iter_orders(self, start: Optional[str] = None, end: Optional[str] = None,
+                    batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Перебирает заказы порциями по первичному ключу (с постоянным расходом памяти)."""
+        conditions = ["id > ?"]
+        date_params: List[Any] = []
+        if start is not None:
+            conditions.append("created_at >= ?")
+            date_params.append(start)
+        if end is not None:
+            conditions.append("created_at < ?")
+            date_params.append(end)
+        sql = (f"SELECT id, total, created_at FROM orders WHERE {' AND '.join(conditions)} "
+               f"ORDER BY id LIMIT ?")
+        
+        last_id = 0
+        while True:
+            batch = self._select_orders(sql, [last_id, *date_params, batch_size])
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1]['id']
+    
+    def save_orders(self, orders: List[Dict[str, Any]]) -> bool:
+        """Сохраняет заказы в базу данных (полная замена истории)."""
+        order_rows, item_rows = self._order_rows(orders)
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM order_items")
+                conn.execute("DELETE FROM orders")
+                conn.executemany(INSERT_ORDER, order_rows)
+                conn.executemany(INSERT_ORDER_ITEM, item_rows)
+                conn.execute(BUMP_COUNTER, ('gen:orders',))
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при записи заказов в {self.db_path}: {e}")
+            return False
+    
+    def append_order(self, order: Dict[str, Any]) -> bool:
+        """Добавляет один заказ одной транзакцией."""
+        return self.append_orders([order])
+    
+    def append_orders(self, orders: List[Dict[str, Any]], sync: bool = False) -> bool:
+        """
+        Добавляет пакет заказов одной транзакцией.
+        
+        С sync=True транзакция фиксируется с synchronous=FULL: журнал
+        WAL сбрасывается на диск до возврата (обычно NORMAL — без fsync
+        при каждой фиксации).
+        """
+        order_rows, item_rows = self._order_rows(orders)
+        conn = self._connection()
+        try:
+            if sync:
+                conn.execute("PRAGMA synchronous=FULL")
+            with conn:
+                conn.executemany(INSERT_ORDER, order_rows)
+                conn.executemany(INSERT_ORDER_ITEM, item_rows)
+                conn.execute(BUMP_COUNTER, ('gen:orders',))
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при записи заказов в {self.db_path}: {e}")
+            return False
+        finally:
+            if sync:
+                conn.execute("PRAGMA synchronous=NORMAL")
+    
+    def load_cart(self) -> Dict[str, Any]:
+        """Загружает корзину из базы данных."""
+        rows = self._connection().execute(
+            "SELECT product_id, quantity FROM cart_items"
+        )
+        return {'items': {pid: qty for pid, qty in rows}}
+    
+    def save_cart(self, cart_data: Dict[str, Any]) -> bool:
+        """Сохраняет корзину в базу данных."""
+        items = cart_data.get('items', {})
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM cart_items")
+                conn.executemany(
+                    "INSERT INTO cart_items (product_id, quantity) VALUES (?, ?)",
+                    ((int(pid), qty) for pid, qty in items.items())
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при записи корзины в {self.db_path}: {e}")
+            return False
+    
+    def load_metrics(self) -> Dict[str, Any]:
+        """Загружает статистику продаж из таблицы meta."""
+        row = self._connection().execute(
+            "SELECT value FROM meta WHERE key = 'sales_metrics'"
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+    
+    def save_metrics(self, metrics: Dict[str, Any]) -> bool:
+        """Сохраняет статистику продаж в таблицу meta."""
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('sales_metrics', ?)",
+                    (json.dumps(metrics, ensure_ascii=False),)
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при записи статистики в {self.db_path}: {e}")
+            return False
+    
+    def import_from(self, source: IStorage) -> Dict[str, int]:
+        """
+        Переносит все данные из другого хранилища (например, JSONStorage).
+        
+        Args:
+            source: Исходное хранилище
+        
+        Returns:
+            Количество перенесённых записей по типам
+        """
+        products = source.load_products()
+        orders = source.load_orders()
+        cart = source.load_cart()
+        
+        self.save_products(products)
+        self.save_orders(orders)
+        self.save_cart(cart)
+        return {
+            'products': len(products),
+            'orders': len(orders),
+            'cart_items': len(cart.get('items', {})),
+        }
+    
+    def close(self) -> None:
+        """Закрывает соединение текущего потока."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
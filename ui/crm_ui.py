@@ -2,7 +2,7 @@
 
 from typing import Optional
 from models import Product
-from services import ProductService, OrderService
+from services import ProductService
 from data_manager import DataManager
 
 
@@ -18,10 +18,12 @@ class CRMUI:
         """
         self.data_manager = data_manager
         self.products = data_manager.get_all_products()
-        self.orders = data_manager.get_all_orders()
-        
         self.product_service = ProductService(self.products)
-        self.order_service = OrderService(self.orders)
+    
+    def _refresh_products(self) -> None:
+        """Обновляет локальный снимок каталога после изменения товаров."""
+        self.products = self.data_manager.get_all_products()
+        self.product_service = ProductService(self.products)
     
     def show_menu(self) -> None:
         """Отображает главное меню CRM."""
@@ -128,7 +130,7 @@ class CRMUI:
         )
         
         product = self.data_manager.add_product(product)
-        self.products[product.id] = product  # Обновляем локальный кэш
+        self._refresh_products()
         
         print(f"\n✅ Товар '{product.name}' успешно добавлен (ID: {product.id})")
     
@@ -186,7 +188,7 @@ class CRMUI:
         
         updated_product = self.data_manager.update_product(product_id, **update_data)
         if updated_product:
-            self.products[product_id] = updated_product  # Обновляем локальный кэш
+            self._refresh_products()
             print(f"\n✅ Товар '{updated_product.name}' успешно обновлён.")
         else:
             print("❌ Не удалось обновить товар.")
@@ -209,7 +211,7 @@ class CRMUI:
         
         if confirm == "да":
             if self.data_manager.delete_product(product_id):
-                del self.products[product_id]  # Обновляем локальный кэш
+                self._refresh_products()
                 print("✅ Товар успешно удалён.")
             else:
                 print("❌ Не удалось удалить товар.")
@@ -218,7 +220,8 @@ class CRMUI:
     
     def show_orders(self) -> None:
         """Отображает список заказов."""
-        orders = self.order_service.get_all_orders()
+        # История заказов загружается только при открытии списка
+        orders = self.data_manager.get_all_orders()
         
         if not orders:
             print("\n📋 Заказы отсутствуют.")
@@ -255,7 +258,7 @@ class CRMUI:
             print("❌ Неверный ID заказа.")
             return
         
-        order = self.order_service.get_order(order_id)
+        order = self.data_manager.get_order(order_id)
         if not order:
             print("❌ Заказ с таким ID не найден.")
             return
@@ -287,10 +290,11 @@ class CRMUI:
     
     def show_statistics(self) -> None:
         """Отображает статистику магазина."""
-        orders_count = self.order_service.get_orders_count()
-        total_revenue = self.order_service.get_total_revenue()
+        metrics = self.data_manager.get_sales_metrics()
+        orders_count = metrics.orders_count
+        total_revenue = metrics.total_revenue
         products_count = len(self.products)
-        available_products = len([p for p in self.products.values() if p.in_stock])
+        available_products = len(self.product_service.get_available_products())
         
         print("\n" + "="*70)
         print("📊 СТАТИСТИКА МАГАЗИНА")
@@ -301,8 +305,12 @@ class CRMUI:
         print(f"Общая выручка: {total_revenue:.2f} ₽")
         
         if orders_count > 0:
-            avg_order = total_revenue / orders_count
-            print(f"Средний чек: {avg_order:.2f} ₽")
+            print(f"Средний чек: {metrics.average_order_value:.2f} ₽")
+            print("\nПопулярные товары:")
+            for product_id, units, revenue in metrics.top_products(5):
+                product = self.products.get(product_id)
+                name = product.name if product else f"(товар удалён) #{product_id}"
+                print(f"  {name}: {units} шт. на {revenue:.2f} ₽")
         
         print("="*70)
         input("\nНажмите Enter для продолжения...")
@@ -21,7 +21,7 @@ class PublicUI:
         self.products = data_manager.get_all_products()
         
         self.cart_service = CartService(self.cart, self.products)
-        self.product_service = ProductService(self.products)
+        self.product_service = ProductService(self.products, data_manager.search_index)
     
     def show_menu(self) -> None:
         """Отображает главное меню."""